@@ -1,13 +1,75 @@
 #include "handlandmarkreceiver.h"
 #include <QDebug>
 #include <QHostAddress>
+#include <QtEndian>
+#include <QDateTime>
+#include <cmath>
+#include <cstring>
 
 const quint16 HAND_PORT = 8384; // Porta diferente do vídeo (8383)
 
+// Formato binário (ver SocketsUtils/Scripts/App/landmarkProtocol.py), little-endian
+const char LANDMARK_MAGIC[2] = {'H', 'L'};
+const quint8 LANDMARK_VERSION = 1;
+const int PACKET_HEADER_SIZE = 18;   // magic, versão, flags, n_mãos, reservado, frame_number, timestamp
+const int HAND_HEADER_SIZE = 8;      // label, reservado (3), score
+const int NUM_LANDMARKS = 21;
+const int HAND_SIZE = HAND_HEADER_SIZE + NUM_LANDMARKS * 4 * 4;
+
+// Canal de retorno (ver SocketsUtils/Scripts/App/receiverFeedback.py), network byte order:
+// o relatório volta para a origem dos pacotes (o socket do sender)
+const char FEEDBACK_MAGIC[2] = {'R', 'R'};
+const quint8 FEEDBACK_VERSION = 1;
+const quint8 FEEDBACK_STREAM_LANDMARKS = 1;
+const quint32 FEEDBACK_LOST_UNKNOWN = 0xFFFFFFFF; // frame_number tem buracos: o sender calcula a perda
+const int FEEDBACK_HEADER_SIZE = 24;
+const int FEEDBACK_ECHO_SIZE = 16;
+const int FEEDBACK_MAX_ECHOES = 4;
+const qint64 FEEDBACK_INTERVAL_MS = 500;
+
+static float readFloatLE(const char *p)
+{
+    quint32 bits = qFromLittleEndian<quint32>(reinterpret_cast<const uchar*>(p));
+    float value;
+    std::memcpy(&value, &bits, sizeof(value));
+    return value;
+}
+
+static double readDoubleLE(const char *p)
+{
+    quint64 bits = qFromLittleEndian<quint64>(reinterpret_cast<const uchar*>(p));
+    double value;
+    std::memcpy(&value, &bits, sizeof(value));
+    return value;
+}
+
+static void writeFloatBE(float value, uchar *p)
+{
+    quint32 bits;
+    std::memcpy(&bits, &value, sizeof(bits));
+    qToBigEndian<quint32>(bits, p);
+}
+
+static void writeDoubleBE(double value, uchar *p)
+{
+    quint64 bits;
+    std::memcpy(&bits, &value, sizeof(bits));
+    qToBigEndian<quint64>(bits, p);
+}
+
 HandLandmarkReceiver::HandLandmarkReceiver(QObject *parent)
     : QObject(parent)
     , m_handsDetected(0)
+    , m_frameNumber(0)
+    , m_timestamp(0.0)
+    , m_nextReportMs(0)
+    , m_hasSeq(false)
+    , m_highestSeq(0)
+    , m_received(0)
+    , m_jitterMs(0.0)
+    , m_lastTransitMs(0.0)
 {
+    m_feedbackClock.start();
     udpSocket = new QUdpSocket(this);
 
     if (udpSocket->bind(QHostAddress::Any, HAND_PORT)) {
@@ -33,21 +95,82 @@ void HandLandmarkReceiver::processPendingDatagrams()
         // Debug: mostra que recebeu dados
         // qDebug() << "📦 Hand data received:" << datagram.size() << "bytes";
 
-        // Parse JSON
-        parseHandData(datagram);
+        // Parse JSON / binário; pacotes válidos entram no relatório ao sender
+        if (parseHandData(datagram))
+            recordFeedback(senderAddress, senderPort);
     }
 }
 
-void HandLandmarkReceiver::parseHandData(const QByteArray &data)
+void HandLandmarkReceiver::recordFeedback(const QHostAddress &address, quint16 port)
 {
+    const qint64 nowMs = m_feedbackClock.elapsed();
+    ++m_received;
+    if (!m_hasSeq || (m_frameNumber != m_highestSeq && quint32(m_frameNumber - m_highestSeq) < 0x80000000u)) {
+        m_highestSeq = m_frameNumber;
+    }
+
+    // Jitter da RFC 3550: a diferença entre relógios some na subtração
+    const double transitMs = QDateTime::currentMSecsSinceEpoch() - m_timestamp * 1000.0;
+    if (m_hasSeq)
+        m_jitterMs += (std::fabs(transitMs - m_lastTransitMs) - m_jitterMs) / 16.0;
+    m_lastTransitMs = transitMs;
+    m_hasSeq = true;
+
+    if (m_echoes.size() == FEEDBACK_MAX_ECHOES)
+        m_echoes.removeFirst();
+    m_echoes.append({m_frameNumber, m_timestamp, nowMs});
+
+    if (nowMs >= m_nextReportMs)
+        sendFeedbackReport(address, port);
+}
+
+void HandLandmarkReceiver::sendFeedbackReport(const QHostAddress &address, quint16 port)
+{
+    const qint64 nowMs = m_feedbackClock.elapsed();
+    QByteArray report(FEEDBACK_HEADER_SIZE + m_echoes.size() * FEEDBACK_ECHO_SIZE, '\0');
+    uchar *p = reinterpret_cast<uchar*>(report.data());
+
+    // magic | versão | stream | maior seq | recebidos | perdidos | jitter | n_ecos | reservado
+    std::memcpy(p, FEEDBACK_MAGIC, 2);
+    p[2] = FEEDBACK_VERSION;
+    p[3] = FEEDBACK_STREAM_LANDMARKS;
+    qToBigEndian<quint32>(m_highestSeq, p + 4);
+    qToBigEndian<quint32>(m_received, p + 8);
+    qToBigEndian<quint32>(FEEDBACK_LOST_UNKNOWN, p + 12);
+    writeFloatBE(static_cast<float>(m_jitterMs), p + 16);
+    p[20] = static_cast<uchar>(m_echoes.size());
+
+    // Ecos: seq | timestamp do pacote | espera no receptor (ms)
+    uchar *echo = p + FEEDBACK_HEADER_SIZE;
+    for (const FeedbackEcho &e : m_echoes) {
+        qToBigEndian<quint32>(e.seq, echo);
+        writeDoubleBE(e.timestamp, echo + 4);
+        writeFloatBE(static_cast<float>(nowMs - e.arrivalMs), echo + 12);
+        echo += FEEDBACK_ECHO_SIZE;
+    }
+
+    udpSocket->writeDatagram(report, address, port);
+    m_echoes.clear();
+    m_nextReportMs = nowMs + FEEDBACK_INTERVAL_MS;
+}
+
+bool HandLandmarkReceiver::parseHandData(const QByteArray &data)
+{
+    // Pacote binário: começa com o magic "HL"
+    if (data.size() >= PACKET_HEADER_SIZE && std::memcmp(data.constData(), LANDMARK_MAGIC, 2) == 0) {
+        return parseBinaryHandData(data);
+    }
+
     QJsonDocument doc = QJsonDocument::fromJson(data);
 
     if (doc.isNull() || !doc.isObject()) {
         qWarning() << "❌ Invalid JSON received";
-        return;
+        return false;
     }
 
     QJsonObject root = doc.object();
+    m_frameNumber = static_cast<quint32>(root["frame_number"].toDouble());
+    m_timestamp = root["timestamp"].toDouble();
 
     // Extrai número de mãos detectadas
     m_handsDetected = root["hands_detected"].toInt();
@@ -91,4 +214,52 @@ void HandLandmarkReceiver::parseHandData(const QByteArray &data)
 
     // Debug (descomente se quiser ver no console)
     // qDebug() << "📊 Hands detected:" << m_handsDetected;
+    return true;
+}
+
+bool HandLandmarkReceiver::parseBinaryHandData(const QByteArray &data)
+{
+    const char *p = data.constData();
+    const quint8 version = static_cast<quint8>(p[2]);
+    const int handsCount = static_cast<quint8>(p[4]);
+
+    if (version != LANDMARK_VERSION || data.size() < PACKET_HEADER_SIZE + handsCount * HAND_SIZE) {
+        qWarning() << "❌ Invalid binary hand packet";
+        return false;
+    }
+
+    m_frameNumber = qFromLittleEndian<quint32>(reinterpret_cast<const uchar*>(p + 6));
+    m_timestamp = readDoubleLE(p + 10);
+    m_handsDetected = handsCount;
+    m_hands.clear();
+
+    const char *handPtr = p + PACKET_HEADER_SIZE;
+    for (int handIdx = 0; handIdx < handsCount; ++handIdx, handPtr += HAND_SIZE) {
+        const quint8 labelCode = static_cast<quint8>(handPtr[0]);
+
+        QVariantMap hand;
+        hand["hand_index"] = handIdx;
+        hand["label"] = labelCode == 0 ? "Left" : (labelCode == 1 ? "Right" : "Unknown");
+        hand["confidence"] = readFloatLE(handPtr + 4);
+
+        // Landmarks: 21 x (x, y, z, visibility) em float32
+        QVariantList landmarks;
+        const char *lmPtr = handPtr + HAND_HEADER_SIZE;
+        for (int i = 0; i < NUM_LANDMARKS; ++i, lmPtr += 16) {
+            QVariantMap landmark;
+            landmark["x"] = readFloatLE(lmPtr);
+            landmark["y"] = readFloatLE(lmPtr + 4);
+            landmark["z"] = readFloatLE(lmPtr + 8);
+            landmark["visibility"] = readFloatLE(lmPtr + 12);
+            landmarks.append(landmark);
+        }
+
+        hand["landmarks"] = landmarks;
+        m_hands.append(hand);
+    }
+
+    // Emite sinais para atualizar QML
+    emit handsDataChanged();
+    emit newHandData(m_handsDetected);
+    return true;
 }
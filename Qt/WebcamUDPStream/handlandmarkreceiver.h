@@ -8,6 +8,9 @@
 #include <QJsonArray>
 #include <QVariantList>
 #include <QVariantMap>
+#include <QHostAddress>
+#include <QElapsedTimer>
+#include <QVector>
 
 class HandLandmarkReceiver : public QObject
 {
@@ -29,11 +32,35 @@ private slots:
     void processPendingDatagrams();
 
 private:
+    // Eco de um pacote no relatório do canal de retorno
+    struct FeedbackEcho {
+        quint32 seq;
+        double timestamp;
+        qint64 arrivalMs;
+    };
+
     QUdpSocket *udpSocket;
     int m_handsDetected;
     QVariantList m_hands;
 
-    void parseHandData(const QByteArray &data);
+    // frame_number/timestamp do último pacote válido
+    quint32 m_frameNumber;
+    double m_timestamp;
+
+    // Canal de retorno (ver SocketsUtils/Scripts/App/receiverFeedback.py)
+    QElapsedTimer m_feedbackClock;
+    qint64 m_nextReportMs;
+    bool m_hasSeq;
+    quint32 m_highestSeq;
+    quint32 m_received;
+    double m_jitterMs;
+    double m_lastTransitMs;
+    QVector<FeedbackEcho> m_echoes;
+
+    bool parseHandData(const QByteArray &data);
+    bool parseBinaryHandData(const QByteArray &data);
+    void recordFeedback(const QHostAddress &address, quint16 port);
+    void sendFeedbackReport(const QHostAddress &address, quint16 port);
 };
 
 #endif // HANDLANDMARKRECEIVER_H
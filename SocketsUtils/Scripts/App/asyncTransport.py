@@ -0,0 +1,386 @@
+import asyncio
+import json
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from frameProtocol import fragment_chunks, pack_fragment_header, FRAGMENT_HEADER_SIZE
+from frameSource import open_frame_source
+
+
+class _SenderProtocol(asyncio.DatagramProtocol):
+    """Protocolo só de envio: acompanha o controle de fluxo do transporte."""
+    
+    def __init__(self):
+        self.paused = False
+        self.errors = 0
+        
+    def pause_writing(self):
+        self.paused = True
+        
+    def resume_writing(self):
+        self.paused = False
+        
+    def error_received(self, exc):
+        self.errors += 1
+
+
+async def _adopt_socket(sock):
+    """Cria um transporte asyncio sobre um socket UDP já existente."""
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(_SenderProtocol, sock=sock)
+
+
+class AsyncFrameSender:
+    def __init__(self, sender, executor=None):
+        """
+        Envio de frames por um transporte asyncio.
+        
+        Reaproveita um UDPFrameSender (codificação, fragmentação, controle
+        de taxa, receptores, canal de retorno e estatísticas) e o socket
+        dele. A codificação JPEG roda no executor; o envio não bloqueia o
+        event loop. O sendFrame síncrono do sender continua funcionando (o
+        socket passa a ser não bloqueante).
+        
+        Args:
+            sender: UDPFrameSender (sem batch_size/pacing: o DatagramBatcher
+                faz as próprias chamadas no socket, fora do transporte)
+            executor: Executor para a codificação (padrão: o do loop)
+        """
+        if sender.batcher is not None:
+            raise ValueError("AsyncFrameSender não combina com batch_size/pacing_rate do sender")
+        self.sender = sender
+        self.executor = executor
+        self.transport = None
+        self.protocol = None
+        self.dropped = 0
+        
+    async def start(self):
+        self.transport, self.protocol = await _adopt_socket(self.sender.clientSocket)
+        return self
+        
+    async def send_frame(self, frame, timestamp=None):
+        """
+        Codifica (no executor) e envia um frame.
+        
+        Returns:
+            bool: True se enviado
+        """
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(self.executor, self.sender.encodeImage, frame)
+        sender = self.sender
+        
+        if data is None:
+            sender.framesFailed += 1
+            if sender.rateController is not None:
+                sender.rateController.record_failure()
+            return False
+            
+        success = self.send_encoded(data, timestamp)
+        if sender.rateController is not None:
+            sender.rateController.update(len(data), success)
+        return success
+        
+    def send_encoded(self, data, timestamp=None):
+        """
+        Envia dados já codificados (não bloqueia).
+        
+        Vai para todos os receptores do sender (sender.subscribers). Com o
+        buffer do transporte acima do limite (pause_writing), o frame é
+        descartado em vez de acumular atraso.
+        """
+        sender = self.sender
+        subscribers = sender.subscribers
+        if self.transport is None or self.transport.is_closing() or self.protocol.paused:
+            self.dropped += 1
+            return sender._recordSend(data, subscribers, [False] * len(subscribers))
+            
+        # Erros de envio chegam depois, em error_received: o frame conta como enviado
+        if sender.fragmented:
+            frame_id = sender.frameId
+            sender.frameId = (sender.frameId + 1) & 0xFFFFFFFF
+            if timestamp is None:
+                timestamp = time.time()
+            chunks = fragment_chunks(data, sender.maxDatagramSize)
+            # O transporte copia o datagrama se precisar guardá-lo: o buffer
+            # pré-alocado do sender pode ser reutilizado a cada fragmento
+            datagram = sender._datagramView
+            for index, chunk in enumerate(chunks):
+                pack_fragment_header(datagram, frame_id, index, len(chunks), timestamp)
+                end = FRAGMENT_HEADER_SIZE + len(chunk)
+                datagram[FRAGMENT_HEADER_SIZE:end] = chunk
+                for subscriber in subscribers:
+                    self.transport.sendto(datagram[:end], subscriber.address)
+            if sender.feedback is not None and subscribers:
+                sender.feedback.on_sent(frame_id)
+        else:
+            for subscriber in subscribers:
+                self.transport.sendto(data, subscriber.address)
+            
+        return sender._recordSend(data, subscribers, [True] * len(subscribers))
+        
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+
+class AsyncLandmarkSender:
+    def __init__(self, landmark_sender):
+        """
+        Envio dos landmarks por um transporte asyncio.
+        
+        Args:
+            landmark_sender: LandmarkSender (serialização e estatísticas)
+        """
+        self.sender = landmark_sender
+        self.address = (landmark_sender.server_ip, landmark_sender.server_port)
+        self.transport = None
+        self.protocol = None
+        
+    async def start(self):
+        self.transport, self.protocol = await _adopt_socket(self.sender.udp_socket)
+        return self
+        
+    def send_hand_data(self, hands_data):
+        """Serializa e envia (não bloqueia). Mesmo retorno do LandmarkSender."""
+        if self.transport is None or self.transport.is_closing() or self.protocol.paused:
+            self.sender.packets_failed += 1
+            return False
+        self.transport.sendto(self.sender.encode_hand_data(hands_data), self.address)
+        self.sender.packets_sent += 1
+        return True
+        
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+
+
+class AsyncCaptureStream:
+    def __init__(self, stream_id, source, frame_sender, tracker=None, mirror=True,
+                 width=640, height=480, fps=30, realtime=True):
+        """
+        Loop de captura assíncrono de um stream.
+        
+        Leitura da câmera, MediaPipe e JPEG rodam em executores; o loop só
+        coordena. Cada estágio tem no máximo um frame em voo: se o
+        anterior ainda não terminou, o frame novo é descartado para aquele
+        estágio (o vídeo não espera a inferência e vice-versa).
+        
+        Args:
+            stream_id: Identificador do stream
+            source: Fonte de frames (ver frameSource.py)
+            frame_sender: UDPFrameSender
+            tracker: HandTracker opcional (process_hands + sender de landmarks)
+            mirror: Espelhar o frame (cv2.flip)
+            width, height, fps: Configuração da fonte
+            realtime: False para fontes gravadas entregarem o mais rápido possível
+        """
+        self.stream_id = stream_id
+        self.source = source
+        self.mirror = mirror
+        self.sourceArgs = dict(width=width, height=height, fps=fps, realtime=realtime)
+        self.tracker = tracker
+        
+        # Um thread por estágio bloqueante do stream; o loop é compartilhado
+        self.captureExecutor = ThreadPoolExecutor(1, thread_name_prefix=f"capture-{stream_id}")
+        self.encodeExecutor = ThreadPoolExecutor(1, thread_name_prefix=f"encode-{stream_id}")
+        self.inferenceExecutor = ThreadPoolExecutor(1, thread_name_prefix=f"inference-{stream_id}")
+        
+        self.frameSender = AsyncFrameSender(frame_sender, self.encodeExecutor)
+        self.landmarkSender = AsyncLandmarkSender(tracker.sender) if tracker is not None else None
+        
+        self._sendTask = None
+        self._inferenceTask = None
+        self.cap = None
+        
+        # Estatísticas
+        self.frame_count = 0
+        self.inferred = 0
+        self.inference_failed = 0
+        self.send_dropped = 0
+        self.inference_dropped = 0
+        
+    def _read(self):
+        ret, frame = self.cap.read()
+        if ret and self.mirror:
+            frame = cv2.flip(frame, 1)
+        return ret, frame
+        
+    async def _infer(self, frame, frame_number, timestamp):
+        loop = asyncio.get_running_loop()
+        _, hands_data = await loop.run_in_executor(
+            self.inferenceExecutor, self.tracker.process_hands, frame, frame_number, timestamp)
+        self.landmarkSender.send_hand_data(hands_data)
+        self.inferred += 1
+        
+    def _collect(self, task):
+        """
+        Recolhe o resultado de uma tarefa de estágio já terminada.
+        
+        Returns:
+            bool: True se a tarefa terminou com exceção (mostrada aqui)
+        """
+        if task is None or task.cancelled():
+            return False
+        error = task.exception()
+        if error is None:
+            return False
+        stage = "inferência" if task is self._inferenceTask else "envio"
+        print(f"❌ [{self.stream_id}] Erro na {stage}: {error}")
+        return True
+        
+    def _collectSend(self):
+        if self._collect(self._sendTask):
+            self.frameSender.sender.framesFailed += 1
+            
+    def _collectInference(self):
+        if self._collect(self._inferenceTask):
+            self.inference_failed += 1
+        
+    async def run(self, stop_event):
+        loop = asyncio.get_running_loop()
+        self.cap = await loop.run_in_executor(self.captureExecutor, lambda: open_frame_source(
+            self.source, **self.sourceArgs))
+        if not self.cap.isOpened():
+            print(f"❌ [{self.stream_id}] Não foi possível abrir a fonte {self.source}")
+            return
+            
+        await self.frameSender.start()
+        if self.landmarkSender is not None:
+            await self.landmarkSender.start()
+        print(f"✅ [{self.stream_id}] {self.cap.describe()}")
+        
+        try:
+            while not stop_event.is_set():
+                ret, frame = await loop.run_in_executor(self.captureExecutor, self._read)
+                if not ret:
+                    print(f"⚠️ [{self.stream_id}] Fim da fonte ou falha na captura")
+                    break
+                    
+                self.frame_count += 1
+                timestamp = time.time()
+                
+                if self._sendTask is None or self._sendTask.done():
+                    self._collectSend()
+                    self._sendTask = loop.create_task(self.frameSender.send_frame(frame, timestamp))
+                else:
+                    self.send_dropped += 1
+                    
+                if self.tracker is not None:
+                    if self._inferenceTask is None or self._inferenceTask.done():
+                        self._collectInference()
+                        self._inferenceTask = loop.create_task(
+                            self._infer(frame, self.frame_count, timestamp))
+                    else:
+                        self.inference_dropped += 1
+        finally:
+            pending = [task for task in (self._sendTask, self._inferenceTask) if task is not None]
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                self._collectSend()
+                self._collectInference()
+            await loop.run_in_executor(self.captureExecutor, self.cap.release)
+            
+    def stats(self):
+        sender = self.frameSender.sender
+        return {
+            "stream": self.stream_id,
+            "captured": self.frame_count,
+            "sent": sender.framesSent,
+            "send_failed": sender.framesFailed,
+            "send_dropped": self.send_dropped,
+            "inferred": self.inferred,
+            "inference_failed": self.inference_failed,
+            "inference_dropped": self.inference_dropped,
+        }
+        
+    def close(self):
+        self.frameSender.close()
+        if self.landmarkSender is not None:
+            self.landmarkSender.close()
+        if self.tracker is not None:
+            self.tracker.close_hands()
+        for executor in (self.captureExecutor, self.encodeExecutor, self.inferenceExecutor):
+            executor.shutdown(wait=True)
+
+
+class _ControlProtocol(asyncio.DatagramProtocol):
+    def __init__(self, streams, stop_event):
+        self.streams = streams
+        self.stop_event = stop_event
+        self.transport = None
+        
+    def connection_made(self, transport):
+        self.transport = transport
+        
+    def datagram_received(self, data, addr):
+        command = data.decode("utf-8", "replace").strip().lower()
+        if command == "stop":
+            self.stop_event.set()
+            reply = {"ok": True}
+        elif command == "stats":
+            reply = {"streams": [stream.stats() for stream in self.streams]}
+        else:
+            reply = {"ok": False, "error": f"comando desconhecido: {command}"}
+        self.transport.sendto(json.dumps(reply).encode("utf-8"), addr)
+
+
+async def run_streams(streams, control_port=None, stats_interval=1.0):
+    """
+    Roda vários streams num único event loop até todos terminarem,
+    Ctrl+C/SIGTERM ou o comando "stop" no canal de controle.
+    
+    Args:
+        streams: Lista de AsyncCaptureStream
+        control_port: Porta UDP local para comandos ("stats", "stop")
+        stats_interval: Segundos entre as linhas de estatística
+    """
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: Ctrl+C chega como KeyboardInterrupt
+            
+    control = None
+    if control_port is not None:
+        control, _ = await loop.create_datagram_endpoint(
+            lambda: _ControlProtocol(streams, stop_event), local_addr=("127.0.0.1", control_port))
+        print(f"🎛️  Canal de controle: udp://127.0.0.1:{control_port} (stats, stop)")
+        
+    async def print_stats():
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), stats_interval)
+            except asyncio.TimeoutError:
+                for stream in streams:
+                    print(f"📊 {stream.stats()}")
+                    
+    stats_task = loop.create_task(print_stats())
+    try:
+        await asyncio.gather(*(stream.run(stop_event) for stream in streams))
+    finally:
+        stop_event.set()
+        await stats_task
+        if control is not None:
+            control.close()
+        for stream in streams:
+            stream.close()
+
+
+# Execução: dois streams sintéticos num único event loop (sem câmera nem MediaPipe)
+if __name__ == "__main__":
+    from udpFrameSender import UDPFrameSender
+    
+    streams = [
+        AsyncCaptureStream(stream_id, "synthetic", UDPFrameSender("127.0.0.1", 8383 + 2 * stream_id))
+        for stream_id in range(2)
+    ]
+    try:
+        asyncio.run(run_streams(streams, control_port=8390))
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrompido (Ctrl+C)")
+    print("\n✅ Programa encerrado\n")
@@ -0,0 +1,492 @@
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+import cv2
+from frameSource import open_frame_source
+from handLandmarks import HandLandmarksResult
+from landmarkSender import LandmarkSender
+from udpFrameSender import UDPFrameSender
+from udpFrameReceiver import UDPFrameReceiver
+from frameEncoders import available_encoders, create_encoder
+
+DEFAULT_QUALITIES = (50, 70, 90)
+DEFAULT_RESOLUTIONS = ((320, 240), (640, 480), (1280, 720))
+
+
+def summarize(samples, cpu_seconds, wall_seconds=None, sizes=None):
+    """
+    Resume as amostras de um estágio.
+    
+    Args:
+        samples: Latência de cada chamada (s)
+        cpu_seconds: CPU do processo gasta no estágio (s)
+        wall_seconds: Tempo total do estágio (padrão: soma das amostras)
+        sizes: Bytes produzidos por chamada (opcional)
+        
+    Returns:
+        dict: p50/p95/p99/média em ms, fps, CPU por frame e bytes por frame
+    """
+    latencies = np.asarray(samples, dtype=np.float64) * 1000.0
+    if wall_seconds is None:
+        wall_seconds = float(latencies.sum()) / 1000.0
+    p50, p95, p99 = np.percentile(latencies, (50, 95, 99)) if len(latencies) else (0.0, 0.0, 0.0)
+    
+    summary = {
+        "frames": len(latencies),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "mean_ms": round(float(latencies.mean()), 4) if len(latencies) else 0.0,
+        "fps": round(len(latencies) / wall_seconds, 1) if wall_seconds > 0 else 0.0,
+        "cpu_ms_per_frame": round(cpu_seconds * 1000.0 / max(1, len(latencies)), 4),
+    }
+    if sizes:
+        summary["bytes_per_frame"] = round(float(np.mean(sizes)), 1)
+    return summary
+
+
+def time_stage(fn, inputs, warmup=5, measure_bytes=False):
+    """
+    Mede `fn(x)` para cada x de `inputs`.
+    
+    Args:
+        fn: Estágio a medir
+        inputs: Entradas (uma chamada por entrada)
+        warmup: Chamadas descartadas antes de medir
+        measure_bytes: True se fn devolve os bytes produzidos (len = tamanho)
+        
+    Returns:
+        dict: Resumo (ver summarize)
+    """
+    for x in inputs[:warmup]:
+        fn(x)
+        
+    samples = []
+    sizes = []
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for x in inputs:
+        start = time.perf_counter()
+        out = fn(x)
+        samples.append(time.perf_counter() - start)
+        if measure_bytes:
+            sizes.append(len(out))
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return summarize(samples, cpu, wall, sizes)
+
+
+class LoopbackReceiver:
+    def __init__(self, fragmented=False):
+        """
+        Receptores UDP em 127.0.0.1 (portas livres) no lugar do cliente Qt:
+        um UDPFrameReceiver para o vídeo e um socket simples para os landmarks.
+        """
+        self.video = UDPFrameReceiver("127.0.0.1", 0, fragmented=fragmented)
+        self.video_port = self.video.socket.getsockname()[1]
+        
+        self.hand_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.hand_socket.bind(("127.0.0.1", 0))
+        self.hand_socket.settimeout(0.1)
+        self.hand_port = self.hand_socket.getsockname()[1]
+        
+        self.frames = 0
+        self.frame_bytes = 0
+        self.hand_packets = 0
+        # perf_counter do primeiro frame / pacote de landmarks (bench_startup)
+        self.first_frame_at = None
+        self.first_hand_at = None
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._videoLoop, daemon=True),
+                         threading.Thread(target=self._handLoop, daemon=True)]
+                         
+    def _videoLoop(self):
+        while not self._stop.is_set():
+            frame = self.video.receiveEncodedFrame(timeout=0.1)
+            if frame is not None:
+                if self.first_frame_at is None:
+                    self.first_frame_at = time.perf_counter()
+                self.frames += 1
+                self.frame_bytes += len(frame[3])
+                
+    def _handLoop(self):
+        buffer = bytearray(65535)
+        while not self._stop.is_set():
+            try:
+                self.hand_socket.recv_into(buffer)
+                if self.first_hand_at is None:
+                    self.first_hand_at = time.perf_counter()
+                self.hand_packets += 1
+            except socket.timeout:
+                pass
+                
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+        
+    def stop(self, drain=0.2):
+        """Espera os últimos datagramas chegarem e fecha os sockets."""
+        time.sleep(drain)
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self.video.close()
+        self.hand_socket.close()
+
+
+def _fake_hands(n_hands=2, seed=0):
+    """Landmarks aleatórios (mas fixos) para medir a serialização."""
+    rng = np.random.default_rng(seed)
+    landmarks = rng.random((n_hands, 21, 4), dtype=np.float32)
+    handedness = np.arange(n_hands, dtype=np.uint8) % 2
+    scores = rng.random(n_hands, dtype=np.float32)
+    return landmarks, handedness, scores
+
+
+def _serializer(wire_format):
+    """Serialização completa de um resultado (sem o cache de to_dict)."""
+    sender = LandmarkSender(wire_format=wire_format)
+    result = HandLandmarksResult()
+    landmarks, handedness, scores = _fake_hands()
+    
+    def serialize(frame_number):
+        result.reset(frame_number, time.time())
+        result.set_arrays(landmarks, handedness, scores)
+        return sender.encode_hand_data(result)
+    return serialize, sender
+
+
+def _load_hands():
+    """MediaPipe Hands ou None se não estiver instalado."""
+    try:
+        import mediapipe as mp
+    except ImportError:
+        print("⚠️ MediaPipe não instalado - estágio Hands.process ignorado")
+        return None
+    return mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2,
+                                    min_detection_confidence=0.7, min_tracking_confidence=0.5)
+
+
+def bench_stages(frames, qualities, resolutions, hands=None):
+    """Cada estágio isolado, sobre os mesmos frames."""
+    results = {}
+    height, width = frames[0].shape[:2]
+    res = f"{width}x{height}"
+    
+    print("⏱️  flip / cvtColor...")
+    results[f"flip@{res}"] = time_stage(lambda f: cv2.flip(f, 1), frames)
+    results[f"cvtColor@{res}"] = time_stage(lambda f: cv2.cvtColor(f, cv2.COLOR_BGR2RGB), frames)
+    
+    if hands is not None:
+        print("⏱️  Hands.process...")
+        rgb_frames = [cv2.cvtColor(f, cv2.COLOR_BGR2RGB) for f in frames]
+        results[f"hands_process@{res}"] = time_stage(hands.process, rgb_frames)
+        
+    print("⏱️  Serialização dos landmarks...")
+    numbers = list(range(len(frames)))
+    for wire_format in ("json", "binary"):
+        serialize, sender = _serializer(wire_format)
+        results[f"serialize_{wire_format}"] = time_stage(serialize, numbers, measure_bytes=True)
+        sender.close()
+        
+    print("⏱️  imencode...")
+    for w, h in resolutions:
+        scaled = frames if (w, h) == (width, height) else \
+            [cv2.resize(f, (w, h), interpolation=cv2.INTER_AREA) for f in frames]
+        for quality in qualities:
+            params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+            results[f"imencode_q{quality}@{w}x{h}"] = time_stage(
+                lambda f: cv2.imencode('.jpg', f, params)[1], scaled, measure_bytes=True)
+                
+    print("⏱️  Backends de codificação...")
+    for name in available_encoders():
+        encoder = create_encoder(name, 70)
+        results[f"encode_{name}@{res}"] = time_stage(encoder.encode, frames, measure_bytes=True)
+                
+    print("⏱️  sendto (loopback)...")
+    params = [int(cv2.IMWRITE_JPEG_QUALITY), 70]
+    encoded = [cv2.imencode('.jpg', f, params)[1].tobytes() for f in frames]
+    for fragmented in (False, True):
+        receiver = LoopbackReceiver(fragmented).start()
+        sender = UDPFrameSender("127.0.0.1", receiver.video_port, fragmented=fragmented)
+        name = "sendto_fragmented" if fragmented else "sendto"
+        results[f"{name}_q70@{res}"] = time_stage(
+            lambda data: data if sender.sendEncodedImage(data) else b"", encoded,
+            warmup=0, measure_bytes=True)
+        receiver.stop()
+        results[f"{name}_q70@{res}"]["delivered"] = receiver.frames
+        sender.closeSocketConnection()
+        
+    return results
+
+
+def bench_end_to_end(frames, quality, wire_format="binary", fragmented=False, hands=None):
+    """
+    Cadeia completa, frame a frame, como no HandTracker.run + sendFrame:
+    flip → cvtColor → Hands.process → serialização → sendto (landmarks)
+    → imencode → sendto (vídeo), com o receptor loopback contando o que chegou.
+    """
+    print("⏱️  Cadeia completa...")
+    receiver = LoopbackReceiver(fragmented).start()
+    video_sender = UDPFrameSender("127.0.0.1", receiver.video_port, jpeg_quality=quality,
+                                  fragmented=fragmented)
+    hand_sender = LandmarkSender("127.0.0.1", receiver.hand_port, wire_format)
+    result = HandLandmarksResult()
+    landmarks, handedness, scores = _fake_hands()
+    
+    stage_names = ("flip", "cvtColor", "hands_process", "serialize", "send_landmarks", "encode", "send_video")
+    stage_samples = {name: [] for name in stage_names}
+    totals = []
+    sizes = []
+    
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for frame_number, frame in enumerate(frames, 1):
+        marks = [time.perf_counter()]
+        frame = cv2.flip(frame, 1)
+        marks.append(time.perf_counter())
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        marks.append(time.perf_counter())
+        
+        result.reset(frame_number, time.time())
+        if hands is not None:
+            detected = hands.process(frame_rgb)
+            if detected.multi_hand_landmarks:
+                for hand_landmarks, handedness_info in zip(detected.multi_hand_landmarks,
+                                                           detected.multi_handedness):
+                    classification = handedness_info.classification[0]
+                    result.add_hand(classification.label, classification.score, hand_landmarks.landmark)
+        else:
+            # Sem MediaPipe: mãos fixas para a serialização ter o tamanho real
+            result.set_arrays(landmarks, handedness, scores)
+        marks.append(time.perf_counter())
+        
+        packet = hand_sender.encode_hand_data(result)
+        marks.append(time.perf_counter())
+        hand_sender.udp_socket.sendto(packet, (hand_sender.server_ip, hand_sender.server_port))
+        marks.append(time.perf_counter())
+        
+        data = video_sender.encodeImage(frame)
+        marks.append(time.perf_counter())
+        if data is not None:
+            video_sender.sendEncodedImage(data)
+            sizes.append(len(data) + len(packet))
+        marks.append(time.perf_counter())
+        
+        for name, start, end in zip(stage_names, marks, marks[1:]):
+            stage_samples[name].append(end - start)
+        totals.append(marks[-1] - marks[0])
+        
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    receiver.stop()
+    video_sender.closeSocketConnection()
+    hand_sender.close()
+    
+    summary = summarize(totals, cpu, wall, sizes)
+    summary["quality"] = quality
+    summary["wire_format"] = wire_format
+    summary["fragmented"] = fragmented
+    summary["frames_delivered"] = receiver.frames
+    summary["landmarks_delivered"] = receiver.hand_packets
+    summary["stages_p50_ms"] = {name: round(float(np.percentile(samples, 50)) * 1000.0, 4)
+                                for name, samples in stage_samples.items()
+                                if name != "hands_process" or hands is not None}
+    return summary
+
+
+def bench_startup(source="synthetic", modes=("eager", "background"), timeout=60.0):
+    """
+    Tempo de inicialização do VideoCapture num processo novo (imports a frio),
+    do spawn do processo até o primeiro frame e o primeiro pacote de
+    landmarks chegarem no receptor loopback, para cada model_loading.
+    
+    Returns:
+        dict: {modo: {"first_frame_s", "first_landmarks_s", "frames", "landmark_packets"}}
+    """
+    results = {}
+    for mode in modes:
+        print(f"⏱️  Inicialização (model_loading={mode})...")
+        receiver = LoopbackReceiver().start()
+        code = ("from videoCapture import VideoCapture\n"
+                f"VideoCapture(showCamera=False, source={source!r}, metrics=False, "
+                f"video_port={receiver.video_port}, hand_port={receiver.hand_port}, "
+                f"model_loading={mode!r}).initVideoCapture()")
+                
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, "-c", code],
+                                   cwd=os.path.dirname(os.path.abspath(__file__)),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = start + timeout
+        while receiver.first_hand_at is None and process.poll() is None and time.perf_counter() < deadline:
+            time.sleep(0.005)
+        process.terminate()
+        process.wait()
+        receiver.stop(drain=0)
+        
+        def since_start(mark):
+            return round(mark - start, 3) if mark is not None else None
+            
+        results[mode] = {
+            "first_frame_s": since_start(receiver.first_frame_at),
+            "first_landmarks_s": since_start(receiver.first_hand_at),
+            "frames": receiver.frames,
+            "landmark_packets": receiver.hand_packets,
+        }
+    return results
+
+
+def print_startup(results):
+    print(f"\n{'model_loading':16s} {'1º frame':>10s} {'1º landmark':>12s}")
+    for mode, row in results.items():
+        first_frame = f"{row['first_frame_s']:9.3f}s" if row["first_frame_s"] is not None else f"{'-':>10s}"
+        first_hand = f"{row['first_landmarks_s']:11.3f}s" if row["first_landmarks_s"] is not None else f"{'-':>12s}"
+        print(f"{mode:16s} {first_frame} {first_hand}")
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def save_results(results, path):
+    """Grava os resultados em JSON (path None = não grava)."""
+    if path is None:
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Resultados salvos em {path}")
+
+
+def compare(current, baseline_path):
+    """Mostra a variação de p50 e fps em relação a um resultado anterior."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+        
+    print(f"\n📊 COMPARAÇÃO COM {baseline_path} ({baseline['meta'].get('git', '?')})")
+    print(f"{'estágio':32s} {'p50 antes':>10s} {'p50 agora':>10s} {'Δ%':>8s} {'fps agora':>10s}")
+    rows = dict(current["stages"], end_to_end=current["end_to_end"])
+    old_rows = dict(baseline["stages"], end_to_end=baseline["end_to_end"])
+    for name, row in rows.items():
+        old = old_rows.get(name)
+        if old is None:
+            continue
+        delta = (row["p50_ms"] / old["p50_ms"] - 1.0) * 100.0 if old["p50_ms"] else 0.0
+        print(f"{name:32s} {old['p50_ms']:10.3f} {row['p50_ms']:10.3f} {delta:+8.1f} {row['fps']:10.1f}")
+
+
+def print_results(results):
+    print(f"\n{'estágio':32s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'fps':>9s} {'CPU/fr':>9s} {'bytes':>9s}")
+    rows = dict(results["stages"], end_to_end=results["end_to_end"])
+    for name, row in rows.items():
+        size = f"{row['bytes_per_frame']:9.0f}" if "bytes_per_frame" in row else f"{'-':>9s}"
+        print(f"{name:32s} {row['p50_ms']:9.3f} {row['p95_ms']:9.3f} {row['p99_ms']:9.3f} "
+              f"{row['fps']:9.1f} {row['cpu_ms_per_frame']:9.3f} {size}")
+    e2e = results["end_to_end"]
+    print(f"\n📦 Entregues no loopback: {e2e['frames_delivered']}/{e2e['frames']} frames, "
+          f"{e2e['landmarks_delivered']}/{e2e['frames']} pacotes de landmarks")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark captura → detecção → codificação → envio")
+    parser.add_argument("--source", default="synthetic",
+                        help="Fonte de frames: synthetic, arquivo de vídeo, diretório ou ID da câmera")
+    parser.add_argument("--frames", type=int, default=300, help="Frames por estágio")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--qualities", type=int, nargs="+", default=list(DEFAULT_QUALITIES))
+    parser.add_argument("--resolutions", nargs="+", default=[f"{w}x{h}" for w, h in DEFAULT_RESOLUTIONS],
+                        help="Resoluções do imencode (LxA)")
+    parser.add_argument("--quality", type=int, default=70, help="Qualidade JPEG da cadeia completa")
+    parser.add_argument("--wire-format", default="binary", choices=("json", "binary"))
+    parser.add_argument("--fragmented", action="store_true", help="Cadeia completa com fragmentação")
+    parser.add_argument("--no-inference", action="store_true", help="Não roda o MediaPipe")
+    parser.add_argument("--output", help="Arquivo JSON de saída (ex: benchmark_results.json, "
+                        "ignorado pelo git; padrão: não grava)")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--startup", action="store_true",
+                        help="Mede só a inicialização: tempo até o primeiro frame e o primeiro landmark")
+    args = parser.parse_args(argv)
+    
+    if args.startup:
+        print("\n" + "=" * 50)
+        print("⏱️  BENCHMARK - INICIALIZAÇÃO")
+        print("=" * 50 + "\n")
+        results = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "git": _git_revision(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "source": args.source,
+            },
+            "startup": bench_startup(args.source),
+        }
+        print_startup(results["startup"])
+        save_results(results, args.output)
+        return 0
+    
+    print("\n" + "=" * 50)
+    print("⏱️  BENCHMARK - CAPTURA → DETECÇÃO → CODIFICAÇÃO → ENVIO")
+    print("=" * 50 + "\n")
+    
+    # Frames decodificados antes: a leitura da fonte não entra nas medições
+    source = open_frame_source(args.source, args.width, args.height, realtime=False,
+                               loop=True, max_frames=args.frames)
+    if not source.isOpened():
+        print(f"❌ Não foi possível abrir a fonte {args.source}")
+        return 1
+    frames = []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            break
+        frames.append(frame)
+    source.release()
+    print(f"🎞️  {len(frames)} frames de {source.describe()}\n")
+    
+    resolutions = [tuple(int(v) for v in r.lower().split("x")) for r in args.resolutions]
+    hands = None if args.no_inference else _load_hands()
+    
+    try:
+        results = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "git": _git_revision(),
+                "python": platform.python_version(),
+                "opencv": cv2.__version__,
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "source": source.describe(),
+                "frames": len(frames),
+                "inference": hands is not None,
+            },
+            "stages": bench_stages(frames, args.qualities, resolutions, hands),
+            "end_to_end": bench_end_to_end(frames, args.quality, args.wire_format, args.fragmented, hands),
+        }
+    finally:
+        if hands is not None:
+            hands.close()
+            
+    print_results(results)
+    save_results(results, args.output)
+    
+    if args.compare:
+        compare(results, args.compare)
+    print("\n✅ Benchmark concluído\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
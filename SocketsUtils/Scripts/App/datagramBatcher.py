@@ -0,0 +1,198 @@
+import errno
+import socket
+import struct
+import sys
+import time
+
+# UDP GSO (Linux >= 4.18): um sendmsg com vários datagramas do mesmo
+# tamanho, separados pelo kernel. O Python não expõe sendmmsg; GSO é o
+# jeito de mandar um lote inteiro numa chamada de sistema.
+UDP_SEGMENT = getattr(socket, "UDP_SEGMENT", 103)
+SOL_UDP = getattr(socket, "SOL_UDP", 17)
+GSO_MAX_BYTES = 65000  # total de um lote GSO (limite de 64 KB do datagrama "grande")
+GSO_MAX_SEGMENTS = 64
+
+# Erros de buffer cheio: o datagrama é descartado (contado) em vez de virar exceção
+_BUFFER_FULL = (errno.ENOBUFS, errno.EAGAIN, errno.EWOULDBLOCK)
+
+
+class TokenBucket:
+    def __init__(self, rate_bps, burst_bytes=None):
+        """
+        Pacing por token bucket.
+        
+        Args:
+            rate_bps: Taxa média em bits/s
+            burst_bytes: Maior rajada permitida (padrão: 64 KB ou 10 ms de taxa)
+        """
+        self.rate = rate_bps / 8.0  # bytes/s
+        self.burst = burst_bytes or max(65536, int(self.rate * 0.01))
+        self.tokens = float(self.burst)
+        self._last = time.perf_counter()
+        self.waited = 0.0
+        
+    def consume(self, size):
+        """Espera até haver tokens para `size` bytes e os consome."""
+        now = time.perf_counter()
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+        
+        if self.tokens < size:
+            delay = (size - self.tokens) / self.rate
+            time.sleep(delay)
+            self.waited += delay
+            self.tokens = size
+            self._last = time.perf_counter()
+        self.tokens -= size
+
+
+class DatagramBatcher:
+    def __init__(self, sock, address, max_datagram_size, batch_size=32, pacer=None, use_gso=None):
+        """
+        Fila de datagramas enviados em lotes.
+        
+        Os datagramas (cabeçalho + payload, sem cópia) ficam na fila até
+        completar `batch_size` ou até flush(). No Linux o lote sai num
+        único sendmsg com UDP GSO; sem GSO, um sendmsg/sendto por datagrama.
+        Só o último datagrama de um lote pode ser menor que os outros, por
+        isso o sender chama flush() ao fim de cada frame.
+        
+        Args:
+            sock: Socket UDP
+            address: (ip, porta) padrão do receptor (add/flush aceitam outro)
+            max_datagram_size: Tamanho dos datagramas cheios
+            batch_size: Datagramas por lote
+            pacer: TokenBucket opcional (pacing por lote)
+            use_gso: None = detectar (Linux), True/False para forçar
+        """
+        self.sock = sock
+        self.address = address
+        self.max_datagram_size = max_datagram_size
+        self.pacer = pacer
+        self.use_gso = sys.platform.startswith("linux") if use_gso is None else use_gso
+        self.use_sendmsg = hasattr(socket.socket, "sendmsg")
+        
+        if self.use_gso:
+            batch_size = min(batch_size, GSO_MAX_SEGMENTS, GSO_MAX_BYTES // max_datagram_size)
+        self.batch_size = max(1, batch_size)
+        
+        self._queue = []
+        self._queued_bytes = 0
+        # Buffer do lote GSO, reutilizado (uma cópia, em troca de N-1 chamadas de sistema)
+        self._buffer = bytearray(self.batch_size * max_datagram_size)
+        self._view = memoryview(self._buffer)
+        self._segment = None
+        
+        # Estatísticas
+        self.syscalls = 0
+        self.datagrams = 0
+        self.batches = 0
+        self.dropped = 0
+        
+    def add(self, header, payload, address=None):
+        """
+        Enfileira um datagrama. O cabeçalho é copiado se for um buffer
+        mutável (buffers de cabeçalho costumam ser reutilizados); bytes e
+        o payload não são copiados.
+        
+        Args:
+            header: Cabeçalho do datagrama
+            payload: Dados do datagrama
+            address: Destino (padrão: self.address); a fila inteira vai
+                para o mesmo destino, então use flush() ao trocar
+        
+        Returns:
+            bool: False se um flush automático descartou datagramas
+        """
+        self._queue.append((bytes(header), payload))
+        self._queued_bytes += len(header) + len(payload)
+        if len(self._queue) >= self.batch_size:
+            return self.flush(address)
+        return True
+        
+    def _sendGso(self, queue, total, address):
+        segment = len(queue[0][0]) + len(queue[0][1])
+        offset = 0
+        for header, payload in queue:
+            end = offset + len(header)
+            self._view[offset:end] = header
+            offset, end = end, end + len(payload)
+            self._view[offset:end] = payload
+            offset = end
+            
+        if self._segment is None or self._segment[0] != segment:
+            self._segment = (segment, [(SOL_UDP, UDP_SEGMENT, struct.pack("=H", segment))])
+        self.syscalls += 1
+        return self.sock.sendmsg((self._view[:total],), self._segment[1], 0, address)
+        
+    def _sendEach(self, queue, address):
+        """Um datagrama por chamada; buffer cheio descarta só aquele datagrama."""
+        sent = 0
+        for header, payload in queue:
+            self.syscalls += 1
+            try:
+                if self.use_sendmsg:
+                    sent += self.sock.sendmsg((header, payload), (), 0, address)
+                else:
+                    sent += self.sock.sendto(header + bytes(payload), address)
+            except OSError as e:
+                if e.errno not in _BUFFER_FULL:
+                    raise
+                self.dropped += 1
+        return sent
+        
+    def flush(self, address=None):
+        """
+        Envia o que está na fila.
+        
+        Args:
+            address: Destino (padrão: self.address)
+        
+        Returns:
+            bool: True se todos os datagramas saíram
+        """
+        queue = self._queue
+        total = self._queued_bytes
+        if not queue:
+            return True
+        self._queue = []
+        self._queued_bytes = 0
+        if address is None:
+            address = self.address
+        
+        if self.pacer is not None:
+            self.pacer.consume(total)
+            
+        # GSO exige todos os segmentos do mesmo tamanho (só o último menor)
+        segment = len(queue[0][0]) + len(queue[0][1])
+        uniform = all(len(h) + len(p) == segment for h, p in queue[:-1]) and \
+            len(queue[-1][0]) + len(queue[-1][1]) <= segment
+            
+        if self.use_gso and len(queue) > 1 and uniform:
+            try:
+                sent = self._sendGso(queue, total, address)
+            except OSError as e:
+                if e.errno in _BUFFER_FULL:
+                    self.dropped += len(queue)
+                    return False
+                # Kernel/interface sem GSO: volta para um datagrama por chamada
+                print(f"⚠️ UDP GSO indisponível ({e}); enviando datagramas individualmente")
+                self.use_gso = False
+                sent = self._sendEach(queue, address)
+        else:
+            sent = self._sendEach(queue, address)
+            
+        self.batches += 1
+        self.datagrams += len(queue)
+        return sent == total
+        
+    def stats(self):
+        return {
+            "gso": self.use_gso,
+            "batch_size": self.batch_size,
+            "syscalls": self.syscalls,
+            "datagrams": self.datagrams,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "pacing_wait_s": round(self.pacer.waited, 3) if self.pacer is not None else 0.0,
+        }
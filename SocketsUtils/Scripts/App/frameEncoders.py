@@ -0,0 +1,265 @@
+import importlib.util
+import struct
+import time
+import numpy as np
+import cv2
+
+# Frame sem compressão (network byte order):
+#   magic (2s) | versão (B) | formato (B) | largura (H) | altura (H)
+#   seguido dos pixels (BGR: altura x largura x 3; I420: plano Y + U + V)
+RAW_MAGIC = b"RF"
+RAW_VERSION = 1
+RAW_BGR = 0
+RAW_I420 = 1
+RAW_HEADER = struct.Struct("!2sBBHH")
+
+
+def is_raw_frame(data):
+    """True se os bytes são um frame sem compressão (RawEncoder/YUV420Encoder)."""
+    return len(data) >= RAW_HEADER.size and data[:2] == RAW_MAGIC
+
+
+def decode_frame(data):
+    """
+    Decodifica o payload de qualquer backend: JPEG/WebP/PNG pelo
+    cv2.imdecode, frames sem compressão pelo cabeçalho RF.
+    
+    Returns:
+        numpy array BGR ou None se inválido
+    """
+    if not is_raw_frame(data):
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        
+    magic, version, fmt, width, height = RAW_HEADER.unpack_from(data)
+    pixels = np.frombuffer(data, dtype=np.uint8, offset=RAW_HEADER.size)
+    if version != RAW_VERSION:
+        return None
+    if fmt == RAW_BGR and pixels.size == width * height * 3:
+        return pixels.reshape(height, width, 3)
+    if fmt == RAW_I420 and pixels.size == width * height * 3 // 2:
+        return cv2.cvtColor(pixels.reshape(height * 3 // 2, width), cv2.COLOR_YUV2BGR_I420)
+    return None
+
+
+class FrameEncoder:
+    """
+    Interface dos backends de codificação.
+    
+    encode() devolve um objeto com buffer (bytes/memoryview) que vale até
+    a próxima chamada; `quality` só se aplica aos backends com has_quality.
+    """
+    name = "encoder"
+    has_quality = True
+    
+    def __init__(self, quality=80):
+        self.quality = quality
+        
+    @classmethod
+    def available(cls):
+        return True
+        
+    def encode(self, frame, quality=None):
+        """
+        Args:
+            frame: Frame BGR
+            quality: Sobrescreve self.quality nesta chamada
+            
+        Returns:
+            memoryview/bytes ou None se falhar
+        """
+        raise NotImplementedError
+
+
+class _OpenCVEncoder(FrameEncoder):
+    extension = ".jpg"
+    quality_flag = cv2.IMWRITE_JPEG_QUALITY
+    
+    def encode(self, frame, quality=None):
+        params = [int(self.quality_flag), self.quality if quality is None else quality]
+        result, encoded = cv2.imencode(self.extension, frame, params)
+        # Visão do buffer do imencode (sem tobytes)
+        return memoryview(encoded.reshape(-1)) if result else None
+
+
+class OpenCVJpegEncoder(_OpenCVEncoder):
+    name = "jpeg"
+
+
+class WebPEncoder(_OpenCVEncoder):
+    name = "webp"
+    extension = ".webp"
+    quality_flag = cv2.IMWRITE_WEBP_QUALITY
+
+
+class PNGEncoder(_OpenCVEncoder):
+    name = "png"
+    has_quality = False
+    
+    def __init__(self, quality=80, compression=1):
+        """PNG sem perdas; `compression` 0-9 (1: rápido, pouco menor que o raw)."""
+        super().__init__(quality)
+        self.compression = compression
+        
+    def encode(self, frame, quality=None):
+        result, encoded = cv2.imencode(".png", frame, [int(cv2.IMWRITE_PNG_COMPRESSION), self.compression])
+        return memoryview(encoded.reshape(-1)) if result else None
+
+
+class TurboJpegEncoder(FrameEncoder):
+    name = "turbojpeg"
+    
+    def __init__(self, quality=80):
+        """libjpeg-turbo via PyTurboJPEG (opcional: pip install PyTurboJPEG)."""
+        super().__init__(quality)
+        from turbojpeg import TurboJPEG
+        self._jpeg = TurboJPEG()
+        
+    @classmethod
+    def available(cls):
+        try:
+            from turbojpeg import TurboJPEG
+            TurboJPEG()
+            return True
+        except Exception:
+            return False
+            
+    def encode(self, frame, quality=None):
+        return self._jpeg.encode(frame, quality=self.quality if quality is None else quality)
+
+
+class SimpleJpegEncoder(FrameEncoder):
+    name = "simplejpeg"
+    
+    def __init__(self, quality=80):
+        """libjpeg-turbo via simplejpeg (opcional: pip install simplejpeg)."""
+        super().__init__(quality)
+        import simplejpeg
+        self._simplejpeg = simplejpeg
+        
+    @classmethod
+    def available(cls):
+        # Só procura o pacote, sem importar (a extensão carrega no __init__)
+        return importlib.util.find_spec("simplejpeg") is not None
+            
+    def encode(self, frame, quality=None):
+        return self._simplejpeg.encode_jpeg(
+            np.ascontiguousarray(frame), quality=self.quality if quality is None else quality,
+            colorspace="BGR", colorsubsampling="420", fastdct=True)
+
+
+class RawEncoder(FrameEncoder):
+    name = "raw"
+    has_quality = False
+    raw_format = RAW_BGR
+    
+    def __init__(self, quality=80):
+        """
+        Frame sem compressão (cabeçalho RF + pixels), para links locais
+        onde CPU importa mais que banda. Precisa do modo fragmentado.
+        """
+        super().__init__(quality)
+        self._buffer = None
+        
+    def _pixels(self, frame):
+        return np.ascontiguousarray(frame)
+        
+    def encode(self, frame, quality=None):
+        height, width = frame.shape[:2]
+        pixels = self._pixels(frame)
+        size = RAW_HEADER.size + pixels.nbytes
+        if self._buffer is None or len(self._buffer) != size:
+            self._buffer = bytearray(size)
+        # Buffer reutilizado: uma cópia dos pixels, sem alocar por frame
+        RAW_HEADER.pack_into(self._buffer, 0, RAW_MAGIC, RAW_VERSION, self.raw_format, width, height)
+        np.frombuffer(self._buffer, dtype=np.uint8, offset=RAW_HEADER.size)[:] = pixels.reshape(-1)
+        return memoryview(self._buffer)
+
+
+class YUV420Encoder(RawEncoder):
+    name = "yuv420"
+    raw_format = RAW_I420
+    
+    def _pixels(self, frame):
+        """Crominância 4:2:0: metade dos bytes do BGR, sem compressão."""
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420)
+
+
+ENCODERS = {cls.name: cls for cls in (OpenCVJpegEncoder, TurboJpegEncoder, SimpleJpegEncoder,
+                                      WebPEncoder, PNGEncoder, YUV420Encoder, RawEncoder)}
+
+
+def available_encoders():
+    """Nomes dos backends que funcionam nesta máquina."""
+    return [name for name, cls in ENCODERS.items() if cls.available()]
+
+
+def create_encoder(name="jpeg", quality=80):
+    """
+    Cria um backend pelo nome (ver ENCODERS).
+    
+    Raises:
+        ValueError: Nome desconhecido ou backend indisponível
+    """
+    if name not in ENCODERS:
+        raise ValueError(f"Encoder desconhecido: {name} (opções: {', '.join(ENCODERS)})")
+    if not ENCODERS[name].available():
+        raise ValueError(f"Encoder indisponível nesta máquina: {name}")
+    return ENCODERS[name](quality)
+
+
+def select_encoder(frames, byte_budget, quality=80, candidates=None, iterations=10):
+    """
+    Mede os backends disponíveis nos frames dados e escolhe o mais rápido
+    cujo maior frame cabe em `byte_budget`.
+    
+    Args:
+        frames: Frames de amostra (BGR)
+        byte_budget: Maior tamanho aceito por frame, em bytes
+        quality: Qualidade dos backends com has_quality
+        candidates: Nomes a testar (padrão: todos os disponíveis)
+        iterations: Codificações medidas por frame
+        
+    Returns:
+        tuple: (FrameEncoder escolhido, {nome: {"ms": mediana, "bytes": maior}});
+        sem nenhum dentro do orçamento, o menor resultado
+    """
+    results = {}
+    encoders = {}
+    for name in candidates or available_encoders():
+        encoder = create_encoder(name, quality)
+        encoder.encode(frames[0])  # aquecimento
+        times = []
+        largest = 0
+        for frame in frames:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                data = encoder.encode(frame)
+                times.append(time.perf_counter() - start)
+            largest = max(largest, len(data))
+        encoders[name] = encoder
+        results[name] = {"ms": round(float(np.median(times)) * 1000, 3), "bytes": largest}
+        
+    within = [name for name in results if results[name]["bytes"] <= byte_budget]
+    if within:
+        best = min(within, key=lambda name: results[name]["ms"])
+    else:
+        best = min(results, key=lambda name: results[name]["bytes"])
+    return encoders[best], results
+
+
+# Comparação standalone dos backends disponíveis
+if __name__ == "__main__":
+    from frameSource import SyntheticSource
+    
+    print("\n🧪 BACKENDS DE CODIFICAÇÃO")
+    print("=" * 50 + "\n")
+    
+    source = SyntheticSource(realtime=False, max_frames=10)
+    frames = [source.read()[1] for _ in range(10)]
+    for budget in (60000, 1 << 20):
+        encoder, results = select_encoder(frames, budget)
+        for name, result in sorted(results.items(), key=lambda item: item[1]["ms"]):
+            print(f"📦 {name:10s}: {result['ms']:7.3f} ms | {result['bytes']:7d} bytes")
+        print(f"✅ Orçamento {budget} bytes: {encoder.name}\n")
+        
+        assert decode_frame(encoder.encode(frames[0])) is not None
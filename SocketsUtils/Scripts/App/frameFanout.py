@@ -0,0 +1,209 @@
+import socket
+import threading
+import time
+
+import cv2
+from udpFrameSender import UDPFrameSender
+
+# Porta padrão do canal de inscrição (ver FrameFanout.listen)
+DEFAULT_SUBSCRIBE_PORT = 8390
+
+
+class FrameFanout:
+    def __init__(self, tiers=None, fragmented=False, subscriber_timeout=None, **sender_kwargs):
+        """
+        Envio do mesmo vídeo para vários receptores, em níveis de qualidade.
+        
+        Cada nível é um UDPFrameSender sem destino fixo: o frame é
+        codificado uma vez por nível (e só se o nível tiver receptores) e o
+        mesmo payload vai para todos os receptores daquele nível.
+        
+        Args:
+            tiers: {nome: opções} com jpeg_quality e, opcionalmente, scale
+                (fração da resolução) e outras opções do UDPFrameSender.
+                Padrão: {"high": {"jpeg_quality": 80}, "low": {"jpeg_quality": 40, "scale": 0.5}}
+            fragmented: Modo fragmentado em todos os níveis
+            subscriber_timeout: Segundos sem renovar a inscrição (listen)
+                até o receptor ser removido; None = nunca expira
+            sender_kwargs: Opções comuns dos UDPFrameSender
+        """
+        if tiers is None:
+            tiers = {"high": {"jpeg_quality": 80}, "low": {"jpeg_quality": 40, "scale": 0.5}}
+            
+        self.tiers = {}
+        self.scales = {}
+        for name, options in tiers.items():
+            options = dict(options)
+            self.scales[name] = options.pop("scale", 1.0)
+            print(f"🎚️  Nível '{name}' (escala {self.scales[name]:g})")
+            self.tiers[name] = UDPFrameSender(None, None, fragmented=fragmented,
+                                              **{**sender_kwargs, **options})
+                                              
+        self.defaultTier = next(iter(self.tiers))
+        self.subscriberTimeout = subscriber_timeout
+        self.rateController = None
+        self._listenSocket = None
+        self._listenThread = None
+        
+        # Estatísticas
+        self.framesSent = 0
+        self.framesFailed = 0
+        self.encodes = 0
+        
+    def subscribe(self, ip, port, tier=None, name=None):
+        """
+        Registra um receptor num nível (pode ser chamado com o envio rodando).
+        
+        Returns:
+            FrameSubscriber
+        """
+        tier = tier or self.defaultTier
+        if tier not in self.tiers:
+            raise ValueError(f"Nível inválido: {tier} (disponíveis: {', '.join(self.tiers)})")
+        # Um receptor fica em um nível só
+        for other, sender in self.tiers.items():
+            if other != tier:
+                sender.removeSubscriber((ip, port))
+        sender = self.tiers[tier]
+        known = any(s.address == (ip, port) for s in sender.subscribers)
+        subscriber = sender.addSubscriber(ip, port, name)
+        if not known:
+            print(f"➕ Receptor {subscriber.name} no nível '{tier}'")
+        return subscriber
+        
+    def unsubscribe(self, ip, port):
+        """
+        Remove o receptor de qualquer nível.
+        
+        Returns:
+            bool: True se estava registrado
+        """
+        removed = False
+        for sender in self.tiers.values():
+            removed = sender.removeSubscriber((ip, port)) or removed
+        if removed:
+            print(f"➖ Receptor {ip}:{port} removido")
+        return removed
+        
+    @property
+    def subscribers(self):
+        return [s for sender in self.tiers.values() for s in sender.subscribers]
+        
+    def _expire(self):
+        limit = time.monotonic() - self.subscriberTimeout
+        for sender in self.tiers.values():
+            for subscriber in sender.subscribers:
+                if subscriber.last_seen < limit:
+                    sender.removeSubscriber(subscriber)
+                    print(f"⌛ Receptor {subscriber.name} expirou")
+                    
+    def sendFrame(self, frame, timestamp=None):
+        """
+        Codifica o frame uma vez por nível com receptores e envia.
+        
+        Returns:
+            bool: True se chegou a pelo menos um receptor
+        """
+        if self.subscriberTimeout is not None:
+            self._expire()
+            
+        success = False
+        attempted = False
+        for name, sender in self.tiers.items():
+            if not sender.subscribers:
+                continue
+            attempted = True
+            scale = self.scales[name]
+            if scale != 1.0:
+                scaled = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            else:
+                scaled = frame
+            self.encodes += 1
+            success = sender.sendFrame(scaled, timestamp) or success
+            
+        if attempted:
+            if success:
+                self.framesSent += 1
+            else:
+                self.framesFailed += 1
+        return success
+        
+    def sendUnchanged(self, timestamp=None, cached=False):
+        """Heartbeat / último frame em todos os níveis (ver UDPFrameSender.sendUnchanged)."""
+        success = False
+        for sender in self.tiers.values():
+            if sender.subscribers:
+                success = sender.sendUnchanged(timestamp, cached) or success
+        return success
+        
+    @property
+    def heartbeatsSent(self):
+        return sum(sender.heartbeatsSent for sender in self.tiers.values())
+        
+    def listen(self, port=DEFAULT_SUBSCRIBE_PORT, ip="0.0.0.0"):
+        """
+        Abre o canal de inscrição: uma thread recebe comandos em texto
+        de receptores remotos. O IP do receptor é o de origem do datagrama.
+        
+            "subscribe <porta> [nível]"   (repetir para renovar)
+            "unsubscribe <porta>"
+            
+        A resposta é "ok" ou "erro: ...".
+        """
+        self._listenSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._listenSocket.bind((ip, port))
+        self._listenSocket.settimeout(0.5)
+        self._listenThread = threading.Thread(target=self._listenLoop, name="fanout-subscribe", daemon=True)
+        self._listenThread.start()
+        print(f"📡 Inscrição de receptores em udp://{ip}:{port}")
+        
+    def _listenLoop(self):
+        listen_socket = self._listenSocket
+        while self._listenSocket is not None:
+            try:
+                data, (ip, source_port) = listen_socket.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+                
+            parts = data.decode("utf-8", "replace").split()
+            try:
+                if len(parts) in (2, 3) and parts[0] == "subscribe":
+                    self.subscribe(ip, int(parts[1]), parts[2] if len(parts) == 3 else None)
+                elif len(parts) == 2 and parts[0] == "unsubscribe":
+                    self.unsubscribe(ip, int(parts[1]))
+                else:
+                    raise ValueError("comando inválido")
+                reply = b"ok"
+            except ValueError as e:
+                reply = f"erro: {e}".encode("utf-8")
+                
+            try:
+                listen_socket.sendto(reply, (ip, source_port))
+            except OSError:
+                pass
+                
+    def getStats(self):
+        """
+        Estatísticas por nível (com os receptores de cada um).
+        
+        Returns:
+            dict: Totais, codificações e getStats() de cada nível
+        """
+        return {
+            "frames_sent": self.framesSent,
+            "frames_failed": self.framesFailed,
+            "encodes": self.encodes,
+            "heartbeats_sent": self.heartbeatsSent,
+            "tiers": {name: sender.getStats() for name, sender in self.tiers.items()},
+        }
+        
+    def closeSocketConnection(self):
+        """Fecha o canal de inscrição e os sockets dos níveis."""
+        if self._listenSocket is not None:
+            listen_socket, self._listenSocket = self._listenSocket, None
+            listen_socket.close()
+            self._listenThread.join(timeout=1.0)
+        for sender in self.tiers.values():
+            sender.closeSocketConnection()
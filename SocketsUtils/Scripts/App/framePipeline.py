@@ -0,0 +1,65 @@
+import threading
+from collections import deque
+
+
+class DropOldestQueue:
+    def __init__(self, maxsize=2):
+        """
+        Fila limitada entre estágios do pipeline.
+        
+        Quando a fila está cheia, o item mais antigo é descartado para
+        dar lugar ao novo: o consumidor sempre recebe os frames mais
+        recentes e o produtor nunca bloqueia.
+        
+        Args:
+            maxsize: Número máximo de itens na fila (padrão: 2)
+        """
+        self._items = deque(maxlen=maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+        
+    def put(self, item):
+        """
+        Insere item na fila (nunca bloqueia).
+        
+        Returns:
+            bool: True se um item antigo foi descartado
+        """
+        with self._cond:
+            dropped = len(self._items) == self._items.maxlen
+            if dropped:
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+            return dropped
+            
+    def get(self, timeout=None):
+        """
+        Retira o item mais antigo da fila.
+        
+        Args:
+            timeout: Tempo máximo de espera em segundos (None = infinito)
+            
+        Returns:
+            Item da fila ou None se expirou o timeout / fila fechada
+        """
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+            
+    def close(self):
+        """Fecha a fila e acorda todos os consumidores."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            
+    @property
+    def closed(self):
+        return self._closed
+        
+    def __len__(self):
+        return len(self._items)
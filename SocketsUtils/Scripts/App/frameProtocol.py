@@ -0,0 +1,314 @@
+import struct
+import time
+from collections import OrderedDict
+
+# Cabeçalho binário de cada fragmento (network byte order):
+#   magic (2s) | versão (B) | flags (B) | frame_id (I) |
+#   índice do fragmento (H) | total de fragmentos (H) | timestamp (d)
+FRAGMENT_MAGIC = b"UF"
+FRAGMENT_VERSION = 1
+FRAGMENT_HEADER = struct.Struct("!2sBBIHHd")
+FRAGMENT_HEADER_SIZE = FRAGMENT_HEADER.size  # 20 bytes
+
+# Flags do frame (cabeçalho de fragmento)
+FRAME_FLAG_UNCHANGED = 0x01  # heartbeat: frame igual ao anterior, sem payload (ver motionGate.py)
+FRAME_FLAG_MIRRORED = 0x02   # o receptor espelha o frame na horizontal (MJPEG direto da câmera)
+
+# 1500 (MTU Ethernet) - 20 (IPv4) - 8 (UDP): evita fragmentação IP
+DEFAULT_MAX_DATAGRAM_SIZE = 1472
+MAX_FRAGMENTS = 0xFFFF
+
+
+def fragment_payload_size(max_datagram_size=DEFAULT_MAX_DATAGRAM_SIZE):
+    """Bytes de frame que cabem em cada datagrama após o cabeçalho."""
+    return max_datagram_size - FRAGMENT_HEADER_SIZE
+
+
+def fragment_chunks(data, max_datagram_size=DEFAULT_MAX_DATAGRAM_SIZE):
+    """
+    Divide o payload do frame em pedaços de um datagrama, sem copiar.
+    
+    Args:
+        data: Bytes do frame (qualquer objeto com buffer, ex: memoryview)
+        max_datagram_size: Tamanho máximo de cada datagrama
+        
+    Returns:
+        list: memoryviews do payload (um por fragmento)
+    """
+    chunk_size = fragment_payload_size(max_datagram_size)
+    view = memoryview(data)
+    chunk_count = max(1, -(-len(view) // chunk_size))
+    
+    if chunk_count > MAX_FRAGMENTS:
+        raise ValueError(f"Frame muito grande para fragmentar: {len(view)} bytes")
+        
+    return [view[start:start + chunk_size] for start in range(0, max(1, len(view)), chunk_size)]
+
+
+def pack_fragment_header(buffer, frame_id, index, count, timestamp, flags=0):
+    """Escreve o cabeçalho do fragmento no início de `buffer` (sem alocar)."""
+    FRAGMENT_HEADER.pack_into(buffer, 0, FRAGMENT_MAGIC, FRAGMENT_VERSION, flags,
+                              frame_id & 0xFFFFFFFF, index, count, timestamp)
+
+
+def pack_heartbeat(buffer, frame_id, timestamp):
+    """
+    Escreve em `buffer` um datagrama "frame inalterado": só o cabeçalho,
+    um fragmento de um, com FRAME_FLAG_UNCHANGED.
+    """
+    pack_fragment_header(buffer, frame_id, 0, 1, timestamp, FRAME_FLAG_UNCHANGED)
+
+
+def is_heartbeat(datagram):
+    """True se o datagrama é um heartbeat de frame inalterado."""
+    return (len(datagram) == FRAGMENT_HEADER_SIZE and datagram[:2] == FRAGMENT_MAGIC
+            and datagram[3] & FRAME_FLAG_UNCHANGED != 0)
+
+
+def split_frame(data, frame_id, timestamp=None, max_datagram_size=DEFAULT_MAX_DATAGRAM_SIZE, flags=0):
+    """
+    Divide um frame codificado em datagramas com cabeçalho de fragmento.
+    
+    Monta cada datagrama (cabeçalho + payload) numa cópia; o
+    UDPFrameSender usa fragment_chunks + sendmsg para evitar essa cópia.
+    
+    Args:
+        data: Bytes do frame (ex: JPEG)
+        frame_id: Identificador do frame (uint32, circular)
+        timestamp: Momento da captura (padrão: agora)
+        max_datagram_size: Tamanho máximo de cada datagrama
+        flags: Flags do frame (FRAME_FLAG_*)
+        
+    Returns:
+        list: Datagramas (bytes) prontos para envio
+    """
+    if timestamp is None:
+        timestamp = time.time()
+        
+    chunks = fragment_chunks(data, max_datagram_size)
+    header = bytearray(FRAGMENT_HEADER_SIZE)
+    datagrams = []
+    for index, chunk in enumerate(chunks):
+        pack_fragment_header(header, frame_id, index, len(chunks), timestamp, flags)
+        datagrams.append(bytes(header) + chunk)
+    return datagrams
+
+
+def parse_fragment(datagram):
+    """
+    Lê o cabeçalho de um fragmento.
+    
+    Returns:
+        tuple: (flags, frame_id, índice, total, timestamp, payload) ou None se inválido
+    """
+    if len(datagram) < FRAGMENT_HEADER_SIZE:
+        return None
+        
+    magic, version, flags, frame_id, index, count, timestamp = \
+        FRAGMENT_HEADER.unpack_from(datagram)
+        
+    if magic != FRAGMENT_MAGIC or version != FRAGMENT_VERSION or index >= count:
+        return None
+        
+    return flags, frame_id, index, count, timestamp, memoryview(datagram)[FRAGMENT_HEADER_SIZE:]
+
+
+def _is_newer(a, b):
+    """True se frame_id a é posterior a b (comparação circular uint32)."""
+    return a != b and ((a - b) & 0xFFFFFFFF) < 0x80000000
+
+
+class _PendingFrame:
+    __slots__ = ("chunks", "received", "size", "timestamp", "flags", "first_seen")
+    
+    def __init__(self, count, timestamp, flags, now):
+        self.chunks = [None] * count
+        self.received = 0
+        self.size = 0
+        self.timestamp = timestamp
+        self.flags = flags
+        self.first_seen = now
+
+
+class FrameReassembler:
+    def __init__(self, timeout=0.5, max_pending=8, max_pending_bytes=16 * 1024 * 1024, restart_window=64):
+        """
+        Remonta frames fragmentados pelo UDPFrameSender.
+        
+        Frames incompletos expiram após `timeout` segundos e no máximo
+        `max_pending` frames / `max_pending_bytes` bytes ficam em
+        remontagem ao mesmo tempo (o mais antigo é descartado).
+        Fragmentos de frames mais antigos que o último frame entregue são
+        ignorados, a não ser que o frame_id volte mais que
+        `restart_window` frames ou nada seja entregue por `timeout`
+        segundos: aí o sender reiniciou e a sequência recomeça.
+        
+        Args:
+            timeout: Tempo máximo (s) para um frame ficar incompleto
+            max_pending: Número máximo de frames em remontagem
+            max_pending_bytes: Bytes recebidos máximos em remontagem (um
+                frame fragmentado pode ter até ~95 MB)
+            restart_window: Recuo máximo do frame_id tratado como atraso
+        """
+        self.timeout = timeout
+        self.max_pending = max_pending
+        self.max_pending_bytes = max_pending_bytes
+        self.restart_window = restart_window
+        self._pending = OrderedDict()
+        self._pending_bytes = 0
+        self._last_delivered = None
+        self._last_delivered_at = None
+        
+        # Estatísticas
+        self.frames_completed = 0
+        self.frames_expired = 0
+        self.frames_evicted = 0
+        self.fragments_invalid = 0
+        self.fragments_late = 0
+        self.restarts = 0
+        
+    def feed(self, datagram, now=None):
+        """
+        Processa um datagrama recebido.
+        
+        Args:
+            datagram: Bytes recebidos do socket
+            now: Relógio atual (padrão: time.monotonic())
+            
+        Returns:
+            tuple: (frame_id, timestamp, flags, bytes) quando um frame completa, senão None
+        """
+        if now is None:
+            now = time.monotonic()
+            
+        self._expire(now)
+        
+        fragment = parse_fragment(datagram)
+        if fragment is None:
+            self.fragments_invalid += 1
+            return None
+            
+        flags, frame_id, index, count, timestamp, payload = fragment
+        
+        if self._last_delivered is not None and not _is_newer(frame_id, self._last_delivered):
+            behind = (self._last_delivered - frame_id) & 0xFFFFFFFF
+            if behind <= self.restart_window and now - self._last_delivered_at < self.timeout:
+                self.fragments_late += 1
+                return None
+            # Sender reiniciou (frame_id voltou para perto de 0): recomeça a sequência
+            self.reset()
+            self.restarts += 1
+            
+        pending = self._pending.get(frame_id)
+        if pending is None:
+            if len(self._pending) >= self.max_pending:
+                self._drop(next(iter(self._pending)))
+                self.frames_evicted += 1
+            pending = _PendingFrame(count, timestamp, flags, now)
+            self._pending[frame_id] = pending
+        elif len(pending.chunks) != count:
+            self.fragments_invalid += 1
+            return None
+            
+        if pending.chunks[index] is None:
+            pending.chunks[index] = bytes(payload)
+            pending.received += 1
+            pending.size += len(payload)
+            self._pending_bytes += len(payload)
+            
+            # Limite de memória: descarta os mais antigos (por último, o próprio frame)
+            while self._pending_bytes > self.max_pending_bytes:
+                oldest = next(iter(self._pending))
+                self._drop(oldest)
+                self.frames_evicted += 1
+                if oldest == frame_id:
+                    return None
+            
+        if pending.received < count:
+            return None
+            
+        # Frame completo: descarta frames pendentes mais antigos
+        self._drop(frame_id)
+        for old_id in [fid for fid in self._pending if not _is_newer(fid, frame_id)]:
+            self._drop(old_id)
+            self.frames_evicted += 1
+            
+        self._last_delivered = frame_id
+        self._last_delivered_at = now
+        self.frames_completed += 1
+        return frame_id, pending.timestamp, pending.flags, b"".join(pending.chunks)
+        
+    def _drop(self, frame_id):
+        """Remove um frame da remontagem, liberando seus bytes."""
+        self._pending_bytes -= self._pending.pop(frame_id).size
+        
+    def reset(self):
+        """Esquece os frames pendentes e o último frame entregue."""
+        self._pending.clear()
+        self._pending_bytes = 0
+        self._last_delivered = None
+        self._last_delivered_at = None
+        
+    def _expire(self, now):
+        """Remove frames incompletos que passaram do timeout."""
+        while self._pending:
+            frame_id, pending = next(iter(self._pending.items()))
+            if now - pending.first_seen < self.timeout:
+                break
+            self._drop(frame_id)
+            self.frames_expired += 1
+            
+    def stats(self):
+        """Retorna estatísticas da remontagem."""
+        return {
+            "frames_completed": self.frames_completed,
+            "frames_expired": self.frames_expired,
+            "frames_evicted": self.frames_evicted,
+            "fragments_invalid": self.fragments_invalid,
+            "fragments_late": self.fragments_late,
+            "restarts": self.restarts,
+            "pending": len(self._pending),
+            "pending_bytes": self._pending_bytes,
+        }
+
+
+# Teste standalone: remontagem, reinício do sender e limite de memória
+if __name__ == "__main__":
+    print("\n🧪 TESTE DO PROTOCOLO DE FRAGMENTOS")
+    print("=" * 50 + "\n")
+    
+    payload = bytes(range(256)) * 20
+    reassembler = FrameReassembler(timeout=0.5)
+    
+    # Fragmentos fora de ordem remontam o frame original
+    datagrams = split_frame(payload, 1000, timestamp=1.0)
+    for datagram in reversed(datagrams[1:]):
+        assert reassembler.feed(datagram, now=0.0) is None
+    assert reassembler.feed(datagrams[0], now=0.0) == (1000, 1.0, 0, payload)
+    
+    # Atraso pequeno dentro do timeout: ignorado
+    assert reassembler.feed(split_frame(payload, 999)[0], now=0.1) is None
+    assert reassembler.fragments_late == 1
+    
+    # Sender reiniciou (frame_id volta para 0): aceito na hora
+    for datagram in split_frame(payload, 0, timestamp=2.0):
+        result = reassembler.feed(datagram, now=0.2)
+    assert result == (0, 2.0, 0, payload) and reassembler.restarts == 1
+    
+    # Reinício com recuo pequeno: aceito depois de `timeout` sem entregas
+    for datagram in split_frame(payload, 1, timestamp=3.0):
+        reassembler.feed(datagram, now=0.3)
+    for datagram in split_frame(payload, 0, timestamp=4.0):
+        result = reassembler.feed(datagram, now=1.0)
+    assert result == (0, 4.0, 0, payload) and reassembler.restarts == 2
+    
+    # Limite de bytes: frames incompletos antigos saem antes de estourar
+    limited = FrameReassembler(max_pending_bytes=2 * len(datagrams[0]))
+    for frame_id in range(1, 6):
+        limited.feed(split_frame(payload, frame_id)[0], now=0.0)
+    assert limited._pending_bytes <= limited.max_pending_bytes
+    assert list(limited._pending) == [4, 5] and limited.frames_evicted == 3
+    
+    print(f"📊 {reassembler.stats()}")
+    print(f"📊 {limited.stats()}")
+    print("\n✅ Teste concluído\n")
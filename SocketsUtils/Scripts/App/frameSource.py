@@ -0,0 +1,402 @@
+import os
+import sys
+import time
+import numpy as np
+import cv2
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+# Decodificação JPEG já reduzida (a escala sai da IDCT, sem resize depois)
+_REDUCED_DECODE = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                   4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+def decode_mjpeg(data, scale=1):
+    """
+    Decodifica um frame MJPEG (ver FrameSource.compressed).
+    
+    Args:
+        data: Bytes do JPEG (array uint8 ou bytes)
+        scale: 1, 2, 4 ou 8: divide largura e altura
+        
+    Returns:
+        numpy array BGR ou None se inválido
+    """
+    if not isinstance(data, np.ndarray):
+        data = np.frombuffer(data, dtype=np.uint8)
+    return cv2.imdecode(data, _REDUCED_DECODE[scale])
+
+
+class _Pacer:
+    def __init__(self, fps):
+        """Espera entre leituras para manter `fps` (None/0 = sem espera)."""
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = None
+        
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.perf_counter()
+        if self._next is None or now - self._next > self.interval:
+            # Primeiro frame ou atraso grande: recomeça sem tentar compensar
+            self._next = now
+        elif self._next > now:
+            time.sleep(self._next - now)
+        self._next += self.interval
+
+
+class FrameSource:
+    """
+    Interface comum das fontes de frames.
+    
+    Segue o subconjunto de cv2.VideoCapture usado pelos loops de captura
+    (isOpened/read/release), mais width/height/fps já resolvidos.
+    
+    Com `compressed` True, read() devolve o JPEG da fonte (array uint8
+    1-D) em vez do frame BGR (ver decode_mjpeg).
+    """
+    name = "source"
+    compressed = False
+    
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self.fps = 0.0
+        self.frames_read = 0
+        
+    def isOpened(self):
+        raise NotImplementedError
+        
+    def read(self):
+        """Retorna (ret, frame) como cv2.VideoCapture.read."""
+        raise NotImplementedError
+        
+    def release(self):
+        pass
+        
+    def describe(self):
+        return f"{self.name} {self.width}x{self.height} @ {self.fps:.0f} fps"
+
+
+class CameraSource(FrameSource):
+    name = "câmera"
+    
+    def __init__(self, device_id=0, width=640, height=480, fps=30, mjpeg=False):
+        """
+        Câmera ao vivo. Usa DirectShow no Windows e o backend padrão
+        do OpenCV nos outros sistemas (V4L2 no Linux).
+        
+        Args:
+            mjpeg: True para pedir MJPEG à câmera e entregar os bytes
+                comprimidos sem decodificar (compressed); se a câmera ou o
+                backend não entregarem MJPEG, volta aos frames BGR
+        """
+        super().__init__()
+        if sys.platform == "win32":
+            self.cap = cv2.VideoCapture(device_id, cv2.CAP_DSHOW)
+        else:
+            self.cap = cv2.VideoCapture(device_id)
+            
+        if self.cap.isOpened():
+            if mjpeg:
+                # O FOURCC vai antes da resolução (alguns drivers só aceitam nessa ordem)
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*"MJPG"))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+            self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or fps
+            if mjpeg:
+                self.compressed = self._enableMJPEG()
+                
+    def _enableMJPEG(self):
+        """Desliga a conversão para BGR e confere se a leitura é um JPEG."""
+        self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        ret, frame = self.cap.read()
+        if ret and frame is not None and frame.size > 2 and (frame.ndim == 1 or frame.shape[0] == 1):
+            data = frame.reshape(-1)
+            if data[0] == 0xFF and data[1] == 0xD8:
+                self.name = "câmera MJPEG"
+                return True
+        print("⚠️ A câmera não entregou MJPEG - usando frames BGR")
+        self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+        return False
+            
+    def isOpened(self):
+        return self.cap.isOpened()
+        
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret:
+            self.frames_read += 1
+            if self.compressed:
+                # V4L2/DirectShow devolvem o JPEG como uma linha (1 x N)
+                frame = frame.reshape(-1)
+        return ret, frame
+        
+    def release(self):
+        self.cap.release()
+
+
+class _ReplaySource(FrameSource):
+    def __init__(self, fps, realtime, loop, max_frames):
+        """
+        Base das fontes gravadas/sintéticas.
+        
+        Args:
+            fps: Taxa nominal dos frames
+            realtime: True para entregar na taxa `fps`; False para entregar
+                o mais rápido possível (medição de throughput)
+            loop: True para recomeçar do início ao chegar no fim
+            max_frames: Para depois de N frames (None = sem limite)
+        """
+        super().__init__()
+        self.fps = fps
+        self.loop = loop
+        self.max_frames = max_frames
+        self._pacer = _Pacer(fps if realtime else None)
+        self._opened = True
+        
+    def isOpened(self):
+        return self._opened
+        
+    def _next_frame(self):
+        """Próximo frame ou None no fim da fonte."""
+        raise NotImplementedError
+        
+    def _rewind(self):
+        raise NotImplementedError
+        
+    def read(self):
+        if not self._opened or (self.max_frames is not None and self.frames_read >= self.max_frames):
+            return False, None
+            
+        frame = self._next_frame()
+        if frame is None and self.loop and self.frames_read > 0:
+            self._rewind()
+            frame = self._next_frame()
+        if frame is None:
+            return False, None
+            
+        self._pacer.wait()
+        self.frames_read += 1
+        return True, frame
+        
+    def release(self):
+        self._opened = False
+
+
+class VideoFileSource(_ReplaySource):
+    name = "vídeo"
+    
+    def __init__(self, path, realtime=True, loop=False, max_frames=None, preload=False, fps=None):
+        """
+        Arquivo de vídeo gravado.
+        
+        Args:
+            path: Caminho do arquivo
+            preload: True para decodificar tudo para a memória antes (a
+                leitura deixa de custar decodificação - útil para medir
+                codificação/inferência/envio isoladamente)
+            fps: Sobrescreve o FPS do arquivo
+        """
+        cap = cv2.VideoCapture(path)
+        super().__init__(fps or cap.get(cv2.CAP_PROP_FPS) or 30, realtime, loop, max_frames)
+        self.name = f"vídeo {os.path.basename(path)}"
+        self.cap = cap
+        self._frames = None
+        self._index = 0
+        
+        if not cap.isOpened():
+            self._opened = False
+            return
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        
+        if preload:
+            self._frames = []
+            while max_frames is None or len(self._frames) < max_frames:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                self._frames.append(frame)
+            cap.release()
+            
+    def _next_frame(self):
+        if self._frames is not None:
+            if self._index >= len(self._frames):
+                return None
+            frame = self._frames[self._index]
+            self._index += 1
+            return frame
+        ret, frame = self.cap.read()
+        return frame if ret else None
+        
+    def _rewind(self):
+        if self._frames is not None:
+            self._index = 0
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageDirectorySource(_ReplaySource):
+    name = "imagens"
+    
+    def __init__(self, path, fps=30, realtime=True, loop=False, max_frames=None, preload=True):
+        """
+        Diretório de imagens, lidas em ordem alfabética.
+        
+        Args:
+            path: Diretório com .jpg/.png/.bmp
+            preload: True para carregar todas as imagens na abertura
+        """
+        super().__init__(fps, realtime, loop, max_frames)
+        self.name = f"imagens {path}"
+        self._paths = sorted(os.path.join(path, f) for f in os.listdir(path)
+                             if f.lower().endswith(IMAGE_EXTENSIONS))
+        self._frames = [cv2.imread(p) for p in self._paths] if preload else None
+        self._index = 0
+        
+        first = self._frames[0] if self._frames else (cv2.imread(self._paths[0]) if self._paths else None)
+        if first is None:
+            self._opened = False
+            return
+        self.height, self.width = first.shape[:2]
+        
+    def _next_frame(self):
+        while self._index < len(self._paths):
+            index = self._index
+            self._index += 1
+            frame = self._frames[index] if self._frames is not None else cv2.imread(self._paths[index])
+            if frame is not None:
+                return frame
+        return None
+        
+    def _rewind(self):
+        self._index = 0
+
+
+class SyntheticSource(_ReplaySource):
+    name = "sintética"
+    
+    def __init__(self, width=640, height=480, fps=30, realtime=True, max_frames=None, seed=0):
+        """
+        Gerador determinístico: fundo fixo com ruído suave + um círculo
+        em movimento. A mesma seed gera a mesma sequência de frames.
+        """
+        super().__init__(fps, realtime, loop=False, max_frames=max_frames)
+        self.width = width
+        self.height = height
+        
+        rng = np.random.default_rng(seed)
+        noise = (rng.random((height, width, 3)) * 255).astype(np.uint8)
+        self._background = cv2.GaussianBlur(noise, (0, 0), 5)
+        self._index = 0
+        
+    def _next_frame(self):
+        i = self._index
+        self._index += 1
+        frame = self._background.copy()
+        radius = max(8, self.height // 12)
+        x = radius + (i * 4) % max(1, self.width - 2 * radius)
+        y = self.height // 2 + int(self.height // 4 * np.sin(i / 15.0))
+        cv2.circle(frame, (x, y), radius, (60, 180, 255), -1)
+        cv2.putText(frame, f"#{i}", (10, self.height - 10), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.7, (255, 255, 255), 2)
+        return frame
+        
+    def _rewind(self):
+        self._index = 0
+
+
+class MJPEGSource(FrameSource):
+    def __init__(self, source, quality=90):
+        """
+        Emula uma câmera MJPEG sobre outra fonte (testes e benchmark sem
+        câmera): cada frame sai comprimido, como o compressed da CameraSource.
+        
+        Args:
+            source: FrameSource com frames BGR
+            quality: Qualidade JPEG dos frames "da câmera"
+        """
+        super().__init__()
+        self.source = source
+        self.name = f"{source.name} (MJPEG)"
+        self.width = source.width
+        self.height = source.height
+        self.fps = source.fps
+        self.compressed = True
+        self._params = [int(cv2.IMWRITE_JPEG_QUALITY), quality]
+        
+    def isOpened(self):
+        return self.source.isOpened()
+        
+    def read(self):
+        ret, frame = self.source.read()
+        if not ret:
+            return False, None
+        ok, encoded = cv2.imencode(".jpg", frame, self._params)
+        if not ok:
+            return False, None
+        self.frames_read += 1
+        return True, encoded.reshape(-1)
+        
+    def release(self):
+        self.source.release()
+
+
+def open_frame_source(source=0, width=640, height=480, fps=30, realtime=True, loop=False,
+                      max_frames=None, mjpeg=False):
+    """
+    Abre a fonte de frames a partir de uma descrição simples.
+    
+    Args:
+        source: int (ID da câmera), "synthetic" (gerador), caminho de um
+            diretório (imagens) ou de um arquivo de vídeo. Uma instância de
+            FrameSource é devolvida como está.
+        width, height, fps: Resolução/FPS pedidos (câmera e sintética)
+        realtime: False para fontes gravadas/sintéticas entregarem frames
+            o mais rápido possível
+        loop: Repetir vídeo/imagens ao chegar no fim
+        max_frames: Limite de frames (fontes gravadas/sintéticas)
+        mjpeg: True para frames comprimidos (compressed): MJPEG nativo da
+            câmera ou, nas outras fontes, MJPEGSource
+        
+    Returns:
+        FrameSource
+    """
+    if isinstance(source, FrameSource):
+        return source
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        return CameraSource(int(source), width, height, fps, mjpeg)
+    if source == "synthetic":
+        opened = SyntheticSource(width, height, fps, realtime, max_frames)
+    elif os.path.isdir(source):
+        opened = ImageDirectorySource(source, fps, realtime, loop, max_frames)
+    else:
+        opened = VideoFileSource(source, realtime, loop, max_frames)
+    return MJPEGSource(opened) if mjpeg else opened
+
+
+# Teste standalone: throughput de leitura das fontes sem câmera
+if __name__ == "__main__":
+    print("\n🧪 TESTE DAS FONTES DE FRAMES")
+    print("=" * 50 + "\n")
+    
+    for realtime in (True, False):
+        source = open_frame_source("synthetic", realtime=realtime, max_frames=60)
+        start = time.perf_counter()
+        while source.read()[0]:
+            pass
+        elapsed = time.perf_counter() - start
+        mode = "tempo real" if realtime else "máxima velocidade"
+        print(f"📊 {source.describe()} ({mode}): {source.frames_read} frames "
+              f"em {elapsed:.2f}s ({source.frames_read / elapsed:.1f} fps)")
+        source.release()
+        
+    print("\n✅ Teste concluído\n")
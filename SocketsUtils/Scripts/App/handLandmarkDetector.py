@@ -1,81 +1,242 @@
 import cv2
-import mediapipe as mp
-import json
-import socket
+import threading
 import time
+import numpy as np
+from handLandmarks import HandLandmarksResult
+from handROI import HandROI
+from landmarkSender import LandmarkSender
+from landmarkRecorder import LandmarkRecorder
+from frameSource import open_frame_source
+from previewWindow import PreviewWindow
+from metrics import MetricsRegistry, MetricsReporter, ConsoleSink
 
 class HandTracker:
-    def __init__(self, cameraDeviceID=0, showCamera=True):
+    def __init__(self, cameraDeviceID=0, showCamera=True, wire_format="json",
+                 server_ip="127.0.0.1", server_port=8384, source=None, realtime=True, metrics=True,
+                 roi=False, roi_padding=0.5, model_loading="eager", record_path=None, preview_fps=15,
+                 feedback=False):
         """
         Hand Tracker com MediaPipe + envio UDP dos landmarks.
         
         Args:
             cameraDeviceID: ID da câmera
-            showCamera: Mostrar janela de debug
+            showCamera: Mostrar janela de debug em run() (numa thread própria,
+                ver previewWindow.py)
+            wire_format: "json" (padrão) ou "binary" (ver landmarkProtocol.py)
+            server_ip: IP do receptor dos landmarks
+            server_port: Porta UDP dos landmarks (padrão: 8384)
+            source: Fonte de frames de run() (ver frameSource.py);
+                None = câmera cameraDeviceID
+            realtime: False para fontes gravadas entregarem os frames
+                o mais rápido possível
+            metrics: True/False ou um MetricsRegistry para as estatísticas
+                de run() (ver metrics.py)
+            roi: True para rodar a detecção só num recorte em volta das mãos
+                do frame anterior (ver handROI.py); sem mãos, frame inteiro
+            roi_padding: Margem do recorte, em fração do tamanho das mãos
+            model_loading: Quando importar o MediaPipe e montar o Hands:
+                "eager" (aqui, no construtor), "background" (numa thread;
+                process_hands espera ficar pronto) ou "lazy" (no primeiro
+                process_hands)
+            record_path: Arquivo onde gravar tudo o que send_hand_data envia
+                (ver landmarkRecorder.py); None = sem gravação
+            preview_fps: Limite de redesenhos por segundo da janela de debug
+            feedback: True para ler os relatórios do receptor dos landmarks
+                (entrega real, jitter e latência; ver receiverFeedback.py)
         """
         print("=" * 60)
         print("🖐️  HAND TRACKER - MediaPipe + UDP")
         print("=" * 60)
         
         self.deviceCamID = cameraDeviceID
+        self.source = cameraDeviceID if source is None else source
+        self.realtime = realtime
         self.debugCamera = showCamera
+        self.previewFps = preview_fps
+        self.wire_format = wire_format
         
-        # Inicializa MediaPipe Hands
-        print("\n🤖 Inicializando MediaPipe...")
-        self.mp_hands = mp.solutions.hands
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.mp_drawing_styles = mp.solutions.drawing_styles
+        if model_loading not in ("eager", "background", "lazy"):
+            raise ValueError(f"model_loading inválido: {model_loading}")
         
         # Configurações do detector
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=2,              # Detecta até 2 mãos
-            min_detection_confidence=0.7,  # Confiança mínima para detecção
-            min_tracking_confidence=0.5    # Confiança mínima para tracking
-        )
+        self.max_num_hands = 2
+        self.roi = HandROI(padding=roi_padding) if roi else None
         
-        print("✅ MediaPipe Hands inicializado")
-        print(f"   • Máximo de mãos: 2")
-        print(f"   • Confiança de detecção: 0.7")
-        print(f"   • Confiança de tracking: 0.5")
+        # MediaPipe (import de ~1 s + montagem do grafo) sai do caminho de
+        # inicialização: carregado por load_model()
+        self.mp_hands = None
+        self.hands = None
+        self.roi_hands = None
+        self.model_error = None
+        self.model_load_seconds = None
+        self.model_ready = threading.Event()
+        self._model_lock = threading.Lock()
+        self._model_thread = None
+            
+        if model_loading == "eager":
+            self.load_model()
+        elif model_loading == "background":
+            print("\n🤖 MediaPipe carregando em background...")
+            self._model_thread = threading.Thread(target=self._loadModelBackground,
+                                                  name="model-warmup", daemon=True)
+            self._model_thread.start()
+        
+        # Métricas de run(): impressas por uma thread, fora do loop
+        self.metrics = metrics if isinstance(metrics, MetricsRegistry) else MetricsRegistry(enabled=bool(metrics))
+        self.metrics.add_collector(self._collectMetrics)
         
         # Socket UDP para enviar landmarks
         print("\n🔌 Configurando UDP...")
-        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.server_ip = "127.0.0.1"
-        self.server_port = 8384  # Porta diferente do vídeo
+        self.sender = LandmarkSender(server_ip, server_port, wire_format, feedback=feedback, metrics=self.metrics)
+        self.recorder = None
+        if record_path is not None:
+            self.recorder = LandmarkRecorder(record_path, self.max_num_hands)
+            print(f"⏺️  Gravando landmarks em {record_path}")
+        self.udp_socket = self.sender.udp_socket
+        self.server_ip = server_ip
+        self.server_port = server_port  # Porta diferente do vídeo
         
         print(f"✅ UDP configurado: {self.server_ip}:{self.server_port}")
+        print(f"   • Formato: {self.wire_format}")
+        if feedback:
+            print("   • Canal de retorno: relatórios do receptor no socket de envio")
         
         # Estatísticas
         self.frame_count = 0
         self.hands_detected_count = 0
         self.packets_sent = 0
+        self.roi_frames = 0
+        self.roi_fallbacks = 0
         
-    def process_hands(self, frame):
+        # Buffer de landmarks reutilizado a cada frame
+        self.result = HandLandmarksResult(self.max_num_hands)
+        
+    def _createHands(self, static_image_mode=False):
+        return self.mp_hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=self.max_num_hands,  # Detecta até 2 mãos
+            min_detection_confidence=0.7,  # Confiança mínima para detecção
+            min_tracking_confidence=0.5    # Confiança mínima para tracking
+        )
+        
+    def load_model(self):
+        """
+        Importa o MediaPipe e monta o Hands (e o da ROI), já aquecido.
+        
+        Seguro de chamar de qualquer thread e mais de uma vez.
+        """
+        with self._model_lock:
+            if self.hands is not None:
+                return
+                
+            print("\n🤖 Inicializando MediaPipe...")
+            start = time.perf_counter()
+            import mediapipe as mp
+            self.mp_hands = mp.solutions.hands
+            
+            # Modo ROI: instância separada, para o tracking interno do MediaPipe
+            # do recorte não se misturar com o do frame inteiro. O frame inteiro
+            # só roda sem mãos, no fallback ou no refresh (entre eles a ROI
+            # assume): modo estático, sem tracking de frames antigos
+            hands = self._createHands(static_image_mode=self.roi is not None)
+            roi_hands = self._createHands() if self.roi is not None else None
+            
+            # O primeiro process() inicializa o grafo (~100 ms): feito aqui,
+            # com um frame vazio, e não no primeiro frame da câmera
+            blank = np.zeros((240, 320, 3), dtype=np.uint8)
+            hands.process(blank)
+            if roi_hands is not None:
+                roi_hands.process(blank)
+                
+            self.roi_hands = roi_hands
+            self.hands = hands
+            self.model_load_seconds = time.perf_counter() - start
+            self.model_ready.set()
+            
+        print(f"✅ MediaPipe Hands inicializado em {self.model_load_seconds:.2f} s")
+        print(f"   • Máximo de mãos: 2")
+        print(f"   • Confiança de detecção: 0.7")
+        print(f"   • Confiança de tracking: 0.5")
+        print(f"   • ROI: {'ligada' if self.roi is not None else 'desligada'}")
+        
+    def _loadModelBackground(self):
+        try:
+            self.load_model()
+        except Exception as e:
+            self.model_error = e
+            print(f"❌ ERRO ao carregar o MediaPipe: {e}")
+        finally:
+            # Acorda quem espera em process_hands mesmo se falhou
+            self.model_ready.set()
+            
+    @property
+    def ready(self):
+        """True se o modelo está carregado (process_hands não bloqueia)."""
+        return self.hands is not None
+        
+    def process_hands(self, frame, frame_number=None, timestamp=None):
         """
         Processa frame e detecta mãos.
         
+        Args:
+            frame: Frame OpenCV (numpy array BGR)
+            frame_number: Número do frame na captura (padrão: frame_count)
+            timestamp: Momento da captura (padrão: agora)
+        
         Returns:
-            tuple: (frame_anotado, dados_json)
+            tuple: (frame, HandLandmarksResult); o frame não é anotado (a
+            janela de debug desenha os landmarks na thread dela)
+            
+            O resultado é um buffer reutilizado (válido até a próxima
+            chamada). resultado["hands"] / to_dict() montam a visão em
+            dicionário do JSON sob demanda.
+            
+        Raises:
+            RuntimeError: O carregamento do MediaPipe em background falhou
         """
-        # Converte BGR para RGB (MediaPipe usa RGB)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Processa frame
-        results = self.hands.process(frame_rgb)
+        if self.hands is None:
+            if self._model_thread is not None:
+                self.model_ready.wait()
+                if self.hands is None:
+                    raise RuntimeError(f"MediaPipe indisponível: {self.model_error}")
+            else:
+                self.load_model()
+                
+        # Prepara buffer para o frame (sem realocar)
+        hands_data = self.result
+        n_hands_last = hands_data.n_hands
         
-        # Prepara dados para enviar
-        hands_data = {
-            "timestamp": time.time(),
-            "frame_number": self.frame_count,
-            "hands_detected": 0,
-            "hands": []
-        }
+        # Modo ROI: só o recorte em volta das mãos do frame anterior
+        box = self.roi.region(n_hands_last, self.max_num_hands) if self.roi is not None else None
+        target = frame
+        results = None
+        if box is not None:
+            x0, y0, x1, y1 = box
+            target = frame[y0:y1, x0:x1]
+            results = self.roi_hands.process(cv2.cvtColor(target, cv2.COLOR_BGR2RGB))
+            if results.multi_hand_landmarks:
+                self.roi_frames += 1
+            else:
+                # Tracking perdido no recorte: volta ao frame inteiro neste mesmo frame
+                self.roi_fallbacks += 1
+                self.roi.reset()
+                box = None
+                target = frame
+                results = None
+                
+        if results is None:
+            # Converte BGR para RGB (MediaPipe usa RGB)
+            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            
+            # Processa frame
+            results = self.hands.process(frame_rgb)
+            
+        hands_data.reset(
+            self.frame_count if frame_number is None else frame_number,
+            time.time() if timestamp is None else timestamp)
         
         # Se detectou mãos
         if results.multi_hand_landmarks:
-            hands_data["hands_detected"] = len(results.multi_hand_landmarks)
             self.hands_detected_count += 1
             
             # Para cada mão detectada
@@ -85,100 +246,117 @@ class HandTracker:
                 hand_label = handedness.label  # "Left" ou "Right"
                 hand_score = handedness.score
                 
-                # Extrai landmarks (21 pontos)
-                landmarks = []
-                for landmark in hand_landmarks.landmark:
-                    landmarks.append({
-                        "x": landmark.x,      # Normalizado 0-1
-                        "y": landmark.y,      # Normalizado 0-1
-                        "z": landmark.z,      # Profundidade relativa
-                        "visibility": landmark.visibility
-                    })
+                # Extrai landmarks (21 pontos: x, y, z, visibility)
+                idx = hands_data.add_hand(hand_label, hand_score, hand_landmarks.landmark)
+                if box is not None and idx >= 0:
+                    # Coordenadas do recorte -> frame inteiro
+                    self.roi.map_to_frame(hands_data.hand_landmarks(idx), frame.shape, box)
                 
-                # Adiciona mão aos dados
-                hands_data["hands"].append({
-                    "hand_index": hand_idx,
-                    "label": hand_label,
-                    "confidence": hand_score,
-                    "landmarks": landmarks
-                })
-                
-                # Desenha landmarks no frame (para debug)
-                if self.debugCamera:
-                    self.mp_drawing.draw_landmarks(
-                        frame,
-                        hand_landmarks,
-                        self.mp_hands.HAND_CONNECTIONS,
-                        self.mp_drawing_styles.get_default_hand_landmarks_style(),
-                        self.mp_drawing_styles.get_default_hand_connections_style()
-                    )
-                    
-                    # Adiciona texto com label da mão
-                    h, w, _ = frame.shape
-                    cx = int(hand_landmarks.landmark[0].x * w)
-                    cy = int(hand_landmarks.landmark[0].y * h)
-                    cv2.putText(frame, f"{hand_label} ({hand_score:.2f})", 
-                               (cx - 50, cy - 20),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, 
-                               (0, 255, 0), 2)
         
+        if self.roi is not None:
+            self.roi.update(hands_data.landmarks, frame.shape)
+            
         return frame, hands_data
+        
+    def close_hands(self):
+        """Fecha as instâncias do MediaPipe (espera o carregamento em andamento)."""
+        if self._model_thread is not None:
+            self._model_thread.join()
+        with self._model_lock:
+            if self.hands is not None:
+                self.hands.close()
+                self.hands = None
+            if self.roi_hands is not None:
+                self.roi_hands.close()
+                self.roi_hands = None
+        
+    def encode_hand_data(self, hands_data):
+        """
+        Serializa os dados das mãos no formato configurado.
+        
+        Args:
+            hands_data: HandLandmarksResult ou dicionário no formato do JSON
+            
+        Returns:
+            bytes: Pacote JSON (UTF-8) ou binário
+        """
+        return self.sender.encode_hand_data(hands_data)
     
     def send_hand_data(self, hands_data):
         """
-        Envia dados das mãos via UDP (JSON).
+        Envia dados das mãos via UDP (JSON ou binário, conforme wire_format).
         
         Args:
-            hands_data: Dicionário com dados das mãos
+            hands_data: HandLandmarksResult (ou dicionário) com dados das mãos
             
         Returns:
             bool: True se enviado com sucesso
         """
-        try:
-            # Converte para JSON
-            json_data = json.dumps(hands_data)
-            json_bytes = json_data.encode('utf-8')
-            
-            # Verifica tamanho (UDP tem limite)
-            if len(json_bytes) > 60000:
-                print(f"⚠️ Dados muito grandes: {len(json_bytes)} bytes")
-                return False
-            
-            # Envia via UDP
-            self.udp_socket.sendto(json_bytes, (self.server_ip, self.server_port))
-            self.packets_sent += 1
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erro ao enviar dados: {e}")
-            return False
+        sent = self.sender.send_hand_data(hands_data)
+        self.packets_sent = self.sender.packets_sent
+        
+        # A gravação nunca atrapalha o envio
+        if self.recorder is not None:
+            try:
+                self.recorder.append(hands_data)
+            except ValueError as e:
+                print(f"⚠️ Frame não gravado: {e}")
+        return sent
+        
+    def close_recorder(self):
+        """Fecha a gravação dos landmarks (se houver)."""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
     
+    def _collectMetrics(self, metrics):
+        metrics.gauge("hands.detected_frames").set(self.hands_detected_count)
+        metrics.gauge("landmarks.packets_sent").set(self.packets_sent)
+        if self.roi is not None:
+            metrics.gauge("roi.frames").set(self.roi_frames)
+            metrics.gauge("roi.fallbacks").set(self.roi_fallbacks)
+        
+    def _formatStats(self, snapshot, rates):
+        """Linha de estatísticas (saída do ConsoleSink)."""
+        frames = snapshot["counters"].get("capture.frames", 0)
+        detected = snapshot["gauges"].get("hands.detected_frames", 0)
+        detection_rate = (detected / frames * 100) if frames > 0 else 0
+        inference = snapshot["histograms"].get("inference", {})
+        roi = ""
+        if self.roi is not None:
+            roi = f" | ROI: {snapshot['gauges'].get('roi.frames', 0)} (fallbacks: {snapshot['gauges'].get('roi.fallbacks', 0)})"
+        if "feedback.landmarks.delivery" in snapshot["gauges"]:
+            roi += f" | Entregues: {snapshot['gauges']['feedback.landmarks.delivery']:.1%}"
+        return (f"📊 Frames: {frames} | "
+                f"Detecções: {detected} | "
+                f"Taxa: {detection_rate:.1f}% | "
+                f"FPS: {rates.get('capture.frames', 0.0):.1f} | "
+                f"Inferência p50/p95: {inference.get('p50_ms', 0):g}/{inference.get('p95_ms', 0):g} ms | "
+                f"Pacotes: {snapshot['gauges'].get('landmarks.packets_sent', 0)}{roi}")
+                
     def run(self):
         """Inicia o loop de captura e detecção."""
-        print(f"\n📷 Abrindo câmera {self.deviceCamID}...")
+        print(f"\n📷 Abrindo fonte {self.source}...")
         
-        # Abre câmera
-        cap = cv2.VideoCapture(self.deviceCamID, cv2.CAP_DSHOW)
+        # Abre câmera (ou fonte gravada/sintética)
+        cap = open_frame_source(self.source, width=640, height=480, realtime=self.realtime)
         
         if not cap.isOpened():
             print("❌ ERRO: Não foi possível abrir a câmera!")
             return
         
-        # Configurações
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        
-        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        
-        print(f"✅ Câmera aberta: {width}x{height}")
+        print(f"✅ Fonte aberta: {cap.describe()}")
         print(f"\n{'='*60}")
         print("🚀 INICIANDO DETECÇÃO DE MÃOS")
         print("⏸️  Pressione ESC para parar")
-        print("📊 Estatísticas a cada 30 frames")
+        print("📊 Estatísticas a cada segundo")
         print(f"{'='*60}\n")
         
-        start_time = time.time()
+        frames = self.metrics.counter("capture.frames")
+        inference = self.metrics.histogram("inference")
+        landmark_send = self.metrics.histogram("landmark_send")
+        reporter = MetricsReporter(self.metrics, [ConsoleSink(self._formatStats)]).start()
+        preview = PreviewWindow('Hand Tracking - Pressione ESC', self.previewFps).start() if self.debugCamera else None
         
         try:
             while cap.isOpened():
@@ -189,37 +367,24 @@ class HandTracker:
                     break
                 
                 self.frame_count += 1
+                frames.inc()
                 
                 # Processa mãos
-                annotated_frame, hands_data = self.process_hands(frame)
+                start = time.perf_counter()
+                frame, hands_data = self.process_hands(frame)
+                inference.observe_since(start)
                 
                 # Envia dados via UDP
+                start = time.perf_counter()
                 self.send_hand_data(hands_data)
+                landmark_send.observe_since(start)
                 
-                # Estatísticas a cada 30 frames
-                if self.frame_count % 30 == 0:
-                    elapsed = time.time() - start_time
-                    fps = self.frame_count / elapsed if elapsed > 0 else 0
-                    detection_rate = (self.hands_detected_count / self.frame_count * 100) if self.frame_count > 0 else 0
-                    
-                    print(f"📊 Frames: {self.frame_count} | "
-                          f"Detecções: {self.hands_detected_count} | "
-                          f"Taxa: {detection_rate:.1f}% | "
-                          f"FPS: {fps:.1f} | "
-                          f"Pacotes: {self.packets_sent}")
-                
-                # Mostra janela de debug
-                if self.debugCamera:
-                    # Adiciona informações na tela
-                    info_frame = annotated_frame.copy()
-                    cv2.putText(info_frame, f"Frames: {self.frame_count}", 
-                               (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                    cv2.putText(info_frame, f"Maos detectadas: {hands_data['hands_detected']}", 
-                               (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-                    
-                    cv2.imshow('Hand Tracking - Pressione ESC', info_frame)
-                    
-                    if cv2.waitKey(1) & 0xFF == 27:  # ESC
+                # Janela de debug: só entrega frame e landmarks (desenho na thread dela)
+                if preview is not None:
+                    preview.show_landmarks(hands_data)
+                    preview.show_frame(frame, (f"Frames: {self.frame_count}",
+                                               f"Maos detectadas: {hands_data.n_hands}"))
+                    if preview.closed.is_set():
                         print("\n⏹️  ESC pressionado - Encerrando...")
                         break
                         
@@ -237,16 +402,24 @@ class HandTracker:
             print("🧹 LIMPANDO RECURSOS")
             print("=" * 60)
             
+            reporter.stop()
+            if preview is not None:
+                preview.stop()
             cap.release()
-            cv2.destroyAllWindows()
-            self.hands.close()
-            self.udp_socket.close()
+            self.close_hands()
+            self.close_recorder()
+            self.sender.close()
             
             # Estatísticas finais
             print(f"\n📈 ESTATÍSTICAS FINAIS:")
             print(f"   • Total de frames: {self.frame_count}")
             print(f"   • Frames com mãos detectadas: {self.hands_detected_count}")
             print(f"   • Pacotes UDP enviados: {self.packets_sent}")
+            if self.sender.feedback is not None:
+                for line in self.sender.feedback.summary():
+                    print(f"   • {line}")
+            if self.roi is not None:
+                print(f"   • Frames na ROI: {self.roi_frames} (fallbacks: {self.roi_fallbacks})")
             
             if self.frame_count > 0:
                 detection_rate = (self.hands_detected_count / self.frame_count * 100)
@@ -0,0 +1,183 @@
+import numpy as np
+from landmarkProtocol import (NUM_LANDMARKS, FLAGS_NONE, FLAG_PREDICTED, encode_arrays,
+                              label_to_code, code_to_label)
+
+
+def fill_landmarks(out, landmark_list):
+    """
+    Copia os 21 pontos (x/y/z/visibility) para `out` (array (21, 4)
+    contíguo), escrevendo direto no buffer, sem lista/tuplas por frame.
+    """
+    flat = out.reshape(-1)
+    j = 0
+    for lm in landmark_list:
+        flat[j] = lm.x
+        flat[j + 1] = lm.y
+        flat[j + 2] = lm.z
+        flat[j + 3] = lm.visibility
+        j += 4
+
+
+class HandLandmarksResult:
+    def __init__(self, max_hands=2):
+        """
+        Resultado da detecção de mãos guardado em arrays NumPy.
+        
+        Os buffers são alocados uma vez e reutilizados a cada frame pelo
+        HandTracker: o conteúdo só é válido até a próxima chamada de
+        process_hands. Use copy() para guardar um resultado.
+        
+        A visão em dicionário (formato do JSON) só é montada quando
+        alguém pede por ela (to_dict() ou resultado["hands"]).
+        
+        Args:
+            max_hands: Número máximo de mãos por frame
+        """
+        self.max_hands = max_hands
+        self._landmarks = np.zeros((max_hands, NUM_LANDMARKS, 4), dtype=np.float32)
+        self._handedness = np.zeros(max_hands, dtype=np.uint8)
+        self._scores = np.zeros(max_hands, dtype=np.float32)
+        
+        self.n_hands = 0
+        self.frame_number = 0
+        self.timestamp = 0.0
+        self.flags = FLAGS_NONE
+        self.stream_id = None
+        self._dict = None
+        
+    @property
+    def landmarks(self):
+        """Array float32 (n_mãos, 21, 4) com x, y, z, visibility."""
+        return self._landmarks[:self.n_hands]
+        
+    def hand_landmarks(self, idx):
+        """View (21, 4) dos pontos da mão idx (escrever nela altera o resultado)."""
+        if not 0 <= idx < self.n_hands:
+            raise IndexError(f"mão {idx} fora do resultado ({self.n_hands} mãos)")
+        return self._landmarks[idx]
+        
+    @property
+    def handedness(self):
+        """Códigos das mãos (0=Left, 1=Right), shape (n_mãos,)."""
+        return self._handedness[:self.n_hands]
+        
+    @property
+    def scores(self):
+        """Confiança de cada mão, shape (n_mãos,)."""
+        return self._scores[:self.n_hands]
+        
+    @property
+    def hands_detected(self):
+        return self.n_hands
+        
+    @property
+    def predicted(self):
+        """True se os landmarks são previstos (frame sem inferência)."""
+        return bool(self.flags & FLAG_PREDICTED)
+        
+    def reset(self, frame_number, timestamp):
+        """Prepara o buffer para um novo frame (sem realocar)."""
+        self.n_hands = 0
+        self.frame_number = frame_number
+        self.timestamp = timestamp
+        self.flags = FLAGS_NONE
+        self._dict = None
+        
+    def add_hand(self, label, score, landmark_list):
+        """
+        Copia uma mão detectada para o buffer.
+        
+        Args:
+            label: "Left" ou "Right"
+            score: Confiança da classificação
+            landmark_list: 21 pontos com x/y/z/visibility (ex: hand_landmarks.landmark)
+            
+        Returns:
+            int: Índice da mão ou -1 se o buffer estiver cheio
+        """
+        idx = self.n_hands
+        if idx >= self.max_hands:
+            return -1
+            
+        fill_landmarks(self._landmarks[idx], landmark_list)
+        self._handedness[idx] = label_to_code(label)
+        self._scores[idx] = score
+        self.n_hands = idx + 1
+        self._dict = None
+        return idx
+        
+    def set_arrays(self, landmarks, handedness, scores):
+        """Copia mãos já em arrays (ex: vindas de outro processo)."""
+        n = min(len(landmarks), self.max_hands)
+        self._landmarks[:n] = landmarks[:n]
+        self._handedness[:n] = handedness[:n]
+        self._scores[:n] = scores[:n]
+        self.n_hands = n
+        self._dict = None
+        
+    def copy(self):
+        """Cópia independente do buffer reutilizado."""
+        other = HandLandmarksResult(self.max_hands)
+        other.set_arrays(self.landmarks, self.handedness, self.scores)
+        other.frame_number = self.frame_number
+        other.timestamp = self.timestamp
+        other.flags = self.flags
+        other.stream_id = self.stream_id
+        return other
+        
+    def to_packet(self):
+        """
+        Pacote binário (landmarkProtocol.py) montado direto dos arrays.
+        
+        Returns:
+            bytearray: Pacote binário
+        """
+        return encode_arrays(self.frame_number, self.timestamp, self.landmarks,
+                             self.handedness, self.scores, self.flags)
+                             
+    def to_dict(self):
+        """
+        Visão em dicionário no mesmo formato do JSON (montada sob demanda).
+        
+        Returns:
+            dict: Dados das mãos
+        """
+        if self._dict is None:
+            hands = []
+            for hand_idx in range(self.n_hands):
+                hands.append({
+                    "hand_index": hand_idx,
+                    "label": code_to_label(int(self._handedness[hand_idx])),
+                    "confidence": float(self._scores[hand_idx]),
+                    "landmarks": [
+                        {"x": x, "y": y, "z": z, "visibility": v}
+                        for x, y, z, v in self._landmarks[hand_idx].tolist()
+                    ]
+                })
+                
+            self._dict = {
+                "timestamp": self.timestamp,
+                "frame_number": self.frame_number,
+                "hands_detected": self.n_hands,
+                "predicted": self.predicted,
+                "hands": hands
+            }
+        return self._dict
+        
+    def __getitem__(self, key):
+        """Compatibilidade com o antigo dicionário: resultado["hands_detected"]."""
+        if key == "hands_detected":
+            return self.n_hands
+        if key == "frame_number":
+            return self.frame_number
+        if key == "timestamp":
+            return self.timestamp
+        if key == "predicted":
+            return self.predicted
+        return self.to_dict()[key]
+        
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
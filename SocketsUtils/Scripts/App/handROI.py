@@ -0,0 +1,97 @@
+class HandROI:
+    def __init__(self, padding=0.5, min_size=128, margin=0.1, refresh_interval=30):
+        """
+        Região de interesse das mãos para a inferência.
+        
+        A caixa é montada a partir dos landmarks do frame anterior (todas
+        as mãos), aumentada por `padding` e quadrada. Ela só é recalculada
+        quando as mãos chegam perto da borda (histerese): uma caixa estável
+        mantém válido o tracking interno do MediaPipe entre frames.
+        
+        Args:
+            padding: Margem em volta das mãos, em fração do maior lado da caixa
+            min_size: Lado mínimo da caixa em pixels
+            margin: Recalcula quando as mãos chegam a menos que esta fração
+                do lado da caixa da borda
+            refresh_interval: A cada N frames na ROI com menos mãos que o
+                máximo, volta ao frame inteiro para achar mãos novas (0 = nunca)
+        """
+        self.padding = padding
+        self.min_size = min_size
+        self.margin = margin
+        self.refresh_interval = refresh_interval
+        self.box = None  # (x0, y0, x1, y1) em pixels
+        self._frames_in_roi = 0
+        
+    def region(self, n_hands_last, max_hands):
+        """
+        Caixa para o próximo frame, ou None para usar o frame inteiro.
+        
+        Args:
+            n_hands_last: Mãos detectadas no frame anterior
+            max_hands: Máximo de mãos do detector
+        """
+        if self.box is None:
+            return None
+        self._frames_in_roi += 1
+        if (self.refresh_interval and n_hands_last < max_hands
+                and self._frames_in_roi >= self.refresh_interval):
+            self._frames_in_roi = 0
+            return None
+        return self.box
+        
+    def reset(self):
+        """Tracking perdido: próximo frame no frame inteiro."""
+        self.box = None
+        self._frames_in_roi = 0
+        
+    def update(self, landmarks, frame_shape):
+        """
+        Atualiza a caixa a partir dos landmarks do frame atual.
+        
+        Args:
+            landmarks: Array (n_mãos, 21, 4) normalizado no frame inteiro
+            frame_shape: Shape do frame (altura, largura, ...)
+        """
+        if len(landmarks) == 0:
+            self.reset()
+            return
+            
+        h, w = frame_shape[:2]
+        xs = landmarks[:, :, 0] * w
+        ys = landmarks[:, :, 1] * h
+        left, right = float(xs.min()), float(xs.max())
+        top, bottom = float(ys.min()), float(ys.max())
+        
+        if self.box is not None:
+            x0, y0, x1, y1 = self.box
+            keep = self.margin * (x1 - x0)
+            if left - x0 >= keep and x1 - right >= keep and top - y0 >= keep and y1 - bottom >= keep:
+                return
+                
+        side = max(right - left, bottom - top)
+        side = int(min(max(side * (1 + 2 * self.padding), self.min_size), w, h))
+        cx = (left + right) / 2
+        cy = (top + bottom) / 2
+        x0 = int(min(max(cx - side / 2, 0), w - side))
+        y0 = int(min(max(cy - side / 2, 0), h - side))
+        self.box = (x0, y0, x0 + side, y0 + side)
+        
+    def map_to_frame(self, landmarks, frame_shape, box):
+        """
+        Converte landmarks normalizados na caixa para o frame inteiro (in-place).
+        
+        Args:
+            landmarks: Array (..., 21, 4) normalizado no recorte `box`
+            frame_shape: Shape do frame inteiro
+            box: Caixa (x0, y0, x1, y1) usada no recorte
+        """
+        h, w = frame_shape[:2]
+        x0, y0, x1, y1 = box
+        scale_x = (x1 - x0) / w
+        scale_y = (y1 - y0) / h
+        landmarks[..., 0] = landmarks[..., 0] * scale_x + x0 / w
+        landmarks[..., 1] = landmarks[..., 1] * scale_y + y0 / h
+        # z do MediaPipe usa a mesma escala de x
+        landmarks[..., 2] *= scale_x
+        return landmarks
@@ -0,0 +1,443 @@
+import multiprocessing as mp_proc
+import queue
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+from handLandmarks import HandLandmarksResult, fill_landmarks
+
+
+def _inference_worker(worker_id, shm_name, slot_bytes, task_queue, result_queue, hands_kwargs):
+    """
+    Processo worker: um mp.solutions.hands.Hands por stream (tracking) ou
+    um só para todos (static_image_mode).
+    
+    Lê o frame direto do slot de memória compartilhada e devolve só os
+    arrays de landmarks (pequenos) pela fila de resultados. Toda tarefa
+    recebe uma resposta, mesmo com erro (o último campo), para o slot
+    ser liberado e a reordenação não ficar esperando.
+    """
+    import cv2
+    from landmarkProtocol import label_to_code
+    
+    shm = shared_memory.SharedMemory(name=shm_name)
+    max_hands = hands_kwargs.get("max_num_hands", 2)
+    
+    # Em modo tracking cada stream tem o seu Hands: o estado do tracking
+    # não pode passar de uma câmera para outra no mesmo worker
+    per_stream = not hands_kwargs.get("static_image_mode", False)
+    hands_by_stream = {}
+    load_error = None
+    try:
+        import mediapipe as mp
+    except Exception as e:
+        load_error = f"MediaPipe indisponível: {e}"
+    
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+                
+            slot, shape, stream_id, frame_number, timestamp = task
+            landmarks = np.zeros((0, 21, 4), dtype=np.float32)
+            handedness = np.zeros(0, dtype=np.uint8)
+            scores = np.zeros(0, dtype=np.float32)
+            error = load_error
+            
+            if error is None:
+                try:
+                    key = stream_id if per_stream else None
+                    hands = hands_by_stream.get(key)
+                    if hands is None:
+                        hands = hands_by_stream[key] = mp.solutions.hands.Hands(**hands_kwargs)
+                    landmarks, handedness, scores = _process_slot(
+                        hands, cv2, label_to_code, shm, slot, slot_bytes, shape, max_hands)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    
+            result_queue.put((worker_id, slot, stream_id, frame_number, timestamp,
+                              landmarks, handedness, scores, error))
+    finally:
+        for hands in hands_by_stream.values():
+            hands.close()
+        shm.close()
+
+
+def _process_slot(hands, cv2, label_to_code, shm, slot, slot_bytes, shape, max_hands):
+    """Inferência de um slot; devolve (landmarks, handedness, scores)."""
+    frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_bytes)
+    
+    # cvtColor copia o frame: o slot pode ser liberado logo em seguida
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    del frame
+    results = hands.process(frame_rgb)
+    
+    landmarks = np.zeros((0, 21, 4), dtype=np.float32)
+    handedness = np.zeros(0, dtype=np.uint8)
+    scores = np.zeros(0, dtype=np.float32)
+    
+    if results.multi_hand_landmarks:
+        n = min(len(results.multi_hand_landmarks), max_hands)
+        landmarks = np.empty((n, 21, 4), dtype=np.float32)
+        handedness = np.empty(n, dtype=np.uint8)
+        scores = np.empty(n, dtype=np.float32)
+        for i in range(n):
+            fill_landmarks(landmarks[i], results.multi_hand_landmarks[i].landmark)
+            classification = results.multi_handedness[i].classification[0]
+            handedness[i] = label_to_code(classification.label)
+            scores[i] = classification.score
+            
+    return landmarks, handedness, scores
+
+
+class HandInferencePool:
+    def __init__(self, num_workers=None, max_frame_shape=(480, 640, 3), slots_per_worker=2,
+                 route="round_robin", max_num_hands=2, min_detection_confidence=0.7,
+                 min_tracking_confidence=0.5, static_image_mode=None, task_timeout=2.0):
+        """
+        Pool de processos com N instâncias do MediaPipe Hands.
+        
+        Os frames vão para os workers por slots de memória compartilhada
+        (sem pickle do array); os resultados voltam reordenados por
+        frame_number dentro de cada stream. Os métodos podem ser chamados
+        de threads diferentes (ex: uma thread de captura por câmera).
+        
+        Args:
+            num_workers: Número de processos (padrão: núcleos - 1)
+            max_frame_shape: Maior shape de frame aceito (define o tamanho do slot)
+            slots_per_worker: Frames em voo por worker
+            route: "round_robin" (frames de um stream espalhados entre os
+                workers) ou "stream" (cada stream fica sempre no mesmo
+                worker, mantendo o tracking do MediaPipe entre frames; o
+                worker tem um Hands por stream, então vários streams podem
+                dividir um worker)
+            max_num_hands: Máximo de mãos por frame
+            min_detection_confidence: Confiança mínima para detecção
+            min_tracking_confidence: Confiança mínima para tracking
+            static_image_mode: Padrão: True em "round_robin" (frames
+                consecutivos caem em workers diferentes), False em "stream"
+            task_timeout: Segundos até um frame sem resultado deixar de
+                segurar a reordenação do stream (o resultado tardio é descartado)
+        """
+        if route not in ("round_robin", "stream"):
+            raise ValueError(f"route inválido: {route}")
+            
+        self.num_workers = num_workers or max(1, mp_proc.cpu_count() - 1)
+        self.route = route
+        self.task_timeout = task_timeout
+        self.max_num_hands = max_num_hands
+        self.slot_bytes = int(np.prod(max_frame_shape))
+        self.num_slots = self.num_workers * slots_per_worker
+        
+        if static_image_mode is None:
+            static_image_mode = route == "round_robin"
+        hands_kwargs = dict(
+            static_image_mode=static_image_mode,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+        
+        print(f"🧠 Iniciando pool de inferência: {self.num_workers} workers, "
+              f"{self.num_slots} slots de {self.slot_bytes} bytes")
+              
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * self.num_slots)
+        self._slots = np.ndarray((self.num_slots, self.slot_bytes), dtype=np.uint8, buffer=self._shm.buf)
+        self._free_slots = deque(range(self.num_slots))
+        
+        ctx = mp_proc.get_context("spawn")
+        self._result_queue = ctx.Queue()
+        self._task_queues = []
+        self._workers = []
+        for worker_id in range(self.num_workers):
+            task_queue = ctx.Queue()
+            worker = ctx.Process(target=_inference_worker, name=f"hands-{worker_id}", daemon=True,
+                                 args=(worker_id, self._shm.name, self.slot_bytes, task_queue,
+                                       self._result_queue, hands_kwargs))
+            worker.start()
+            self._task_queues.append(task_queue)
+            self._workers.append(worker)
+            
+        self._next_worker = 0
+        self._in_flight = [0] * self.num_workers
+        
+        # Tarefas em voo por slot: [worker_id, stream_id, frame_number, enviado_em, expirada]
+        self._tasks = {}
+        
+        # Reordenação: frames submetidos (em ordem) e resultados prontos, por stream
+        self._submitted = {}
+        self._ready = {}
+        self._lock = threading.Lock()
+        
+        # Estatísticas
+        self.submitted_count = 0
+        self.completed_count = 0
+        self.rejected_count = 0
+        self.failed_count = 0
+        self.timed_out_count = 0
+        
+    def _pick_worker(self, stream_id):
+        """Worker vivo para o frame (None se todos morreram)."""
+        alive = [worker.is_alive() for worker in self._workers]
+        if self.route == "stream":
+            worker_id = hash(stream_id) % self.num_workers
+            if alive[worker_id]:
+                return worker_id
+            
+        # Round-robin pulando workers sobrecarregados ou mortos
+        for _ in range(self.num_workers):
+            worker_id = self._next_worker
+            self._next_worker = (self._next_worker + 1) % self.num_workers
+            if alive[worker_id] and self._in_flight[worker_id] < self.num_slots // self.num_workers:
+                return worker_id
+        candidates = [worker_id for worker_id in range(self.num_workers) if alive[worker_id]]
+        if not candidates:
+            return None
+        return min(candidates, key=self._in_flight.__getitem__)
+        
+    def submit(self, frame, frame_number, timestamp=None, stream_id=0, max_pending=None):
+        """
+        Envia um frame para inferência (não bloqueia).
+        
+        Args:
+            frame: Frame OpenCV (numpy array BGR, uint8)
+            frame_number: Número do frame no stream
+            timestamp: Momento da captura (padrão: agora)
+            stream_id: Identificador do stream/câmera
+            max_pending: Limite de frames em voo deste stream (backpressure
+                por stream; None = só o limite de slots)
+            
+        Returns:
+            bool: False se não há slot livre (frame descartado)
+        """
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame maior que o slot: {frame.shape}")
+            
+        with self._lock:
+            self._drain()
+        
+            self._expire()
+            
+            submitted = self._submitted.setdefault(stream_id, deque())
+            worker_id = self._pick_worker(stream_id) if self._free_slots else None
+            if worker_id is None or (max_pending is not None and len(submitted) >= max_pending):
+                self.rejected_count += 1
+                return False
+            
+            slot = self._free_slots.popleft()
+            slot_view = self._slots[slot, :frame.nbytes].reshape(frame.shape)
+            np.copyto(slot_view, frame)
+        
+            self._in_flight[worker_id] += 1
+            self._tasks[slot] = [worker_id, stream_id, frame_number, time.monotonic(), False]
+            self._task_queues[worker_id].put(
+                (slot, frame.shape, stream_id, frame_number, time.time() if timestamp is None else timestamp))
+                
+            submitted.append(frame_number)
+            self._ready.setdefault(stream_id, {})
+            self.submitted_count += 1
+            return True
+            
+    def _drain(self, item=None):
+        """Recolhe resultados dos workers e libera os slots (com o lock)."""
+        while True:
+            if item is None:
+                try:
+                    item = self._result_queue.get_nowait()
+                except queue.Empty:
+                    return
+            
+            worker_id, slot, stream_id, frame_number, timestamp, landmarks, handedness, scores, error = item
+            item = None
+            task = self._tasks.get(slot)
+            if task is None or task[0] != worker_id or task[1] != stream_id or task[2] != frame_number:
+                # Resposta atrasada de um worker dado como morto: o slot já foi
+                # recolhido (e talvez reusado por outro worker), nada a liberar
+                continue
+            del self._tasks[slot]
+            self._in_flight[worker_id] -= 1
+            self._free_slots.append(slot)
+            
+            if task[4]:
+                # Expirou: o stream já seguiu sem este frame
+                continue
+            if error is not None:
+                self.failed_count += 1
+                self._forget(stream_id, frame_number)
+                print(f"❌ Erro na inferência do frame #{frame_number} (worker {worker_id}): {error}")
+                continue
+            
+            result = HandLandmarksResult(self.max_num_hands)
+            result.reset(frame_number, timestamp)
+            result.set_arrays(landmarks, handedness, scores)
+            result.stream_id = stream_id
+            self._ready[stream_id][frame_number] = result
+            self.completed_count += 1
+            
+    def _forget(self, stream_id, frame_number):
+        """Tira um frame da fila de reordenação do stream (com o lock)."""
+        try:
+            self._submitted[stream_id].remove(frame_number)
+        except (KeyError, ValueError):
+            pass
+            
+    def _expire(self):
+        """
+        Libera a reordenação de frames que não vão chegar (com o lock).
+        
+        Worker morto: o slot volta na hora. Tarefa lenta: o frame sai da
+        fila do stream, mas o slot só volta quando o worker responder
+        (ele ainda pode estar lendo a memória).
+        """
+        if not self._tasks:
+            return
+        now = time.monotonic()
+        dead = {worker_id for worker_id, worker in enumerate(self._workers) if not worker.is_alive()}
+        for slot, task in list(self._tasks.items()):
+            worker_id, stream_id, frame_number, sent_at, expired = task
+            if worker_id in dead:
+                del self._tasks[slot]
+                self._in_flight[worker_id] -= 1
+                self._free_slots.append(slot)
+                if not expired:
+                    self.failed_count += 1
+                    self._forget(stream_id, frame_number)
+            elif not expired and now - sent_at > self.task_timeout:
+                task[4] = True
+                self.timed_out_count += 1
+                self._forget(stream_id, frame_number)
+            
+    def results(self, timeout=0.0, stream_id=None):
+        """
+        Resultados prontos, em ordem de frame_number por stream.
+        
+        Args:
+            timeout: Espera (s) por pelo menos um resultado novo
+            stream_id: Só deste stream (None = todos)
+            
+        Returns:
+            list: HandLandmarksResult (cada um é uma cópia independente)
+        """
+        # Espera fora do lock para não travar quem está submetendo
+        first = None
+        if timeout > 0:
+            try:
+                first = self._result_queue.get(timeout=timeout)
+            except queue.Empty:
+                pass
+        
+        with self._lock:
+            self._drain(first)
+            self._expire()
+            
+            ready = []
+            streams = self._submitted if stream_id is None else {stream_id: self._submitted.get(stream_id, deque())}
+            for sid, submitted in streams.items():
+                done = self._ready.get(sid, {})
+                while submitted and submitted[0] in done:
+                    ready.append(done.pop(submitted.popleft()))
+            return ready
+        
+    def process_hands(self, frame, frame_number, timestamp=None, stream_id=0):
+        """
+        API no estilo de HandTracker.process_hands, com pipeline.
+        
+        Submete o frame e devolve o resultado mais recente já pronto do
+        mesmo stream (normalmente de um frame anterior - veja
+        result.frame_number); resultados mais antigos são descartados.
+        
+        Returns:
+            HandLandmarksResult ou None se nenhum resultado está pronto
+        """
+        self.submit(frame, frame_number, timestamp, stream_id)
+        ready = self.results(stream_id=stream_id)
+        if not ready:
+            return None
+        # Mantém só o mais recente em ordem; os anteriores já passaram
+        return ready[-1]
+        
+    def pending(self, stream_id=None):
+        """Número de frames submetidos ainda sem resultado entregue."""
+        if stream_id is not None:
+            return len(self._submitted.get(stream_id, ()))
+        return sum(len(submitted) for submitted in list(self._submitted.values()))
+        
+    def stats(self):
+        return {
+            "workers": self.num_workers,
+            "submitted": self.submitted_count,
+            "completed": self.completed_count,
+            "rejected": self.rejected_count,
+            "failed": self.failed_count,
+            "timed_out": self.timed_out_count,
+            "free_slots": len(self._free_slots),
+        }
+        
+    def close(self):
+        """Encerra os workers e libera a memória compartilhada."""
+        for task_queue in self._task_queues:
+            task_queue.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+                
+        self._slots = None
+        self._shm.close()
+        self._shm.unlink()
+        print("✅ Pool de inferência encerrado")
+
+
+# Teste standalone: throughput com frames sintéticos
+if __name__ == "__main__":
+    print("\n🧪 TESTE DO POOL DE INFERÊNCIA")
+    print("=" * 50 + "\n")
+    
+    pool = HandInferencePool()
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    
+    start = time.time()
+    total = 200
+    delivered = 0
+    for frame_number in range(1, total + 1):
+        while not pool.submit(frame, frame_number):
+            delivered += len(pool.results(timeout=0.01))
+    while pool.pending():
+        delivered += len(pool.results(timeout=0.1))
+        
+    elapsed = time.time() - start
+    print(f"📊 {delivered} frames em {elapsed:.2f}s ({delivered / elapsed:.1f} fps) | {pool.stats()}")
+    
+    # Frame que quebra a inferência (2 canais): o slot volta e o stream segue
+    pool.submit(np.zeros((480, 640, 2), dtype=np.uint8), total + 1)
+    pool.submit(frame, total + 2)
+    ready = []
+    while pool.pending():
+        ready += pool.results(timeout=0.1)
+    assert [r.frame_number for r in ready] == [total + 2]
+    assert pool.failed_count == 1 and len(pool._free_slots) == pool.num_slots
+    
+    # Worker morto: os frames dele não seguram a reordenação
+    for frame_number in range(total + 3, total + 3 + pool.num_slots):
+        pool.submit(frame, frame_number)
+    pool._workers[0].terminate()
+    pool._workers[0].join()
+    deadline = time.time() + 10.0
+    while pool.pending() and time.time() < deadline:
+        pool.results(timeout=0.1)
+    assert pool.pending() == 0 and len(pool._free_slots) == pool.num_slots
+    
+    # Resposta atrasada do worker morto para um slot já reusado: ignorada
+    slot = pool._free_slots.popleft()
+    pool._tasks[slot] = [0, 0, total + 100, time.monotonic(), False]
+    pool._drain((0, slot, 0, total + 3, 0.0, np.zeros((0, 21, 4), dtype=np.float32),
+                 np.zeros(0, dtype=np.uint8), np.zeros(0, dtype=np.float32), None))
+    assert slot in pool._tasks and slot not in pool._free_slots and not pool._ready[0]
+    del pool._tasks[slot]
+    pool._free_slots.append(slot)
+    print(f"💥 Falhas tratadas | {pool.stats()}")
+    pool.close()
+    print("\n✅ Teste concluído\n")
@@ -0,0 +1,213 @@
+import math
+import numpy as np
+from landmarkProtocol import NUM_LANDMARKS, FLAG_PREDICTED
+
+
+class OneEuroFilter:
+    def __init__(self, min_cutoff=1.0, beta=0.05, d_cutoff=1.0):
+        """
+        Filtro One-Euro sobre arrays NumPy (todos os elementos de uma vez).
+        
+        Suaviza bastante com a mão parada e pouco com a mão rápida
+        (a frequência de corte sobe com a velocidade).
+        
+        Args:
+            min_cutoff: Frequência de corte mínima (Hz)
+            beta: Ganho da velocidade na frequência de corte
+            d_cutoff: Frequência de corte da derivada (Hz)
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.reset()
+        
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+        
+    def reset(self):
+        self.value = None
+        self.derivative = None
+        
+    def __call__(self, x, dt):
+        """
+        Filtra uma nova medição.
+        
+        Args:
+            x: Array com a medição
+            dt: Segundos desde a medição anterior
+            
+        Returns:
+            np.ndarray: Valor filtrado (self.value)
+        """
+        if self.value is None or dt <= 0:
+            self.value = x.astype(np.float32, copy=True)
+            self.derivative = np.zeros_like(self.value)
+            return self.value
+            
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.derivative += a_d * ((x - self.value) / dt - self.derivative)
+        cutoff = self.min_cutoff + self.beta * np.abs(self.derivative)
+        tau = 1.0 / (2 * np.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self.value += a * (x - self.value)
+        return self.value
+
+
+class _HandTrack:
+    def __init__(self, label, filter_factory):
+        self.label = label
+        self.landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self.velocity = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self.score = 0.0
+        self.timestamp = None
+        self.filter = filter_factory() if filter_factory is not None else None
+
+
+class LandmarkPredictor:
+    def __init__(self, mode="velocity", max_hands=2, max_prediction=0.25,
+                 min_cutoff=1.0, beta=0.05):
+        """
+        Preenche os frames sem inferência com landmarks previstos.
+        
+        Cada mão (casada entre inferências pelo label) guarda posição e
+        velocidade; a previsão é posição + velocidade * dt.
+        
+        Args:
+            mode: "velocity" (velocidade constante, diferença entre as duas
+                últimas inferências) ou "one_euro" (posição e velocidade
+                suavizadas pelo filtro One-Euro)
+            max_hands: Máximo de mãos
+            max_prediction: Não extrapola mais que estes segundos além da
+                última inferência (a mão "congela" depois disso)
+            min_cutoff, beta: Parâmetros do One-Euro
+        """
+        if mode not in ("velocity", "one_euro"):
+            raise ValueError(f"mode inválido: {mode}")
+            
+        self.mode = mode
+        self.max_hands = max_hands
+        self.max_prediction = max_prediction
+        if mode == "one_euro":
+            self._filter_factory = lambda: OneEuroFilter(min_cutoff, beta)
+        else:
+            self._filter_factory = None
+            
+        self._tracks = []
+        self._handedness = np.zeros(max_hands, dtype=np.uint8)
+        self._scores = np.zeros(max_hands, dtype=np.float32)
+        self._predicted = np.zeros((max_hands, NUM_LANDMARKS, 4), dtype=np.float32)
+        
+    def reset(self):
+        self._tracks = []
+        
+    @property
+    def speed(self):
+        """Maior velocidade média de uma mão (unidades normalizadas/s)."""
+        if not self._tracks:
+            return 0.0
+        return max(float(np.linalg.norm(track.velocity[:, :2], axis=1).mean()) for track in self._tracks)
+        
+    def update(self, result):
+        """
+        Alimenta o preditor com uma inferência real.
+        
+        Args:
+            result: HandLandmarksResult do frame inferido
+        """
+        previous = {track.label: track for track in self._tracks}
+        tracks = []
+        for idx in range(result.n_hands):
+            label = int(result.handedness[idx])
+            track = previous.pop(label, None)
+            if track is None:
+                track = _HandTrack(label, self._filter_factory)
+                
+            measured = result.landmarks[idx]
+            dt = result.timestamp - track.timestamp if track.timestamp is not None else 0.0
+            
+            if track.filter is not None:
+                filtered = track.filter(measured[:, :3], dt)
+                track.landmarks[:, :3] = filtered
+                track.velocity[:] = track.filter.derivative
+            else:
+                if dt > 0:
+                    track.velocity[:] = (measured[:, :3] - track.landmarks[:, :3]) / dt
+                else:
+                    track.velocity[:] = 0.0
+                track.landmarks[:, :3] = measured[:, :3]
+            track.landmarks[:, 3] = measured[:, 3]
+            track.score = float(result.scores[idx])
+            track.timestamp = result.timestamp
+            tracks.append(track)
+            
+        self._tracks = tracks
+        
+    def predict(self, result, frame_number, timestamp):
+        """
+        Preenche `result` com a previsão para um frame sem inferência.
+        
+        Args:
+            result: HandLandmarksResult a preencher (reutilizado)
+            frame_number: Número do frame
+            timestamp: Momento da captura do frame
+            
+        Returns:
+            HandLandmarksResult: `result`, com o flag FLAG_PREDICTED
+        """
+        n = len(self._tracks)
+        for idx, track in enumerate(self._tracks):
+            dt = min(max(timestamp - track.timestamp, 0.0), self.max_prediction)
+            self._predicted[idx, :, :3] = track.landmarks[:, :3] + track.velocity * dt
+            self._predicted[idx, :, 3] = track.landmarks[:, 3]
+            self._handedness[idx] = track.label
+            self._scores[idx] = track.score
+            
+        result.reset(frame_number, timestamp)
+        result.set_arrays(self._predicted[:n], self._handedness[:n], self._scores[:n])
+        result.flags |= FLAG_PREDICTED
+        return result
+
+
+class InferenceScheduler:
+    def __init__(self, interval=1, adaptive=False, max_interval=4, fast_speed=0.5, slow_speed=0.05):
+        """
+        Decide em quais frames rodar a inferência.
+        
+        Args:
+            interval: Inferência a cada N frames (modo fixo)
+            adaptive: True para o intervalo seguir o movimento das mãos:
+                1 com a mão rápida, até max_interval com a mão parada
+            max_interval: Maior intervalo no modo adaptativo
+            fast_speed: Velocidade (normalizada/s) a partir da qual o
+                intervalo é 1
+            slow_speed: Velocidade abaixo da qual o intervalo é max_interval
+        """
+        self.interval = max(1, interval)
+        self.adaptive = adaptive
+        self.max_interval = max(1, max_interval)
+        self.fast_speed = fast_speed
+        self.slow_speed = slow_speed
+        self.current_interval = self.interval if not adaptive else 1
+        self._since_inference = None
+        
+    def should_infer(self):
+        """True se o próximo frame deve passar pela inferência."""
+        if self._since_inference is None or self._since_inference + 1 >= self.current_interval:
+            self._since_inference = 0
+            return True
+        self._since_inference += 1
+        return False
+        
+    def observe(self, speed):
+        """Ajusta o intervalo (modo adaptativo) pela velocidade das mãos."""
+        if not self.adaptive:
+            return
+        if speed >= self.fast_speed:
+            self.current_interval = 1
+        elif speed <= self.slow_speed:
+            self.current_interval = self.max_interval
+        else:
+            span = (self.fast_speed - speed) / (self.fast_speed - self.slow_speed)
+            self.current_interval = 1 + int(round(span * (self.max_interval - 1)))
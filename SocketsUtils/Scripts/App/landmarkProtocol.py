@@ -0,0 +1,245 @@
+import struct
+import numpy as np
+
+# Formato binário dos landmarks (little-endian, sem padding implícito):
+#
+#   cabeçalho (18 bytes):
+#     magic (2s) | versão (B) | flags (B) | n_mãos (B) | reservado (x) |
+#     frame_number (I) | timestamp (d)
+#   para cada mão (344 bytes):
+#     label (B: 0=Left, 1=Right, 255=desconhecido) | reservado (3x) | score (f) |
+#     21 x (x, y, z, visibility) em float32
+LANDMARK_MAGIC = b"HL"
+LANDMARK_VERSION = 1
+NUM_LANDMARKS = 21
+
+PACKET_HEADER = struct.Struct("<2sBBBxId")
+HAND_HEADER = struct.Struct("<B3xf")
+HAND_LANDMARKS = struct.Struct(f"<{NUM_LANDMARKS * 4}f")
+HAND_SIZE = HAND_HEADER.size + HAND_LANDMARKS.size
+
+# Flags do pacote
+FLAGS_NONE = 0x00
+FLAG_PREDICTED = 0x01  # landmarks previstos (frame sem inferência, ver landmarkPredictor.py)
+
+HAND_LABELS = ("Left", "Right")
+LABEL_UNKNOWN = 255
+
+
+def label_to_code(label):
+    """Converte "Left"/"Right" no código usado no pacote."""
+    try:
+        return HAND_LABELS.index(label)
+    except ValueError:
+        return LABEL_UNKNOWN
+
+
+def code_to_label(code):
+    """Converte o código do pacote em "Left"/"Right"."""
+    return HAND_LABELS[code] if code < len(HAND_LABELS) else "Unknown"
+
+
+def is_binary_packet(data):
+    """True se os bytes são um pacote binário de landmarks."""
+    return len(data) >= PACKET_HEADER.size and data[:2] == LANDMARK_MAGIC
+
+
+def encode_landmarks(frame_number, timestamp, hands, flags=FLAGS_NONE):
+    """
+    Codifica mãos detectadas direto da lista de landmarks do MediaPipe.
+    
+    Args:
+        frame_number: Número do frame
+        timestamp: Momento da captura
+        hands: Lista de (label, score, landmarks), onde landmarks é a
+            sequência de 21 pontos com atributos x/y/z/visibility
+            (ex: hand_landmarks.landmark do MediaPipe)
+        flags: Flags do pacote
+        
+    Returns:
+        bytearray: Pacote binário
+    """
+    packet = bytearray(PACKET_HEADER.size + len(hands) * HAND_SIZE)
+    PACKET_HEADER.pack_into(packet, 0, LANDMARK_MAGIC, LANDMARK_VERSION, flags,
+                            len(hands), frame_number & 0xFFFFFFFF, timestamp)
+                            
+    offset = PACKET_HEADER.size
+    for label, score, landmarks in hands:
+        HAND_HEADER.pack_into(packet, offset, label_to_code(label), score)
+        HAND_LANDMARKS.pack_into(packet, offset + HAND_HEADER.size,
+                                 *[v for lm in landmarks for v in (lm.x, lm.y, lm.z, lm.visibility)])
+        offset += HAND_SIZE
+        
+    return packet
+
+
+def encode_hands_data(hands_data, flags=FLAGS_NONE):
+    """
+    Codifica o dicionário produzido por HandTracker.process_hands.
+    
+    Returns:
+        bytearray: Pacote binário
+    """
+    if hands_data.get("predicted"):
+        flags |= FLAG_PREDICTED
+    packet = bytearray(PACKET_HEADER.size + len(hands_data["hands"]) * HAND_SIZE)
+    PACKET_HEADER.pack_into(packet, 0, LANDMARK_MAGIC, LANDMARK_VERSION, flags,
+                            len(hands_data["hands"]), hands_data["frame_number"] & 0xFFFFFFFF,
+                            hands_data["timestamp"])
+                            
+    offset = PACKET_HEADER.size
+    for hand in hands_data["hands"]:
+        HAND_HEADER.pack_into(packet, offset, label_to_code(hand["label"]), hand["confidence"])
+        HAND_LANDMARKS.pack_into(packet, offset + HAND_HEADER.size,
+                                 *[lm[key] for lm in hand["landmarks"]
+                                   for key in ("x", "y", "z", "visibility")])
+        offset += HAND_SIZE
+        
+    return packet
+
+
+def encode_arrays(frame_number, timestamp, landmarks, handedness, scores, flags=FLAGS_NONE):
+    """
+    Codifica mãos a partir dos arrays NumPy de HandLandmarksResult.
+    
+    Args:
+        frame_number: Número do frame
+        timestamp: Momento da captura
+        landmarks: Array float32 (n_mãos, 21, 4)
+        handedness: Códigos das mãos (0=Left, 1=Right), shape (n_mãos,)
+        scores: Confiança de cada mão, shape (n_mãos,)
+        flags: Flags do pacote
+        
+    Returns:
+        bytearray: Pacote binário
+    """
+    n_hands = len(landmarks)
+    packet = bytearray(PACKET_HEADER.size + n_hands * HAND_SIZE)
+    PACKET_HEADER.pack_into(packet, 0, LANDMARK_MAGIC, LANDMARK_VERSION, flags,
+                            n_hands, frame_number & 0xFFFFFFFF, timestamp)
+                            
+    offset = PACKET_HEADER.size
+    for hand_idx in range(n_hands):
+        HAND_HEADER.pack_into(packet, offset, int(handedness[hand_idx]), float(scores[hand_idx]))
+        # Escreve os floats direto no pacote (sem bytes intermediários)
+        start = offset + HAND_HEADER.size
+        np.frombuffer(packet, dtype="<f4", count=NUM_LANDMARKS * 4, offset=start)[:] = landmarks[hand_idx].reshape(-1)
+        offset += HAND_SIZE
+        
+    return packet
+
+
+def decode_arrays(data):
+    """
+    Decodifica um pacote binário em arrays NumPy (sem copiar os landmarks).
+    
+    Returns:
+        tuple: (frame_number, timestamp, flags, landmarks (n, 21, 4),
+                handedness (n,), scores (n,)) ou None se inválido
+    """
+    if not is_binary_packet(data):
+        return None
+        
+    magic, version, flags, n_hands, frame_number, timestamp = PACKET_HEADER.unpack_from(data)
+    if version != LANDMARK_VERSION or len(data) < PACKET_HEADER.size + n_hands * HAND_SIZE:
+        return None
+        
+    hand_dtype = np.dtype([
+        ("label", "u1"), ("reserved", "V3"), ("score", "<f4"),
+        ("landmarks", "<f4", (NUM_LANDMARKS, 4)),
+    ])
+    hands = np.frombuffer(data, dtype=hand_dtype, count=n_hands, offset=PACKET_HEADER.size)
+    return frame_number, timestamp, flags, hands["landmarks"], hands["label"], hands["score"]
+
+
+def decode_landmarks(data):
+    """
+    Decodifica um pacote binário no mesmo formato do JSON.
+    
+    Args:
+        data: Bytes recebidos
+        
+    Returns:
+        dict: Dados das mãos ou None se o pacote for inválido
+    """
+    if not is_binary_packet(data):
+        return None
+        
+    magic, version, flags, n_hands, frame_number, timestamp = PACKET_HEADER.unpack_from(data)
+    if version != LANDMARK_VERSION or len(data) < PACKET_HEADER.size + n_hands * HAND_SIZE:
+        return None
+        
+    hands_data = {
+        "timestamp": timestamp,
+        "frame_number": frame_number,
+        "hands_detected": n_hands,
+        "flags": flags,
+        "predicted": bool(flags & FLAG_PREDICTED),
+        "hands": []
+    }
+    
+    offset = PACKET_HEADER.size
+    for hand_idx in range(n_hands):
+        label_code, score = HAND_HEADER.unpack_from(data, offset)
+        values = HAND_LANDMARKS.unpack_from(data, offset + HAND_HEADER.size)
+        offset += HAND_SIZE
+        
+        hands_data["hands"].append({
+            "hand_index": hand_idx,
+            "label": code_to_label(label_code),
+            "confidence": score,
+            "landmarks": [
+                {"x": values[i], "y": values[i + 1], "z": values[i + 2], "visibility": values[i + 3]}
+                for i in range(0, len(values), 4)
+            ]
+        })
+        
+    return hands_data
+
+
+# Comparação standalone: JSON x binário
+if __name__ == "__main__":
+    import json
+    import random
+    import time
+    from collections import namedtuple
+    
+    Landmark = namedtuple("Landmark", "x y z visibility")
+    
+    print("\n🧪 COMPARAÇÃO JSON x BINÁRIO (2 mãos)")
+    print("=" * 50 + "\n")
+    
+    fake_hands = [
+        (label, random.random(), [Landmark(random.random(), random.random(), random.random() - 0.5, 0.0)
+                                  for _ in range(NUM_LANDMARKS)])
+        for label in HAND_LABELS
+    ]
+    
+    def encode_json():
+        hands_data = {"timestamp": time.time(), "frame_number": 1, "hands_detected": 2, "hands": []}
+        for hand_idx, (label, score, landmarks) in enumerate(fake_hands):
+            hands_data["hands"].append({
+                "hand_index": hand_idx,
+                "label": label,
+                "confidence": score,
+                "landmarks": [{"x": lm.x, "y": lm.y, "z": lm.z, "visibility": lm.visibility}
+                              for lm in landmarks]
+            })
+        return json.dumps(hands_data).encode('utf-8')
+        
+    def encode_binary():
+        return encode_landmarks(1, time.time(), fake_hands)
+        
+    iterations = 5000
+    for name, encode in (("JSON", encode_json), ("Binário", encode_binary)):
+        size = len(encode())
+        start = time.perf_counter()
+        for _ in range(iterations):
+            encode()
+        elapsed_us = (time.perf_counter() - start) / iterations * 1e6
+        print(f"📦 {name:8s}: {size:5d} bytes | {elapsed_us:7.1f} µs por pacote")
+        
+    decoded = decode_landmarks(encode_binary())
+    assert decoded["hands_detected"] == 2
+    assert abs(decoded["hands"][0]["landmarks"][5]["x"] - fake_hands[0][2][5].x) < 1e-6
+    print("\n✅ Decodificação conferida\n")
@@ -0,0 +1,97 @@
+import json
+import socket
+import time
+from landmarkProtocol import decode_landmarks, is_binary_packet
+from receiverFeedback import FeedbackReporter, STREAM_LANDMARKS
+
+class LandmarkReceiver:
+    def __init__(self, listen_ip="0.0.0.0", listen_port=8384, feedback=True, feedback_interval=0.5):
+        """
+        Receptor UDP de referência dos landmarks (substitui o
+        HandLandmarkReceiver do Qt): JSON ou binário, com o canal de retorno.
+        
+        Args:
+            listen_ip: IP para escutar (padrão: todas as interfaces)
+            listen_port: Porta UDP dos landmarks (padrão: 8384)
+            feedback: True para reportar ao sender (ver receiverFeedback.py);
+                o frame_number tem buracos, então a perda é calculada lá
+            feedback_interval: Segundos entre relatórios
+        """
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((listen_ip, listen_port))
+        self._buffer = bytearray(65535)
+        
+        self.feedback = None
+        if feedback:
+            self.feedback = FeedbackReporter(self.socket, STREAM_LANDMARKS, interval=feedback_interval,
+                                             contiguous=False)
+                                             
+        # Estatísticas
+        self.packets_received = 0
+        self.packets_invalid = 0
+        
+    def receive(self, timeout=None):
+        """
+        Recebe o próximo pacote de landmarks.
+        
+        Args:
+            timeout: Tempo máximo de espera em segundos (None = bloqueia)
+            
+        Returns:
+            dict: Dados das mãos no formato do JSON ou None se expirou
+        """
+        self.socket.settimeout(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            try:
+                size, address = self.socket.recvfrom_into(self._buffer)
+            except socket.timeout:
+                return None
+            except ConnectionResetError:
+                # Windows: ICMP "porta inacessível" de um relatório anterior
+                continue
+                
+            data = bytes(self._buffer[:size])
+            try:
+                hands_data = decode_landmarks(data) if is_binary_packet(data) else json.loads(data)
+            except ValueError:
+                hands_data = None
+                
+            if isinstance(hands_data, dict) and "frame_number" in hands_data:
+                self.packets_received += 1
+                if self.feedback is not None:
+                    self.feedback.on_packet(hands_data["frame_number"], hands_data["timestamp"], address)
+                return hands_data
+                
+            self.packets_invalid += 1
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.socket.settimeout(remaining)
+                
+    def close(self):
+        """Fecha o socket."""
+        self.socket.close()
+
+
+# Teste standalone: mostra as mãos recebidas
+if __name__ == "__main__":
+    print("\n🧪 TESTE DO RECEPTOR DE LANDMARKS")
+    print("=" * 50 + "\n")
+    
+    receiver = LandmarkReceiver(listen_port=8384)
+    print("📥 Aguardando landmarks na porta 8384... (Ctrl+C para sair)\n")
+    
+    try:
+        while True:
+            hands_data = receiver.receive(timeout=1.0)
+            if hands_data is not None and receiver.packets_received % 30 == 0:
+                print(f"🖐️  Frame #{hands_data['frame_number']}: {hands_data['hands_detected']} mão(s) | "
+                      f"{receiver.feedback.stats()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+        print(f"\n📈 Pacotes recebidos: {receiver.packets_received} (inválidos: {receiver.packets_invalid})")
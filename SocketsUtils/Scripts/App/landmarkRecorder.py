@@ -0,0 +1,349 @@
+import bisect
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+from handLandmarks import HandLandmarksResult
+from landmarkProtocol import NUM_LANDMARKS, decode_arrays, encode_hands_data
+from landmarkSender import LandmarkSender
+
+# Arquivo de gravação (little-endian):
+#
+#   cabeçalho (64 bytes):
+#     magic (2s) | versão (B) | max_mãos (B) | tamanho do registro (I) |
+#     registros gravados (Q) | reservado
+#   seguido de registros de tamanho fixo (ver record_dtype), em ordem de
+#   frame_number/timestamp
+RECORDING_MAGIC = b"LR"
+RECORDING_VERSION = 1
+RECORDING_HEADER = struct.Struct("<2sBBIQ")
+HEADER_SIZE = 64
+COUNT_OFFSET = 8
+
+
+def record_dtype(max_hands=2):
+    """
+    Registro de um frame: sempre max_hands mãos (as n_hands primeiras valem),
+    alinhado em 8 bytes.
+    """
+    fields = [
+        ("frame_number", "<u4"),
+        ("flags", "u1"),
+        ("n_hands", "u1"),
+        ("reserved", "V2"),
+        ("timestamp", "<f8"),
+        ("scores", "<f4", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, NUM_LANDMARKS, 4)),
+        ("handedness", "u1", (max_hands,)),
+    ]
+    size = np.dtype(fields).itemsize
+    if size % 8:
+        fields.append(("padding", "V", 8 - size % 8))
+    return np.dtype(fields)
+
+
+class LandmarkRecorder:
+    def __init__(self, path, max_hands=2, chunk_records=4096):
+        """
+        Gravação dos landmarks enviados num arquivo mapeado em memória.
+        
+        Cada frame vira um registro de tamanho fixo escrito direto no mmap
+        (uma cópia dos arrays, sem serialização). O arquivo cresce em blocos
+        de chunk_records registros; o contador do cabeçalho só avança depois
+        do registro escrito, então um leitor (ou uma gravação interrompida)
+        sempre vê registros completos.
+        
+        Args:
+            path: Arquivo de saída (sobrescrito)
+            max_hands: Máximo de mãos por registro
+            chunk_records: Registros alocados a cada crescimento do arquivo
+        """
+        self.path = path
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        self.chunk_records = max(1, chunk_records)
+        self.count = 0
+        self.last_frame_number = None
+        self.last_timestamp = None
+        
+        self._file = open(path, "w+b")
+        self._mmap = None
+        self._records = None
+        self._capacity = 0
+        self._grow()
+        RECORDING_HEADER.pack_into(self._mmap, 0, RECORDING_MAGIC, RECORDING_VERSION,
+                                   max_hands, self.dtype.itemsize, 0)
+                                   
+    def _grow(self):
+        # A view NumPy precisa sair antes do mmap ser fechado
+        self._records = None
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+        self._capacity += self.chunk_records
+        self._file.truncate(HEADER_SIZE + self._capacity * self.dtype.itemsize)
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._records = np.frombuffer(self._mmap, dtype=self.dtype, count=self._capacity,
+                                      offset=HEADER_SIZE)
+                                      
+    def append(self, hands_data):
+        """
+        Grava um frame.
+        
+        Args:
+            hands_data: HandLandmarksResult ou dicionário no formato do JSON
+            
+        Returns:
+            int: Índice do registro
+            
+        Raises:
+            ValueError: frame_number ou timestamp menor que o do registro
+                anterior (o índice depende da ordem)
+        """
+        if isinstance(hands_data, HandLandmarksResult):
+            return self.append_arrays(hands_data.frame_number, hands_data.timestamp, hands_data.flags,
+                                      hands_data.landmarks, hands_data.handedness, hands_data.scores)
+        frame_number, timestamp, flags, landmarks, handedness, scores = decode_arrays(
+            encode_hands_data(hands_data))
+        return self.append_arrays(frame_number, timestamp, flags, landmarks, handedness, scores)
+        
+    def append_arrays(self, frame_number, timestamp, flags, landmarks, handedness, scores):
+        """Grava um frame a partir dos arrays (ver HandLandmarksResult)."""
+        if self._mmap is None:
+            raise ValueError("Gravação já fechada")
+        if self.count and (frame_number < self.last_frame_number or timestamp < self.last_timestamp):
+            raise ValueError(f"Frame #{frame_number} fora de ordem (último: #{self.last_frame_number})")
+        if self.count == self._capacity:
+            self._grow()
+            
+        n = min(len(landmarks), self.max_hands)
+        record = self._records[self.count]
+        record["frame_number"] = frame_number & 0xFFFFFFFF
+        record["flags"] = flags
+        record["n_hands"] = n
+        record["timestamp"] = timestamp
+        record["scores"][:n] = scores[:n]
+        record["landmarks"][:n] = landmarks[:n]
+        record["handedness"][:n] = handedness[:n]
+        
+        self.count += 1
+        self.last_frame_number = frame_number
+        self.last_timestamp = timestamp
+        struct.pack_into("<Q", self._mmap, COUNT_OFFSET, self.count)
+        return self.count - 1
+        
+    def flush(self):
+        """Força os registros para o disco."""
+        if self._mmap is not None:
+            self._mmap.flush()
+            
+    def close(self):
+        """Fecha a gravação e corta o espaço pré-alocado não usado."""
+        if self._mmap is None:
+            return
+        self._records = None
+        self._mmap.flush()
+        self._mmap.close()
+        self._mmap = None
+        self._file.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+        self._file.close()
+        print(f"💾 {self.count} frames de landmarks gravados em {self.path}")
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    def __init__(self, path):
+        """
+        Leitura de uma gravação (LandmarkRecorder), sem cópia: `records` é
+        uma view NumPy estruturada sobre o arquivo mapeado; só as páginas
+        acessadas são lidas do disco.
+        
+        Pode ser aberta com a gravação em andamento (vê os registros
+        completos até o momento da abertura).
+        
+        Raises:
+            ValueError: Arquivo que não é uma gravação de landmarks
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) < RECORDING_HEADER.size:
+            raise ValueError(f"Gravação inválida: {path}")
+        magic, version, max_hands, record_size, count = RECORDING_HEADER.unpack_from(header)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError(f"Gravação inválida: {path}")
+            
+        self.max_hands = max_hands
+        self.dtype = record_dtype(max_hands)
+        if record_size != self.dtype.itemsize:
+            raise ValueError(f"Tamanho de registro inesperado: {record_size}")
+        # Gravação interrompida antes do close: o arquivo pode ter menos bytes que o contador
+        count = min(count, (os.path.getsize(path) - HEADER_SIZE) // record_size)
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+            
+    def __len__(self):
+        return len(self.records)
+        
+    @property
+    def frame_numbers(self):
+        return self.records["frame_number"]
+        
+    @property
+    def timestamps(self):
+        return self.records["timestamp"]
+        
+    @property
+    def landmarks(self):
+        """Array (frames, max_mãos, 21, 4); só as n_hands primeiras mãos de cada frame valem."""
+        return self.records["landmarks"]
+        
+    @property
+    def duration(self):
+        return float(self.timestamps[-1] - self.timestamps[0]) if len(self) else 0.0
+        
+    def index_of_time(self, timestamp):
+        """Primeiro registro com timestamp >= `timestamp` (busca binária, O(log n))."""
+        # bisect sobre a coluna (view com stride): não copia a coluna como o np.searchsorted
+        return bisect.bisect_left(self.timestamps, timestamp)
+        
+    def index_of_frame(self, frame_number):
+        """Primeiro registro com frame_number >= `frame_number` (O(log n))."""
+        return bisect.bisect_left(self.frame_numbers, frame_number)
+        
+    def time_range(self, start=None, end=None):
+        """Registros com start <= timestamp < end (view, sem cópia)."""
+        first = 0 if start is None else self.index_of_time(start)
+        last = len(self) if end is None else self.index_of_time(end)
+        return self.records[first:last]
+        
+    def frame_range(self, first_frame=None, last_frame=None):
+        """Registros com first_frame <= frame_number <= last_frame (view, sem cópia)."""
+        first = 0 if first_frame is None else self.index_of_frame(first_frame)
+        last = len(self) if last_frame is None else self.index_of_frame(last_frame + 1)
+        return self.records[first:last]
+        
+    def result(self, index, result=None):
+        """
+        Registro como HandLandmarksResult (reutiliza `result` se dado).
+        """
+        record = self.records[index]
+        if result is None:
+            result = HandLandmarksResult(self.max_hands)
+        n = int(record["n_hands"])
+        result.reset(int(record["frame_number"]), float(record["timestamp"]))
+        result.set_arrays(record["landmarks"][:n], record["handedness"][:n], record["scores"][:n])
+        result.flags = int(record["flags"])
+        return result
+        
+    def close(self):
+        """Solta o mapeamento (views obtidas de `records` deixam de valer)."""
+        mapping = getattr(self.records, "_mmap", None)
+        self.records = np.zeros(0, dtype=self.dtype)
+        if mapping is not None:
+            mapping.close()
+
+
+class LandmarkReplayer:
+    def __init__(self, recording, server_ip="127.0.0.1", server_port=8384, wire_format="binary",
+                 speed=1.0, restamp=False):
+        """
+        Reenvia uma gravação para os receptores, sem câmera nem MediaPipe.
+        
+        Args:
+            recording: LandmarkRecording ou caminho do arquivo
+            server_ip: IP do receptor dos landmarks
+            server_port: Porta UDP dos landmarks (padrão: 8384)
+            wire_format: "json" ou "binary" (ver landmarkProtocol.py)
+            speed: Multiplicador do ritmo original (2.0 = duas vezes mais
+                rápido); 0 = o mais rápido possível
+            restamp: True para trocar o timestamp gravado pelo do envio
+                (receptores que medem latência)
+        """
+        self.recording = recording if isinstance(recording, LandmarkRecording) else LandmarkRecording(recording)
+        self.sender = LandmarkSender(server_ip, server_port, wire_format)
+        self.speed = speed
+        self.restamp = restamp
+        self._result = HandLandmarksResult(self.recording.max_hands)
+        
+    def run(self, start=None, end=None, stop_event=None):
+        """
+        Reenvia os registros com start <= timestamp < end.
+        
+        Args:
+            start, end: Trecho da gravação (timestamps gravados); None = tudo
+            stop_event: threading.Event para interromper
+            
+        Returns:
+            int: Pacotes enviados
+        """
+        first = 0 if start is None else self.recording.index_of_time(start)
+        last = len(self.recording) if end is None else self.recording.index_of_time(end)
+        if first >= last:
+            return 0
+            
+        sent_before = self.sender.packets_sent
+        timestamps = self.recording.timestamps
+        origin = float(timestamps[first])
+        wall_start = time.perf_counter()
+        for index in range(first, last):
+            if stop_event is not None and stop_event.is_set():
+                break
+            if self.speed > 0:
+                delay = wall_start + (float(timestamps[index]) - origin) / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                    
+            result = self.recording.result(index, self._result)
+            if self.restamp:
+                result.timestamp = time.time()
+            self.sender.send_hand_data(result)
+        return self.sender.packets_sent - sent_before
+        
+    def close(self):
+        self.sender.close()
+
+
+# Reprodução standalone: python landmarkRecorder.py sessao.lrec [--speed 2]
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Informações / reenvio de uma gravação de landmarks")
+    parser.add_argument("path", help="Arquivo gravado (record_landmarks do VideoCapture)")
+    parser.add_argument("--ip", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8384)
+    parser.add_argument("--wire-format", default="binary", choices=("json", "binary"))
+    parser.add_argument("--speed", type=float, default=1.0, help="Ritmo (0 = o mais rápido possível)")
+    parser.add_argument("--start", type=float, help="Segundos a partir do início da gravação")
+    parser.add_argument("--end", type=float, help="Segundos a partir do início da gravação")
+    parser.add_argument("--info", action="store_true", help="Só mostra o resumo")
+    args = parser.parse_args()
+    
+    recording = LandmarkRecording(args.path)
+    print(f"🎞️  {len(recording)} frames | {recording.duration:.1f} s | até {recording.max_hands} mãos")
+    if len(recording):
+        hands = recording.records["n_hands"]
+        print(f"   • Frames #{recording.frame_numbers[0]} a #{recording.frame_numbers[-1]}")
+        print(f"   • Frames com mãos: {np.count_nonzero(hands)} ({np.count_nonzero(hands) / len(recording):.1%})")
+        
+    if not args.info and len(recording):
+        origin = float(recording.timestamps[0])
+        replayer = LandmarkReplayer(recording, args.ip, args.port, args.wire_format, args.speed)
+        print(f"▶️  Reenviando para {args.ip}:{args.port} ({args.speed:g}x)...")
+        try:
+            sent = replayer.run(None if args.start is None else origin + args.start,
+                                None if args.end is None else origin + args.end)
+            print(f"✅ {sent} pacotes enviados")
+        except KeyboardInterrupt:
+            print("\n⏹️  Interrompido (Ctrl+C)")
+        finally:
+            replayer.close()
@@ -0,0 +1,90 @@
+import json
+import socket
+from landmarkProtocol import encode_hands_data
+from handLandmarks import HandLandmarksResult
+from receiverFeedback import FeedbackCollector, STREAM_LANDMARKS
+
+class LandmarkSender:
+    def __init__(self, server_ip="127.0.0.1", server_port=8384, wire_format="json", feedback=False, metrics=None):
+        """
+        Envio UDP dos landmarks (JSON ou binário), sem MediaPipe.
+        
+        Args:
+            server_ip: IP do receptor (ex: "127.0.0.1")
+            server_port: Porta UDP dos landmarks (padrão: 8384)
+            wire_format: "json" (padrão) ou "binary" (ver landmarkProtocol.py)
+            feedback: True para ler os relatórios do receptor no próprio
+                socket (ver receiverFeedback.py; a sequência é o frame_number)
+            metrics: MetricsRegistry opcional para os histogramas do feedback
+        """
+        if wire_format not in ("json", "binary"):
+            raise ValueError(f"wire_format inválido: {wire_format}")
+            
+        self.server_ip = server_ip
+        self.server_port = server_port
+        self.wire_format = wire_format
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.feedback = None
+        if feedback:
+            self.feedback = FeedbackCollector(self.udp_socket, STREAM_LANDMARKS, metrics=metrics).start()
+        
+        # Estatísticas
+        self.packets_sent = 0
+        self.packets_failed = 0
+        
+    def encode_hand_data(self, hands_data):
+        """
+        Serializa os dados das mãos no formato configurado.
+        
+        Args:
+            hands_data: HandLandmarksResult ou dicionário no formato do JSON
+            
+        Returns:
+            bytes: Pacote JSON (UTF-8) ou binário
+        """
+        if isinstance(hands_data, HandLandmarksResult):
+            if self.wire_format == "binary":
+                return hands_data.to_packet()
+            hands_data = hands_data.to_dict()
+        elif self.wire_format == "binary":
+            return encode_hands_data(hands_data)
+            
+        return json.dumps(hands_data).encode('utf-8')
+        
+    def send_hand_data(self, hands_data):
+        """
+        Envia dados das mãos via UDP (JSON ou binário, conforme wire_format).
+        
+        Args:
+            hands_data: HandLandmarksResult (ou dicionário) com dados das mãos
+            
+        Returns:
+            bool: True se enviado com sucesso
+        """
+        try:
+            # Converte para JSON / binário
+            packet = self.encode_hand_data(hands_data)
+            
+            # Verifica tamanho (UDP tem limite)
+            if len(packet) > 60000:
+                print(f"⚠️ Dados muito grandes: {len(packet)} bytes")
+                self.packets_failed += 1
+                return False
+                
+            # Envia via UDP
+            self.udp_socket.sendto(packet, (self.server_ip, self.server_port))
+            self.packets_sent += 1
+            if self.feedback is not None:
+                self.feedback.on_sent(hands_data["frame_number"] & 0xFFFFFFFF)
+            return True
+            
+        except Exception as e:
+            print(f"❌ Erro ao enviar dados: {e}")
+            self.packets_failed += 1
+            return False
+            
+    def close(self):
+        """Fecha o socket."""
+        if self.feedback is not None:
+            self.feedback.close()
+        self.udp_socket.close()
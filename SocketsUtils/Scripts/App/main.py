@@ -1,15 +1,8 @@
 from videoCapture import VideoCapture # type: ignore
 
-from handLandmarkDetector import HandLandmarkDetector # type: ignore 
-
-import threading 
-import time 
-
-
 if __name__ == "__main__":
     print("APP INIT")
-    
-    obj = VideoCapture(0,True)
-    t1 = threading.Thread(target=obj.initVideoCapture)
-    t1.start()
-    
\ No newline at end of file
+    # Captura e vídeo começam na hora; o MediaPipe carrega em background
+    # e os landmarks começam a sair quando o modelo fica pronto
+    obj = VideoCapture(0, True, model_loading="background")
+    obj.initVideoCapture()
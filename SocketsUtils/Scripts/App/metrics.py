@@ -0,0 +1,423 @@
+import json
+import socket
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Limites (ms) dos buckets de latência: fixos, para observe() ser só uma busca binária
+DEFAULT_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 3, 5, 7.5, 10, 15, 20, 30, 50, 75, 100, 150, 250, 500, 1000)
+
+# Marcas da linha do tempo de cada frame, da captura ao envio (a
+# codificação fica dentro do sender: a duração dela está no histograma "encode")
+TIMELINE_STAGES = ("capture", "inference_start", "inference_done", "landmarks_sent",
+                   "encode_start", "sent")
+
+
+class Counter:
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0
+        
+    def inc(self, n=1):
+        self.value += n
+
+
+class Gauge:
+    __slots__ = ("value",)
+    
+    def __init__(self):
+        self.value = 0.0
+        
+    def set(self, value):
+        self.value = value
+
+
+class Histogram:
+    def __init__(self, buckets_ms=DEFAULT_BUCKETS_MS):
+        """
+        Histograma de latência com buckets fixos (ms).
+        
+        observe() não aloca: incrementa um bucket e acumula soma/máximo.
+        Os percentis são estimados pelos limites dos buckets.
+        """
+        self.bounds = tuple(buckets_ms)
+        self.counts = [0] * (len(self.bounds) + 1)  # último = acima do maior limite
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        
+    def observe(self, value_ms):
+        self.counts[bisect_left(self.bounds, value_ms)] += 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+            
+    def observe_since(self, start):
+        """Registra o tempo desde `start` (time.perf_counter())."""
+        self.observe((time.perf_counter() - start) * 1000.0)
+        
+    def percentile(self, q):
+        """Limite superior do bucket que contém o percentil q (0-100)."""
+        if not self.count:
+            return 0.0
+        target = self.count * q / 100.0
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.bounds[index] if index < len(self.bounds) else self.max
+        return self.max
+        
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max,
+            "buckets_ms": list(self.bounds),
+            "counts": list(self.counts),
+        }
+
+
+class FrameTimeline:
+    def __init__(self, stages=TIMELINE_STAGES, capacity=256):
+        """
+        Marcas de tempo por frame (captura → envio) num anel pré-alocado.
+        
+        Cada frame ocupa a linha frame_number % capacity; as marcas de
+        "sent"/"landmarks_sent" também alimentam os histogramas captura → envio.
+        """
+        self.stages = tuple(stages)
+        self._index = {stage: i for i, stage in enumerate(self.stages)}
+        self.capacity = capacity
+        # Listas simples: indexar arrays NumPy elemento a elemento custa mais
+        self._times = [[None] * len(self.stages) for _ in range(capacity)]
+        self._frames = [-1] * capacity
+        self.capture_to_send = Histogram()
+        self.capture_to_landmarks = Histogram()
+        
+    def mark(self, frame_number, stage, t=None):
+        t = time.perf_counter() if t is None else t
+        row = frame_number % self.capacity
+        times = self._times[row]
+        if self._frames[row] != frame_number:
+            self._frames[row] = frame_number
+            for i in range(len(times)):
+                times[i] = None
+        times[self._index[stage]] = t
+        
+        if stage == "sent" and times[0] is not None:
+            self.capture_to_send.observe((t - times[0]) * 1000.0)
+        elif stage == "landmarks_sent" and times[0] is not None:
+            self.capture_to_landmarks.observe((t - times[0]) * 1000.0)
+            
+    def recent(self, n=5):
+        """Últimos n frames: offsets (ms) de cada marca em relação à captura."""
+        rows = sorted((frame, row) for row, frame in enumerate(self._frames) if frame >= 0)[-n:]
+        recent = []
+        for frame, row in rows:
+            times = list(self._times[row])
+            entry = {"frame": frame}
+            if times[0] is not None:
+                entry.update({stage: round((times[i] - times[0]) * 1000.0, 3)
+                              for i, stage in enumerate(self.stages)
+                              if i > 0 and times[i] is not None})
+            recent.append(entry)
+        return recent
+
+
+class _NullMetric:
+    """Métrica desligada: todos os métodos são no-op."""
+    value = 0
+    count = 0
+    
+    def inc(self, n=1):
+        pass
+        
+    def set(self, value):
+        pass
+        
+    def observe(self, value_ms):
+        pass
+        
+    def observe_since(self, start):
+        pass
+        
+    def mark(self, frame_number, stage, t=None):
+        pass
+
+
+NULL_METRIC = _NullMetric()
+
+
+class MetricsRegistry:
+    def __init__(self, enabled=True):
+        """
+        Registro de métricas do pipeline.
+        
+        Com enabled=False todos os counters/gauges/histogramas/timeline
+        são o mesmo objeto no-op: o loop continua chamando, mas nada é
+        medido nem guardado (e o código chamador não precisa de ifs).
+        
+        Args:
+            enabled: False para desligar toda a instrumentação
+        """
+        self.enabled = enabled
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.timeline = FrameTimeline() if enabled else NULL_METRIC
+        self._collectors = []
+        self._lock = threading.Lock()
+        
+    def counter(self, name):
+        if not self.enabled:
+            return NULL_METRIC
+        with self._lock:
+            return self.counters.setdefault(name, Counter())
+            
+    def gauge(self, name):
+        if not self.enabled:
+            return NULL_METRIC
+        with self._lock:
+            return self.gauges.setdefault(name, Gauge())
+            
+    def histogram(self, name, buckets_ms=DEFAULT_BUCKETS_MS):
+        if not self.enabled:
+            return NULL_METRIC
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(buckets_ms)
+            return self.histograms[name]
+            
+    def add_collector(self, fn):
+        """
+        Função chamada a cada snapshot (fora do loop), para atualizar
+        gauges a partir de estado que já existe (ex: tamanho de filas).
+        """
+        self._collectors.append(fn)
+        
+    def snapshot(self):
+        """Estado atual de todas as métricas (dict serializável em JSON)."""
+        if not self.enabled:
+            return {"enabled": False}
+        for collector in self._collectors:
+            collector(self)
+        with self._lock:
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+            histograms = dict(self.histograms)
+        histograms["capture_to_send"] = self.timeline.capture_to_send
+        histograms["capture_to_landmarks"] = self.timeline.capture_to_landmarks
+        return {
+            "enabled": True,
+            "time": time.time(),
+            "counters": {name: c.value for name, c in counters.items()},
+            "gauges": {name: g.value for name, g in gauges.items()},
+            "histograms": {name: h.snapshot() for name, h in histograms.items() if h.count},
+            "timeline": self.timeline.recent(),
+        }
+
+
+class ConsoleSink:
+    def __init__(self, format_line):
+        """Mostra uma linha por snapshot; format_line(snapshot, rates) -> str."""
+        self.format_line = format_line
+        
+    def write(self, snapshot, rates):
+        print(self.format_line(snapshot, rates))
+
+
+class FileSink:
+    def __init__(self, path):
+        """Acrescenta um snapshot JSON por linha ao arquivo."""
+        self.file = open(path, "a", encoding="utf-8")
+        
+    def write(self, snapshot, rates):
+        self.file.write(json.dumps(dict(snapshot, rates=rates)) + "\n")
+        self.file.flush()
+        
+    def close(self):
+        self.file.close()
+
+
+class UDPSink:
+    def __init__(self, host="127.0.0.1", port=9101):
+        """Envia cada snapshot como um datagrama JSON."""
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        
+    def write(self, snapshot, rates):
+        # Só o resumo: os buckets completos não cabem num datagrama com folga
+        compact = dict(snapshot, rates=rates, histograms={
+            name: {k: v for k, v in h.items() if k not in ("buckets_ms", "counts")}
+            for name, h in snapshot.get("histograms", {}).items()})
+        try:
+            self.socket.sendto(json.dumps(compact).encode("utf-8"), self.address)
+        except OSError:
+            pass
+            
+    def close(self):
+        self.socket.close()
+
+
+class MetricsReporter:
+    def __init__(self, registry, sinks, interval=1.0):
+        """
+        Thread que tira snapshots a cada `interval` segundos e os entrega
+        aos sinks. Prints e serialização ficam fora do loop de captura.
+        
+        Args:
+            registry: MetricsRegistry
+            sinks: Lista de ConsoleSink/FileSink/UDPSink
+            interval: Período em segundos
+        """
+        self.registry = registry
+        self.sinks = list(sinks)
+        self.interval = interval
+        self.last = {"enabled": registry.enabled}
+        self._previous = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="metrics", daemon=True)
+        
+    def _rates(self, snapshot):
+        """Taxa (por segundo) de cada counter desde o snapshot anterior."""
+        previous = self._previous
+        self._previous = snapshot
+        if previous is None:
+            return {}
+        elapsed = snapshot["time"] - previous["time"]
+        if elapsed <= 0:
+            return {}
+        return {name: (value - previous["counters"].get(name, 0)) / elapsed
+                for name, value in snapshot["counters"].items()}
+                
+    def report(self):
+        snapshot = self.registry.snapshot()
+        self.last = snapshot
+        if not snapshot["enabled"]:
+            return
+        rates = self._rates(snapshot)
+        for sink in self.sinks:
+            sink.write(snapshot, rates)
+            
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.report()
+            except Exception as e:
+                print(f"⚠️ Erro ao exportar métricas: {e}")
+                
+    def start(self):
+        if self.registry.enabled:
+            # Referência para as taxas do primeiro relatório
+            self._previous = self.registry.snapshot()
+            self._thread.start()
+        return self
+        
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+        for sink in self.sinks:
+            if hasattr(sink, "close"):
+                sink.close()
+
+
+class MetricsHTTPServer:
+    def __init__(self, registry, host="127.0.0.1", port=9100):
+        """
+        Endpoint HTTP local: GET /metrics devolve o snapshot em JSON.
+        
+        O snapshot é montado na thread do servidor, sob demanda.
+        """
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(registry.snapshot()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                
+            def log_message(self, format, *args):
+                pass
+                
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True)
+        
+    def start(self):
+        self._thread.start()
+        print(f"📈 Métricas em http://{self.server.server_address[0]}:{self.port}/metrics")
+        return self
+        
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def create_sinks(export):
+    """
+    Sinks a partir de uma lista de destinos:
+    "file:caminho.jsonl", "udp:host:porta". "http:porta" é tratado à parte
+    (ver MetricsHTTPServer).
+    """
+    sinks = []
+    for target in export or ():
+        kind, _, rest = target.partition(":")
+        if kind == "file":
+            sinks.append(FileSink(rest))
+        elif kind == "udp":
+            host, _, port = rest.rpartition(":")
+            sinks.append(UDPSink(host or "127.0.0.1", int(port)))
+        elif kind != "http":
+            raise ValueError(f"Destino de métricas inválido: {target}")
+    return sinks
+
+
+def start_http_export(registry, export):
+    """Sobe o MetricsHTTPServer se algum destino for "http:porta"."""
+    for target in export or ():
+        kind, _, port = target.partition(":")
+        if kind == "http" and registry.enabled:
+            return MetricsHTTPServer(registry, port=int(port or 9100)).start()
+    return None
+
+
+# Teste standalone: custo de observe() ligado e desligado
+if __name__ == "__main__":
+    print("\n🧪 TESTE DAS MÉTRICAS")
+    print("=" * 50 + "\n")
+    
+    iterations = 200000
+    for enabled in (True, False):
+        registry = MetricsRegistry(enabled)
+        histogram = registry.histogram("encode")
+        counter = registry.counter("frames")
+        start = time.perf_counter()
+        for i in range(iterations):
+            counter.inc()
+            histogram.observe(i % 40)
+            registry.timeline.mark(i, "capture")
+        elapsed_ns = (time.perf_counter() - start) / iterations * 1e9
+        state = "ligado" if enabled else "desligado"
+        print(f"⏱️  {state:9s}: {elapsed_ns:6.0f} ns por frame (inc + observe + mark)")
+        
+    registry = MetricsRegistry()
+    for frame_number in range(100):
+        registry.timeline.mark(frame_number, "capture")
+        registry.timeline.mark(frame_number, "sent")
+    snapshot = registry.snapshot()
+    assert snapshot["histograms"]["capture_to_send"]["count"] == 100
+    print(f"\n📊 {json.dumps(snapshot['timeline'][-1])}")
+    print("\n✅ Teste concluído\n")
@@ -0,0 +1,64 @@
+import numpy as np
+import cv2
+
+
+class MotionGate:
+    def __init__(self, pixel_threshold=12, changed_fraction=0.002, size=(80, 60), max_skip=30):
+        """
+        Detector de mudança barato, rodado antes de qualquer outro estágio.
+        
+        Compara uma miniatura em tons de cinza do frame com a do último
+        frame que passou. A miniatura (INTER_AREA) já faz a média dos
+        pixels, o que filtra boa parte do ruído do sensor.
+        
+        Args:
+            pixel_threshold: Diferença (0-255) para um pixel da miniatura contar como alterado
+            changed_fraction: Fração mínima de pixels alterados para o frame passar
+            size: (largura, altura) da miniatura
+            max_skip: Deixa passar um frame a cada N parados, mesmo sem
+                mudança (o receptor e o tracker ressincronizam); 0 = nunca
+        """
+        self.pixel_threshold = pixel_threshold
+        self.size = size
+        self.min_changed = max(1, int(changed_fraction * size[0] * size[1]))
+        self.max_skip = max_skip
+        self._reference = None
+        self._skipped_in_row = 0
+        
+        # Estatísticas
+        self.checked = 0
+        self.skipped = 0
+        
+    def check(self, frame):
+        """
+        True se o frame mudou (deve ser processado), False se está parado.
+        
+        Args:
+            frame: Frame BGR
+        """
+        self.checked += 1
+        small = cv2.cvtColor(cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA),
+                             cv2.COLOR_BGR2GRAY)
+                             
+        if self._reference is not None and self._reference.shape == small.shape:
+            changed = np.count_nonzero(cv2.absdiff(small, self._reference) > self.pixel_threshold)
+            if changed < self.min_changed and not (self.max_skip and self._skipped_in_row >= self.max_skip):
+                self.skipped += 1
+                self._skipped_in_row += 1
+                return False
+                
+        # A referência só anda quando o frame passa: mudanças lentas acumulam até passar
+        self._reference = small
+        self._skipped_in_row = 0
+        return True
+        
+    def reset(self):
+        self._reference = None
+        self._skipped_in_row = 0
+        
+    def stats(self):
+        return {
+            "checked": self.checked,
+            "skipped": self.skipped,
+            "skip_rate": self.skipped / self.checked if self.checked else 0.0,
+        }
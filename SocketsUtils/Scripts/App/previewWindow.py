@@ -0,0 +1,146 @@
+import threading
+import time
+
+import numpy as np
+import cv2
+from frameSource import decode_mjpeg
+from landmarkProtocol import code_to_label
+
+# Ligações entre os 21 landmarks da mão (mesma topologia do mp.solutions.hands)
+HAND_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+])
+
+
+def draw_hands(image, result):
+    """
+    Desenha as mãos de um HandLandmarksResult direto dos arrays (sem o
+    drawing_utils do MediaPipe).
+    """
+    h, w = image.shape[:2]
+    for idx in range(result.n_hands):
+        points = (result.landmarks[idx, :, :2] * (w, h)).astype(np.int32)
+        cv2.polylines(image, points[HAND_CONNECTIONS], False, (255, 255, 255), 2)
+        for x, y in points:
+            cv2.circle(image, (int(x), int(y)), 4, (0, 0, 255), -1)
+            
+        # Label da mão perto do pulso
+        cx, cy = points[0]
+        label = code_to_label(int(result.handedness[idx]))
+        cv2.putText(image, f"{label} ({float(result.scores[idx]):.2f})", (int(cx) - 50, int(cy) - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+
+
+class PreviewWindow:
+    def __init__(self, title, max_fps=15, decode_scale=1):
+        """
+        Janela de debug numa thread própria.
+        
+        Os loops só entregam referências (o último frame e os últimos
+        landmarks), sem copiar nem esperar: a cópia, as anotações, o
+        imshow e o waitKey acontecem aqui, no máximo max_fps vezes por
+        segundo. Frames entregues entre dois desenhos são descartados.
+        
+        Args:
+            title: Título da janela
+            max_fps: Limite de redesenhos por segundo
+            decode_scale: Redução da decodificação de frames JPEG (passthrough)
+        """
+        self.title = title
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self.decode_scale = decode_scale
+        self.closed = threading.Event()  # ESC ou janela fechada
+        self._stop = threading.Event()
+        self._new = threading.Event()
+        self._latest = None      # (frame, linhas de texto, jpeg)
+        self._landmarks = None   # cópia do último HandLandmarksResult
+        self._thread = None
+        
+        # Estatísticas
+        self.frames_offered = 0
+        self.frames_rendered = 0
+        
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name="preview", daemon=True)
+        self._thread.start()
+        return self
+        
+    def show_frame(self, frame, lines=(), jpeg=False):
+        """
+        Entrega o frame mais recente (não bloqueia, não copia).
+        
+        O frame não pode ser alterado depois de entregue (os loops de
+        captura sempre produzem um array novo por frame).
+        
+        Args:
+            frame: Frame BGR, ou o JPEG espelhado no receptor se jpeg=True
+            lines: Linhas de texto desenhadas no canto
+            jpeg: True para frames MJPEG do passthrough (decodificados e
+                espelhados aqui)
+        """
+        self.frames_offered += 1
+        # Troca de referência: atômica, sem lock
+        self._latest = (frame, lines, jpeg)
+        self._new.set()
+        
+    def show_landmarks(self, result):
+        """Entrega os últimos landmarks (cópia dos arrays, alguns KB)."""
+        self._landmarks = result.copy()
+        
+    def _render(self, frame, lines, jpeg):
+        if jpeg:
+            image = decode_mjpeg(frame, self.decode_scale)
+            if image is None:
+                return None
+            image = cv2.flip(image, 1)
+        else:
+            image = frame.copy()
+            
+        landmarks = self._landmarks
+        if landmarks is not None:
+            draw_hands(image, landmarks)
+        for row, line in enumerate(lines):
+            cv2.putText(image, line, (10, 30 + 30 * row), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+        return image
+        
+    def _loop(self):
+        next_render = 0.0
+        try:
+            while not self._stop.is_set():
+                # Sem frame novo, ainda processa os eventos da janela
+                if self._new.wait(timeout=0.05):
+                    delay = next_render - time.perf_counter()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                    self._new.clear()
+                    image = self._render(*self._latest)
+                    next_render = time.perf_counter() + self.interval
+                    if image is not None:
+                        cv2.imshow(self.title, image)
+                        self.frames_rendered += 1
+                        
+                if self.frames_rendered:
+                    key = cv2.waitKey(1) & 0xFF
+                    if key == 27 or cv2.getWindowProperty(self.title, cv2.WND_PROP_VISIBLE) < 1:
+                        self.closed.set()
+                        break
+        finally:
+            if self.frames_rendered:
+                cv2.destroyWindow(self.title)
+                
+    def stop(self):
+        """Fecha a janela e encerra a thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            
+    def stats(self):
+        return {
+            "offered": self.frames_offered,
+            "rendered": self.frames_rendered,
+            "dropped": self.frames_offered - self.frames_rendered,
+        }
@@ -0,0 +1,177 @@
+import time
+from collections import deque
+
+
+class AdaptiveRateController:
+    def __init__(self, target_bitrate=None, fps=30, max_frame_bytes=None,
+                 initial_quality=80, min_quality=30, max_quality=90, quality_step=5,
+                 scales=(1.0, 0.75, 0.5), window=30, cooldown=5):
+        """
+        Controle em malha fechada da qualidade JPEG (e da escala do frame).
+        
+        O orçamento por frame vem de `max_frame_bytes` e/ou de
+        `target_bitrate / fps`. A cada frame o controlador olha a média
+        dos tamanhos recentes e as falhas de envio: acima do orçamento
+        reduz a qualidade (e, no mínimo de qualidade, reduz a escala);
+        com folga, recupera primeiro a escala e depois a qualidade.
+        
+        Args:
+            target_bitrate: Bitrate alvo em bits/s (None = sem alvo)
+            fps: Taxa de frames esperada (para converter bitrate em bytes/frame)
+            max_frame_bytes: Limite rígido por frame (None = sem limite)
+            initial_quality: Qualidade JPEG inicial
+            min_quality: Qualidade mínima
+            max_quality: Qualidade máxima
+            quality_step: Passo de ajuste da qualidade
+            scales: Escalas permitidas, da maior para a menor
+            window: Número de frames no histórico de tamanhos
+            cooldown: Frames entre dois ajustes consecutivos
+        """
+        if target_bitrate is None and max_frame_bytes is None:
+            raise ValueError("Informe target_bitrate e/ou max_frame_bytes")
+            
+        self.target_bitrate = target_bitrate
+        self.fps = fps
+        self.max_frame_bytes = max_frame_bytes
+        self.min_quality = min_quality
+        self.max_quality = max_quality
+        self.quality_step = quality_step
+        self.scales = tuple(scales)
+        self.cooldown = cooldown
+        
+        self.quality = max(min_quality, min(max_quality, initial_quality))
+        self.scale_index = 0
+        
+        self._sizes = deque(maxlen=window)
+        self._sent = deque(maxlen=window)  # (momento, bytes) para o bitrate medido
+        self._recent_failures = 0
+        self._frames_since_change = 0
+        
+        # Estatísticas
+        self.adjustments = 0
+        self.reencodes = 0
+        self.failures = 0
+        
+    @property
+    def frame_budget(self):
+        """Orçamento alvo de bytes por frame."""
+        budgets = []
+        if self.target_bitrate is not None:
+            budgets.append(self.target_bitrate / 8.0 / self.fps)
+        if self.max_frame_bytes is not None:
+            budgets.append(self.max_frame_bytes)
+        return int(min(budgets))
+        
+    @property
+    def scale(self):
+        """Escala atual do frame (1.0 = resolução original)."""
+        return self.scales[self.scale_index]
+        
+    @staticmethod
+    def _steps_for(ratio):
+        """Passos de ajuste proporcionais ao excesso (1 a 4)."""
+        return 1 + min(3, max(0, int((ratio - 1.0) * 2)))
+
+    def _decrease(self, steps=1):
+        """Reduz qualidade; no mínimo de qualidade, reduz a escala."""
+        if self.quality - self.quality_step * steps >= self.min_quality:
+            self.quality -= self.quality_step * steps
+        elif self.quality > self.min_quality:
+            self.quality = self.min_quality
+        elif self.scale_index + 1 < len(self.scales):
+            self.scale_index += 1
+            # Com resolução menor há espaço para subir a qualidade de novo
+            self.quality = (self.min_quality + self.max_quality) // 2
+        else:
+            return False
+        self.adjustments += 1
+        self._frames_since_change = 0
+        return True
+        
+    def _increase(self):
+        """Recupera escala e depois qualidade quando há folga."""
+        if self.scale_index > 0 and self.quality >= self.max_quality:
+            self.scale_index -= 1
+            self.quality = self.min_quality
+        elif self.quality + self.quality_step <= self.max_quality:
+            self.quality += self.quality_step
+        else:
+            return False
+        self.adjustments += 1
+        self._frames_since_change = 0
+        return True
+        
+    def on_oversize(self, size, limit):
+        """
+        Frame acima do limite rígido: ajusta já para re-codificar.
+        
+        Args:
+            size: Tamanho do frame codificado
+            limit: Limite rígido em bytes
+            
+        Returns:
+            bool: True se ainda há como reduzir (vale re-codificar)
+        """
+        self.reencodes += 1
+        return self._decrease(self._steps_for(size / limit))
+        
+    def update(self, encoded_size, success=True):
+        """
+        Registra o resultado de um frame e ajusta qualidade/escala.
+        
+        Args:
+            encoded_size: Tamanho do frame codificado
+            success: False se o envio falhou
+        """
+        self._frames_since_change += 1
+        self._sizes.append(encoded_size)
+        
+        if success:
+            self._sent.append((time.monotonic(), encoded_size))
+            self._recent_failures = max(0, self._recent_failures - 1)
+        else:
+            self.failures += 1
+            self._recent_failures += 1
+            
+        if self._frames_since_change < self.cooldown:
+            return
+            
+        budget = self.frame_budget
+        average = sum(self._sizes) / len(self._sizes)
+        
+        if average > 0.95 * budget:
+            self._decrease(self._steps_for(average / budget))
+        elif self._recent_failures > 0:
+            self._decrease()
+        elif average < 0.7 * budget:
+            self._increase()
+            
+    def record_failure(self):
+        """Registra falha sem frame enviado (ex: codificação falhou)."""
+        self.failures += 1
+        self._recent_failures += 1
+        self._frames_since_change += 1
+        if self._frames_since_change >= self.cooldown:
+            self._decrease()
+            
+    def measured_bitrate(self):
+        """Bitrate medido (bits/s) na janela de frames enviados."""
+        if len(self._sent) < 2:
+            return 0.0
+        elapsed = self._sent[-1][0] - self._sent[0][0]
+        if elapsed <= 0:
+            return 0.0
+        total = sum(size for _, size in list(self._sent)[1:])
+        return total * 8.0 / elapsed
+        
+    def stats(self):
+        """Retorna o estado atual do controlador."""
+        return {
+            "quality": self.quality,
+            "scale": self.scale,
+            "frame_budget": self.frame_budget,
+            "bitrate": self.measured_bitrate(),
+            "adjustments": self.adjustments,
+            "reencodes": self.reencodes,
+            "failures": self.failures,
+        }
@@ -0,0 +1,449 @@
+import select
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+from metrics import Histogram
+
+# Relatório do receptor (network byte order), enviado de volta ao endereço
+# de origem dos pacotes, ou seja, ao próprio socket de envio do sender:
+#   magic (2s) | versão (B) | stream (B) | maior seq (I) | recebidos (I) |
+#   perdidos (I) | jitter em ms (f) | n_ecos (B) | reservado (3x)
+#   para cada eco:
+#     seq (I) | timestamp do pacote (d) | espera no receptor em ms (f)
+FEEDBACK_MAGIC = b"RR"
+FEEDBACK_VERSION = 1
+FEEDBACK_HEADER = struct.Struct("!2sBBIIIfB3x")  # 24 bytes
+FEEDBACK_ECHO = struct.Struct("!Idf")            # 16 bytes
+MAX_ECHOES = 8
+
+# Streams (a sequência de cada um)
+STREAM_VIDEO = 0      # frame_id do cabeçalho de fragmento (contínuo, inclui heartbeats)
+STREAM_LANDMARKS = 1  # frame_number dos landmarks (com buracos: frames sem inferência)
+STREAM_NAMES = ("video", "landmarks")
+
+# Perda desconhecida pelo receptor (sequência com buracos): o sender calcula
+LOST_UNKNOWN = 0xFFFFFFFF
+
+
+def is_feedback_report(data):
+    """True se os bytes são um relatório do canal de retorno."""
+    return len(data) >= FEEDBACK_HEADER.size and data[:2] == FEEDBACK_MAGIC
+
+
+def pack_report(stream, highest_seq, received, lost, jitter_ms, echoes=()):
+    """
+    Monta um relatório do receptor.
+    
+    Args:
+        stream: STREAM_VIDEO ou STREAM_LANDMARKS
+        highest_seq: Maior sequência recebida (uint32, circular)
+        received: Pacotes/frames entregues desde o início (cumulativo)
+        lost: Perdidos desde o início, ou LOST_UNKNOWN
+        jitter_ms: Jitter entre chegadas (RFC 3550), em ms
+        echoes: Até MAX_ECHOES tuplas (seq, timestamp, espera_ms)
+        
+    Returns:
+        bytearray: Relatório pronto para envio
+    """
+    echoes = list(echoes)[-MAX_ECHOES:]
+    report = bytearray(FEEDBACK_HEADER.size + len(echoes) * FEEDBACK_ECHO.size)
+    FEEDBACK_HEADER.pack_into(report, 0, FEEDBACK_MAGIC, FEEDBACK_VERSION, stream,
+                              highest_seq & 0xFFFFFFFF, received & 0xFFFFFFFF,
+                              min(lost, LOST_UNKNOWN), jitter_ms, len(echoes))
+    offset = FEEDBACK_HEADER.size
+    for seq, timestamp, hold_ms in echoes:
+        FEEDBACK_ECHO.pack_into(report, offset, seq & 0xFFFFFFFF, timestamp, hold_ms)
+        offset += FEEDBACK_ECHO.size
+    return report
+
+
+def parse_report(data):
+    """
+    Lê um relatório do receptor.
+    
+    Returns:
+        dict: stream, highest_seq, received, lost (None se desconhecida),
+        jitter_ms e echoes [(seq, timestamp, espera_ms)], ou None se inválido
+    """
+    if not is_feedback_report(data):
+        return None
+        
+    magic, version, stream, highest_seq, received, lost, jitter_ms, n_echoes = \
+        FEEDBACK_HEADER.unpack_from(data)
+    if version != FEEDBACK_VERSION or len(data) < FEEDBACK_HEADER.size + n_echoes * FEEDBACK_ECHO.size:
+        return None
+        
+    return {
+        "stream": stream,
+        "highest_seq": highest_seq,
+        "received": received,
+        "lost": None if lost == LOST_UNKNOWN else lost,
+        "jitter_ms": jitter_ms,
+        "echoes": [FEEDBACK_ECHO.unpack_from(data, FEEDBACK_HEADER.size + i * FEEDBACK_ECHO.size)
+                   for i in range(n_echoes)],
+    }
+
+
+def _is_newer(a, b):
+    """True se a sequência a é posterior a b (comparação circular uint32)."""
+    return a != b and ((a - b) & 0xFFFFFFFF) < 0x80000000
+
+
+class FeedbackReporter:
+    def __init__(self, sock, stream=STREAM_VIDEO, interval=0.5, max_echoes=4, contiguous=True):
+        """
+        Lado do receptor do canal de retorno.
+        
+        O receptor chama on_packet() a cada frame/pacote entregue. A cada
+        `interval` segundos sai um relatório pelo mesmo socket, para o
+        endereço de origem do último pacote (o socket do sender): sem
+        thread, sem porta nova e sem relógios sincronizados.
+        
+        Args:
+            sock: Socket UDP do receptor
+            stream: STREAM_VIDEO ou STREAM_LANDMARKS
+            interval: Segundos entre relatórios
+            max_echoes: Timestamps ecoados por relatório (os mais recentes)
+            contiguous: True se o sender não pula sequências (frame_id do
+                vídeo); False para os landmarks, cuja perda fica
+                LOST_UNKNOWN e é calculada pelo sender
+        """
+        self.socket = sock
+        self.stream = stream
+        self.interval = interval
+        self.contiguous = contiguous
+        self._echoes = deque(maxlen=min(max_echoes, MAX_ECHOES))  # (seq, timestamp, chegada)
+        self._address = None
+        self._next_report = 0.0
+        self._first_seq = None
+        self._last_transit = None
+        
+        # Estado reportado
+        self.highest_seq = None
+        self.received = 0
+        self.jitter_ms = 0.0
+        self.reports_sent = 0
+        
+    @property
+    def lost(self):
+        """Perdidos desde o primeiro pacote (LOST_UNKNOWN sem sequência contínua)."""
+        if not self.contiguous:
+            return LOST_UNKNOWN
+        if self.highest_seq is None:
+            return 0
+        expected = ((self.highest_seq - self._first_seq) & 0xFFFFFFFF) + 1
+        return max(0, expected - self.received)
+        
+    def on_packet(self, seq, timestamp, address):
+        """
+        Registra um frame/pacote entregue e envia o relatório se for a hora.
+        
+        Args:
+            seq: Sequência do pacote (frame_id ou frame_number)
+            timestamp: Timestamp do sender no pacote (captura)
+            address: Origem do pacote (destino do relatório)
+        """
+        arrival = time.monotonic()
+        self.received += 1
+        if self.highest_seq is None:
+            self._first_seq = seq
+            self.highest_seq = seq
+        elif _is_newer(seq, self.highest_seq):
+            self.highest_seq = seq
+            
+        # Jitter da RFC 3550: a diferença entre relógios some na subtração
+        transit = time.time() - timestamp
+        if self._last_transit is not None:
+            delta_ms = abs(transit - self._last_transit) * 1000.0
+            self.jitter_ms += (delta_ms - self.jitter_ms) / 16.0
+        self._last_transit = transit
+        
+        self._echoes.append((seq, timestamp, arrival))
+        self._address = address
+        if arrival >= self._next_report:
+            self.send_report(arrival)
+            
+    def send_report(self, now=None):
+        """Envia o relatório agora (ecos pendentes saem uma vez só)."""
+        if self._address is None:
+            return False
+        now = time.monotonic() if now is None else now
+        echoes = [(seq, timestamp, (now - arrival) * 1000.0) for seq, timestamp, arrival in self._echoes]
+        report = pack_report(self.stream, self.highest_seq, self.received, self.lost,
+                             self.jitter_ms, echoes)
+        self._next_report = now + self.interval
+        try:
+            self.socket.sendto(report, self._address)
+        except OSError:
+            return False
+        self._echoes.clear()
+        self.reports_sent += 1
+        return True
+        
+    def stats(self):
+        return {
+            "stream": STREAM_NAMES[self.stream],
+            "highest_seq": self.highest_seq,
+            "received": self.received,
+            "lost": None if self.lost == LOST_UNKNOWN else self.lost,
+            "jitter_ms": round(self.jitter_ms, 3),
+            "reports_sent": self.reports_sent,
+        }
+
+
+class _ReceiverState:
+    def __init__(self, address):
+        self.address = address
+        self.name = f"{address[0]}:{address[1]}"
+        self.reports = 0
+        self.last_report = 0.0
+        self.highest_seq = None
+        self.received = 0
+        self.receiver_lost = None
+        self.jitter_ms = 0.0
+        # (recebidos, enviados até a maior seq) no primeiro e no último relatório
+        self.baseline = None
+        self.last = None
+        self.window_delivery = None
+        self.latency = Histogram()
+        self.rtt = Histogram()
+        
+    @property
+    def expected(self):
+        return self.last[1] - self.baseline[1] if self.baseline is not None else 0
+        
+    @property
+    def delivered(self):
+        return self.last[0] - self.baseline[0] if self.baseline is not None else 0
+        
+    @property
+    def delivery_rate(self):
+        return min(1.0, self.delivered / self.expected) if self.expected > 0 else None
+        
+    def stats(self):
+        delivery = self.delivery_rate
+        return {
+            "highest_seq": self.highest_seq,
+            "received": self.received,
+            "lost": max(0, self.expected - self.delivered),
+            "receiver_lost": self.receiver_lost,
+            "delivery_rate": round(delivery, 4) if delivery is not None else None,
+            "window_delivery_rate": round(self.window_delivery, 4) if self.window_delivery is not None else None,
+            "jitter_ms": round(self.jitter_ms, 3),
+            "latency_p50_ms": self.latency.percentile(50),
+            "latency_p95_ms": self.latency.percentile(95),
+            "latency_p99_ms": self.latency.percentile(99),
+            "rtt_p50_ms": self.rtt.percentile(50),
+            "reports": self.reports,
+            "last_report_s": round(time.monotonic() - self.last_report, 1),
+        }
+
+
+class FeedbackCollector:
+    def __init__(self, sock, stream=STREAM_VIDEO, metrics=None, log_size=4096):
+        """
+        Lado do sender do canal de retorno: uma thread lê os relatórios que
+        chegam no socket de envio e os agrega por receptor.
+        
+        Cada envio entra num anel (seq → momento do envio, total enviado).
+        A entrega é medida contra o que foi de fato enviado entre dois
+        relatórios (o sendto com sucesso não diz se chegou), e o eco de
+        cada timestamp vira a latência da captura até o receptor, toda
+        no relógio do sender:
+        
+            total = agora - timestamp - espera no receptor
+            rtt   = agora - envio - espera no receptor
+            captura → receptor ≈ total - rtt / 2
+            
+        Args:
+            sock: Socket de envio (o mesmo do sendto)
+            stream: STREAM_VIDEO ou STREAM_LANDMARKS
+            metrics: MetricsRegistry opcional: histogramas
+                "feedback.<stream>.latency" e "feedback.<stream>.rtt" e o
+                gauge "feedback.<stream>.delivery" (todos os receptores)
+            log_size: Envios lembrados (cobre log_size / fps segundos)
+        """
+        self.socket = sock
+        self.stream = stream
+        self.log_size = log_size
+        self._log = [None] * log_size
+        self._receivers = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        
+        prefix = f"feedback.{STREAM_NAMES[stream]}"
+        if metrics is not None and metrics.enabled:
+            self.latency = metrics.histogram(f"{prefix}.latency")
+            self.rtt = metrics.histogram(f"{prefix}.rtt")
+            self.delivery_gauge = metrics.gauge(f"{prefix}.delivery")
+        else:
+            self.latency = Histogram()
+            self.rtt = Histogram()
+            self.delivery_gauge = None
+            
+        # Estatísticas
+        self.sent = 0
+        self.reports = 0
+        self.reports_invalid = 0
+        
+    def start(self):
+        self._thread = threading.Thread(target=self._loop, name=f"feedback-{STREAM_NAMES[self.stream]}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+        
+    def on_sent(self, seq):
+        """Registra um envio (no loop de envio: só uma atribuição no anel)."""
+        self.sent += 1
+        self._log[seq % self.log_size] = (seq, time.time(), self.sent)
+        
+    def _lookup(self, seq):
+        entry = self._log[seq % self.log_size]
+        return entry if entry is not None and entry[0] == seq else None
+        
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self.socket], [], [], 0.5)
+                if not readable:
+                    continue
+                data, address = self.socket.recvfrom(2048)
+            except ConnectionResetError:
+                # Windows: ICMP "porta inacessível" de um envio anterior
+                continue
+            except (OSError, ValueError):
+                break  # socket fechado
+            self.feed(data, address)
+            
+    def feed(self, data, address, now=None):
+        """
+        Processa um relatório recebido.
+        
+        Returns:
+            bool: True se era um relatório válido deste stream
+        """
+        report = parse_report(data)
+        if report is None or report["stream"] != self.stream:
+            self.reports_invalid += 1
+            return False
+        now = time.time() if now is None else now
+        
+        with self._lock:
+            state = self._receivers.get(address)
+            if state is None:
+                state = self._receivers[address] = _ReceiverState(address)
+            state.reports += 1
+            state.last_report = time.monotonic()
+            state.highest_seq = report["highest_seq"]
+            state.received = report["received"]
+            state.receiver_lost = report["lost"]
+            state.jitter_ms = report["jitter_ms"]
+            
+            # Entrega: recebidos / enviados entre relatórios (a partir do primeiro)
+            sent = self._lookup(report["highest_seq"])
+            if sent is not None:
+                current = (report["received"], sent[2])
+                if state.baseline is None:
+                    state.baseline = current
+                elif current[1] > state.last[1]:
+                    state.window_delivery = min(1.0, (current[0] - state.last[0]) / (current[1] - state.last[1]))
+                state.last = current
+                
+            for seq, timestamp, hold_ms in report["echoes"]:
+                sent = self._lookup(seq)
+                if sent is None:
+                    continue
+                rtt_ms = max(0.0, (now - sent[1]) * 1000.0 - hold_ms)
+                latency_ms = max(0.0, (now - timestamp) * 1000.0 - hold_ms - rtt_ms / 2.0)
+                state.rtt.observe(rtt_ms)
+                state.latency.observe(latency_ms)
+                self.rtt.observe(rtt_ms)
+                self.latency.observe(latency_ms)
+                
+            if self.delivery_gauge is not None:
+                self.delivery_gauge.set(self._delivery_rate())
+        self.reports += 1
+        return True
+        
+    def _delivery_rate(self):
+        """Entrega somada de todos os receptores (1.0 sem relatórios)."""
+        expected = sum(state.expected for state in self._receivers.values())
+        delivered = sum(state.delivered for state in self._receivers.values())
+        return round(min(1.0, delivered / expected), 4) if expected > 0 else 1.0
+        
+    def stats(self):
+        """
+        Returns:
+            dict: Envios, relatórios, entrega e percentis de latência
+            (todos os receptores) e stats() de cada receptor
+        """
+        with self._lock:
+            receivers = {state.name: state.stats() for state in self._receivers.values()}
+            delivery = self._delivery_rate()
+        return {
+            "stream": STREAM_NAMES[self.stream],
+            "sent": self.sent,
+            "reports": self.reports,
+            "reports_invalid": self.reports_invalid,
+            "delivery_rate": delivery,
+            "latency_p50_ms": self.latency.percentile(50),
+            "latency_p95_ms": self.latency.percentile(95),
+            "latency_p99_ms": self.latency.percentile(99),
+            "rtt_p50_ms": self.rtt.percentile(50),
+            "receivers": receivers,
+        }
+        
+    def summary(self):
+        """Uma linha por receptor para as estatísticas finais."""
+        lines = []
+        for name, state in self.stats()["receivers"].items():
+            delivery = state["delivery_rate"]
+            delivery = f"{delivery:.1%}" if delivery is not None else "?"
+            lines.append(f"{STREAM_NAMES[self.stream]} → {name}: entregue {delivery} "
+                         f"(perdidos: {state['lost']}) | jitter {state['jitter_ms']:g} ms | "
+                         f"captura → receptor p50/p95/p99: {state['latency_p50_ms']:g}/"
+                         f"{state['latency_p95_ms']:g}/{state['latency_p99_ms']:g} ms")
+        return lines
+        
+    def close(self):
+        """Para a thread (antes de fechar o socket)."""
+        self._stop.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=1.0)
+
+
+# Teste standalone: sender e receptor em loopback, com perda simulada
+if __name__ == "__main__":
+    print("\n🧪 TESTE DO CANAL DE RETORNO")
+    print("=" * 50 + "\n")
+    
+    receiver_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver_socket.bind(("127.0.0.1", 0))
+    sender_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    collector = FeedbackCollector(sender_socket).start()
+    reporter = FeedbackReporter(receiver_socket, interval=0.1)
+    
+    for seq in range(300):
+        collector.on_sent(seq)
+        sender_socket.sendto(struct.pack("!Id", seq, time.time()), receiver_socket.getsockname())
+        data, address = receiver_socket.recvfrom(64)
+        if seq % 10 != 3:  # 10% "perdidos" no receptor
+            reporter.on_packet(*struct.unpack("!Id", data), address)
+        time.sleep(0.002)
+    reporter.send_report()
+    time.sleep(0.2)
+    
+    stats = collector.stats()
+    print(f"📨 Relatórios: {stats['reports']} | entrega: {stats['delivery_rate']:.1%} | "
+          f"perdidos (receptor): {reporter.lost}")
+    print(f"⏱️  Captura → receptor p50/p99: {stats['latency_p50_ms']:g}/{stats['latency_p99_ms']:g} ms")
+    assert 0.85 < stats["delivery_rate"] < 0.95
+    
+    collector.close()
+    sender_socket.close()
+    receiver_socket.close()
+    print("\n✅ Teste concluído\n")
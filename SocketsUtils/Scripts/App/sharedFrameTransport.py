@@ -0,0 +1,340 @@
+import os
+import socket
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Segmento de memória compartilhada (little-endian):
+#
+#   cabeçalho (64 bytes):
+#     magic (2s) | versão (B) | n_slots (B) | bytes de pixel por slot (I) |
+#     último frame publicado (Q)
+#   n_slots slots, cada um com:
+#     cabeçalho (32 bytes): trava (Q) | frame_seq (Q) | timestamp (d) |
+#       largura (H) | altura (H) | canais (B) | reservado (3x)
+#     pixels BGR (altura x largura x canais)
+#
+# Cada slot é um seqlock: o produtor deixa a trava ímpar enquanto escreve
+# e par no fim; o consumidor copia o slot e só aceita a cópia se a trava
+# era par e não mudou durante a cópia.
+SHM_MAGIC = b"SF"
+SHM_VERSION = 1
+SHM_HEADER = struct.Struct("<2sBBIQ")
+SHM_HEADER_SIZE = 64
+LATEST_OFFSET = 8
+SLOT_HEADER = struct.Struct("<QQdHHB3x")
+LOCK = struct.Struct("<Q")
+
+# Notificação UDP de frame novo: magic (2s) | versão (B) | reservado (x) | frame_seq (Q)
+NOTIFY_MAGIC = b"SN"
+NOTIFY_PACKET = struct.Struct("<2sBxQ")
+
+DEFAULT_SHM_NAME = "webcam_frames"
+# Abaixo de 8383: as portas acima são dos streams (8383 + 2i / 8384 + 2i, ver streamManager.py)
+DEFAULT_NOTIFY_PORT = 8380
+
+# Segmentos criados por este processo (ver _attach)
+_created = set()
+
+
+def _slot_stride(slot_bytes):
+    # Slots alinhados em 64 bytes (linha de cache)
+    return (SLOT_HEADER.size + slot_bytes + 63) // 64 * 64
+
+
+class SharedFrameSender:
+    def __init__(self, name=DEFAULT_SHM_NAME, n_slots=4, max_frame_shape=None,
+                 notify=(("127.0.0.1", DEFAULT_NOTIFY_PORT),)):
+        """
+        Transporte local: frames BGR crus num anel de memória compartilhada,
+        sem codificação nem decodificação (mesma interface de envio do
+        UDPFrameSender, para o VideoCapture).
+        
+        Args:
+            name: Nome do segmento (o consumidor abre pelo mesmo nome)
+            n_slots: Frames no anel; o consumidor tem n_slots - 1 frames de
+                folga antes do slot que está lendo ser reescrito
+            max_frame_shape: Maior shape aceito (define o tamanho do slot);
+                None = shape do primeiro frame
+            notify: Endereços (ip, porta) avisados por UDP a cada frame novo
+        """
+        self.name = name
+        self.n_slots = n_slots
+        self.max_frame_shape = max_frame_shape
+        self.notifyAddresses = list(notify or ())
+        self.rateController = None
+        self.shm = None
+        self._slots = []
+        self._sequence = 0
+        self._notifyPacket = bytearray(NOTIFY_PACKET.size)
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_socket.setblocking(False)
+        
+        # Estatísticas
+        self.framesSent = 0
+        self.framesFailed = 0
+        self.heartbeatsSent = 0
+        self.notificationsFailed = 0
+        
+        if max_frame_shape is not None:
+            self._create(max_frame_shape)
+            
+    def _create(self, shape):
+        slot_bytes = int(np.prod(shape))
+        stride = _slot_stride(slot_bytes)
+        try:
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True,
+                                                  size=SHM_HEADER_SIZE + self.n_slots * stride)
+        except FileExistsError:
+            # Sobra de uma execução anterior que não terminou limpa
+            stale = shared_memory.SharedMemory(name=self.name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=self.name, create=True,
+                                                  size=SHM_HEADER_SIZE + self.n_slots * stride)
+                                                  
+        _created.add(self.name)
+        SHM_HEADER.pack_into(self.shm.buf, 0, SHM_MAGIC, SHM_VERSION, self.n_slots, slot_bytes, 0)
+        self._slots = [SHM_HEADER_SIZE + i * stride for i in range(self.n_slots)]
+        self._slotBytes = slot_bytes
+        print(f"🧠 Memória compartilhada '{self.name}': {self.n_slots} slots de {slot_bytes} bytes")
+        
+    def sendFrame(self, frame, timestamp=None):
+        """
+        Copia o frame para o próximo slot e avisa os consumidores.
+        
+        Returns:
+            bool: True se publicado
+        """
+        if self.shm is None:
+            self._create(frame.shape)
+        if frame.dtype != np.uint8 or frame.nbytes > self._slotBytes:
+            self.framesFailed += 1
+            return False
+            
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+        sequence = self._sequence + 1
+        offset = self._slots[sequence % self.n_slots]
+        buf = self.shm.buf
+        
+        # Seqlock: trava ímpar durante a escrita
+        lock = LOCK.unpack_from(buf, offset)[0]
+        LOCK.pack_into(buf, offset, lock + 1)
+        SLOT_HEADER.pack_into(buf, offset, lock + 1, sequence,
+                              time.time() if timestamp is None else timestamp, width, height, channels)
+        pixels = np.ndarray(frame.shape, dtype=np.uint8, buffer=buf, offset=offset + SLOT_HEADER.size)
+        np.copyto(pixels, frame)
+        del pixels
+        LOCK.pack_into(buf, offset, lock + 2)
+        
+        struct.pack_into("<Q", buf, LATEST_OFFSET, sequence)
+        self._sequence = sequence
+        self.framesSent += 1
+        self._notify(sequence)
+        return True
+        
+    def _notify(self, sequence):
+        NOTIFY_PACKET.pack_into(self._notifyPacket, 0, NOTIFY_MAGIC, SHM_VERSION, sequence)
+        for address in self.notifyAddresses:
+            try:
+                self.udp_socket.sendto(self._notifyPacket, address)
+            except OSError:
+                # Consumidor fechado ou buffer cheio: ele lê o último frame na próxima
+                self.notificationsFailed += 1
+                
+    def sendUnchanged(self, timestamp=None, cached=False):
+        """Frame parado (motion gate): o último frame publicado continua valendo."""
+        self.heartbeatsSent += 1
+        return True
+        
+    def getStats(self):
+        return {
+            "encoder": "shm",
+            "frames_sent": self.framesSent,
+            "frames_failed": self.framesFailed,
+            "heartbeats_sent": self.heartbeatsSent,
+            "notifications_failed": self.notificationsFailed,
+        }
+        
+    def closeSocketConnection(self):
+        """Fecha o socket de aviso e remove o segmento."""
+        self.udp_socket.close()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+            _created.discard(self.name)
+
+
+def _attach(name):
+    shm = shared_memory.SharedMemory(name=name)
+    # No POSIX (Python < 3.13) o resource_tracker também registra o segmento
+    # de quem só anexa e o remove quando o consumidor sai: o dono é o produtor
+    if os.name == "posix" and name not in _created:
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+    return shm
+
+
+class SharedFrameReceiver:
+    def __init__(self, name=DEFAULT_SHM_NAME, notify_port=DEFAULT_NOTIFY_PORT, listen_ip="127.0.0.1"):
+        """
+        Consumidor de referência do SharedFrameSender (mesma máquina).
+        
+        Args:
+            name: Nome do segmento
+            notify_port: Porta dos avisos UDP; None = sem avisos, consulta
+                o cabeçalho periodicamente
+            listen_ip: IP local dos avisos
+        """
+        self.name = name
+        self.shm = None
+        self.notify_socket = None
+        if notify_port is not None:
+            self.notify_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.notify_socket.bind((listen_ip, notify_port))
+        self._notifyBuffer = bytearray(64)
+        self._frame = None
+        self.last_sequence = 0
+        
+        # Estatísticas
+        self.frame_count = 0
+        self.frames_skipped = 0  # frames publicados que nunca chegaram a ser lidos
+        self.retries = 0         # cópias descartadas pelo seqlock
+        
+    def _open(self):
+        """Anexa ao segmento (o produtor cria no primeiro frame)."""
+        if self.shm is not None:
+            return True
+        try:
+            shm = _attach(self.name)
+        except FileNotFoundError:
+            return False
+        magic, version, n_slots, slot_bytes, _ = SHM_HEADER.unpack_from(shm.buf)
+        if magic != SHM_MAGIC or version != SHM_VERSION:
+            shm.close()
+            raise ValueError(f"Segmento '{self.name}' não é um anel de frames")
+        self.shm = shm
+        self.n_slots = n_slots
+        stride = _slot_stride(slot_bytes)
+        self._slots = [SHM_HEADER_SIZE + i * stride for i in range(n_slots)]
+        return True
+        
+    def latest(self):
+        """frame_seq do último frame publicado (0 = nenhum)."""
+        if not self._open():
+            return 0
+        return struct.unpack_from("<Q", self.shm.buf, LATEST_OFFSET)[0]
+        
+    def _wait(self, timeout):
+        if self.notify_socket is None:
+            time.sleep(0.001)
+            return
+        self.notify_socket.settimeout(timeout)
+        try:
+            self.notify_socket.recv_into(self._notifyBuffer)
+            # Esvazia os avisos acumulados: só o frame mais novo interessa
+            self.notify_socket.setblocking(False)
+            while True:
+                self.notify_socket.recv_into(self._notifyBuffer)
+        except (socket.timeout, BlockingIOError):
+            pass
+            
+    def _read(self, sequence):
+        offset = self._slots[sequence % self.n_slots]
+        buf = self.shm.buf
+        lock, frame_seq, timestamp, width, height, channels = SLOT_HEADER.unpack_from(buf, offset)
+        if lock % 2 or frame_seq != sequence:
+            return None
+            
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        if self._frame is None or self._frame.shape != shape:
+            self._frame = np.empty(shape, dtype=np.uint8)
+        pixels = np.ndarray(shape, dtype=np.uint8, buffer=buf, offset=offset + SLOT_HEADER.size)
+        np.copyto(self._frame, pixels)
+        del pixels
+        
+        # Trava mudou durante a cópia: o produtor reescreveu o slot
+        if LOCK.unpack_from(buf, offset)[0] != lock:
+            return None
+        return frame_seq, timestamp, self._frame
+        
+    def receiveFrame(self, timeout=None):
+        """
+        Espera um frame mais novo que o último lido.
+        
+        Args:
+            timeout: Segundos de espera (None = bloqueia)
+            
+        Returns:
+            tuple: (frame_seq, timestamp, frame) ou None no timeout. O frame
+            é um buffer reutilizado (válido até a próxima chamada)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            sequence = self.latest()
+            if sequence > self.last_sequence:
+                result = self._read(sequence)
+                if result is not None:
+                    if self.last_sequence:
+                        self.frames_skipped += sequence - self.last_sequence - 1
+                    self.last_sequence = sequence
+                    self.frame_count += 1
+                    return result
+                self.retries += 1
+                continue
+                
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self._wait(0.1 if remaining is None else min(remaining, 0.1))
+            
+    def stats(self):
+        return {
+            "frames": self.frame_count,
+            "skipped": self.frames_skipped,
+            "retries": self.retries,
+        }
+        
+    def close(self):
+        if self.notify_socket is not None:
+            self.notify_socket.close()
+        if self.shm is not None:
+            self._frame = None
+            self.shm.close()
+            self.shm = None
+
+
+# Consumidor standalone: mostra os frames publicados pelo VideoCapture(transport="shm")
+if __name__ == "__main__":
+    import cv2
+    
+    print("\n🧪 CONSUMIDOR DE MEMÓRIA COMPARTILHADA")
+    print("=" * 50 + "\n")
+    
+    receiver = SharedFrameReceiver()
+    print(f"📥 Aguardando frames em '{receiver.name}' (avisos na porta {DEFAULT_NOTIFY_PORT})... (ESC para sair)\n")
+    
+    try:
+        while True:
+            received = receiver.receiveFrame(timeout=1.0)
+            if received is not None:
+                sequence, timestamp, frame = received
+                cv2.imshow('SHM RECEIVER - Pressione ESC para sair', frame)
+                if receiver.frame_count % 30 == 0:
+                    print(f"📊 Frame #{sequence} | latência {(time.time() - timestamp) * 1000:.1f} ms | "
+                          f"{receiver.stats()}")
+            if cv2.waitKey(1) & 0xFF == 27:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+        cv2.destroyAllWindows()
+        print(f"\n📈 Frames recebidos: {receiver.frame_count}")
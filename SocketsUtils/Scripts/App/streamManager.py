@@ -0,0 +1,291 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+from frameSource import open_frame_source
+from udpFrameSender import UDPFrameSender
+from landmarkSender import LandmarkSender
+from inferencePool import HandInferencePool
+from metrics import MetricsRegistry, MetricsReporter, ConsoleSink, create_sinks, start_http_export
+
+# Portas padrão: stream i usa 8383 + 2i (vídeo) e 8384 + 2i (landmarks)
+BASE_VIDEO_PORT = 8383
+
+
+class StreamConfig:
+    def __init__(self, stream_id, camera_id=0, server_ip="127.0.0.1", video_port=None,
+                 hand_port=None, jpeg_quality=70, fragmented=False, landmark_format="json",
+                 width=640, height=480, fps=30, mirror=True, source=None, realtime=True):
+        """
+        Configuração de um stream (uma câmera).
+        
+        Args:
+            stream_id: Identificador do stream (int)
+            camera_id: ID da câmera no OpenCV
+            server_ip: IP do receptor
+            video_port: Porta UDP do vídeo (padrão: 8383 + 2 * stream_id)
+            hand_port: Porta UDP dos landmarks (padrão: video_port + 1)
+            jpeg_quality: Qualidade JPEG
+            fragmented: True para enviar frames fragmentados
+            landmark_format: "json" ou "binary"
+            width, height, fps: Configuração da câmera
+            mirror: True para espelhar o frame (cv2.flip)
+            source: Fonte de frames (ver frameSource.py); None = câmera camera_id
+            realtime: False para fontes gravadas entregarem os frames o mais
+                rápido possível
+        """
+        self.stream_id = stream_id
+        self.camera_id = camera_id
+        self.server_ip = server_ip
+        self.video_port = BASE_VIDEO_PORT + 2 * stream_id if video_port is None else video_port
+        self.hand_port = self.video_port + 1 if hand_port is None else hand_port
+        self.jpeg_quality = jpeg_quality
+        self.fragmented = fragmented
+        self.landmark_format = landmark_format
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.mirror = mirror
+        self.source = camera_id if source is None else source
+        self.realtime = realtime
+
+
+class _StreamState:
+    def __init__(self, config, metrics):
+        self.config = config
+        self.sender = UDPFrameSender(config.server_ip, config.video_port,
+                                     jpeg_quality=config.jpeg_quality, fragmented=config.fragmented)
+        self.landmarkSender = LandmarkSender(config.server_ip, config.hand_port, config.landmark_format)
+        
+        # Métricas com prefixo do stream no registro compartilhado
+        prefix = f"stream{config.stream_id}."
+        self.captureFrames = metrics.counter(prefix + "capture.frames")
+        self.inferenceFrames = metrics.counter(prefix + "inference.frames")
+        self.inferenceDropped = metrics.counter(prefix + "inference.dropped")
+        self.sendFrames = metrics.counter(prefix + "send.frames")
+        self.sendFailed = metrics.counter(prefix + "send.failed")
+        self.sendDropped = metrics.counter(prefix + "send.dropped")
+        self.sendHistogram = metrics.histogram(prefix + "send")
+        
+        # Codificação serializada por stream: um frame em voo + o mais recente pendente
+        self.encodeLock = threading.Lock()
+        self.encodeBusy = False
+        self.encodePending = None
+        
+        self.frame_count = 0
+        self.thread = None
+
+
+class StreamManager:
+    def __init__(self, configs, encode_workers=2, inference_workers=None, max_inference_in_flight=2,
+                 metrics=True, metrics_export=None):
+        """
+        Vários streams (câmeras) num único processo.
+        
+        Cada stream tem sua thread de captura e suas portas UDP; a
+        codificação JPEG roda num pool de threads compartilhado e o
+        MediaPipe num HandInferencePool compartilhado (um worker fixo por
+        stream, mantendo o tracking). Backpressure por stream: no máximo
+        um frame codificando + o mais recente na espera, e no máximo
+        `max_inference_in_flight` frames na inferência.
+        
+        Args:
+            configs: Lista de StreamConfig
+            encode_workers: Threads de codificação/envio compartilhadas
+            inference_workers: Processos de inferência (padrão: um por stream,
+                limitado aos núcleos disponíveis)
+            max_inference_in_flight: Frames em inferência por stream
+            metrics: True/False ou um MetricsRegistry (ver metrics.py); as
+                métricas de cada stream levam o prefixo "stream<id>."
+            metrics_export: Destinos extras das métricas (como no VideoCapture)
+        """
+        print("=" * 50)
+        print(f"🎛️  STREAM MANAGER - {len(configs)} streams")
+        print("=" * 50)
+        
+        ids = [config.stream_id for config in configs]
+        if len(set(ids)) != len(ids):
+            raise ValueError(f"stream_id repetido: {ids}")
+            
+        self.metrics = metrics if isinstance(metrics, MetricsRegistry) else MetricsRegistry(enabled=bool(metrics))
+        self.metricsExport = metrics_export
+        self.metricsReporter = None
+        self.metricsServer = None
+        
+        self.streams = {config.stream_id: _StreamState(config, self.metrics) for config in configs}
+        self.encodeWorkers = encode_workers
+        self.inferenceWorkers = inference_workers
+        self.maxInferenceInFlight = max_inference_in_flight
+        
+        self.stopEvent = threading.Event()
+        self.executor = None
+        self.inferencePool = None
+        self.dispatcher = None
+        
+    def _queueEncode(self, state, item):
+        """Agenda a codificação no pool; se já há uma em voo, guarda só o mais recente."""
+        with state.encodeLock:
+            if state.encodeBusy:
+                if state.encodePending is not None:
+                    state.sendDropped.inc()
+                state.encodePending = item
+                return
+            state.encodeBusy = True
+        self.executor.submit(self._encodeAndSend, state, item)
+        
+    def _encodeAndSend(self, state, item):
+        while item is not None:
+            frame_number, timestamp, frame = item
+            start = time.perf_counter()
+            if state.sender.sendFrame(frame, timestamp):
+                state.sendFrames.inc()
+                state.sendHistogram.observe_since(start)
+            else:
+                state.sendFailed.inc()
+                
+            with state.encodeLock:
+                item = state.encodePending
+                state.encodePending = None
+                if item is None:
+                    state.encodeBusy = False
+                    
+    def _dispatchLoop(self):
+        """Entrega os landmarks prontos (em ordem) ao stream de origem."""
+        while not self.stopEvent.is_set():
+            for result in self.inferencePool.results(timeout=0.05):
+                state = self.streams.get(result.stream_id)
+                if state is not None:
+                    state.landmarkSender.send_hand_data(result)
+                    state.inferenceFrames.inc()
+                    
+    def _captureLoop(self, state):
+        config = state.config
+        cap = open_frame_source(config.source, config.width, config.height, config.fps,
+                                realtime=config.realtime)
+        
+        if not cap.isOpened():
+            print(f"❌ [{config.stream_id}] Não foi possível abrir a fonte {config.source}")
+            return
+            
+        print(f"✅ [{config.stream_id}] {cap.describe()} → "
+              f"{config.server_ip}:{config.video_port}/{config.hand_port}")
+              
+        try:
+            while not self.stopEvent.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    print(f"⚠️ [{config.stream_id}] Falha ao capturar frame")
+                    break
+                    
+                if config.mirror:
+                    frame = cv2.flip(frame, 1)
+                state.frame_count += 1
+                state.captureFrames.inc()
+                timestamp = time.time()
+                
+                self._queueEncode(state, (state.frame_count, timestamp, frame))
+                
+                if not self.inferencePool.submit(frame, state.frame_count, timestamp,
+                                                 stream_id=config.stream_id,
+                                                 max_pending=self.maxInferenceInFlight):
+                    state.inferenceDropped.inc()
+        finally:
+            cap.release()
+            
+    def start(self):
+        """Inicia pools, dispatcher e uma thread de captura por stream."""
+        max_shape = (max(s.config.height for s in self.streams.values()),
+                     max(s.config.width for s in self.streams.values()), 3)
+        workers = self.inferenceWorkers
+        if workers is None:
+            workers = min(len(self.streams), max(1, (os.cpu_count() or 2) - 1))
+            
+        self.stopEvent.clear()
+        self.executor = ThreadPoolExecutor(max_workers=self.encodeWorkers, thread_name_prefix="encode")
+        self.inferencePool = HandInferencePool(num_workers=workers, max_frame_shape=max_shape,
+                                               slots_per_worker=self.maxInferenceInFlight * len(self.streams),
+                                               route="stream")
+                                               
+        self.dispatcher = threading.Thread(target=self._dispatchLoop, name="landmarks", daemon=True)
+        self.dispatcher.start()
+        
+        for stream_id, state in self.streams.items():
+            state.thread = threading.Thread(target=self._captureLoop, args=(state,),
+                                            name=f"capture-{stream_id}", daemon=True)
+            state.thread.start()
+            
+    def _formatStats(self, snapshot, rates):
+        """Uma linha de throughput por stream (saída do ConsoleSink)."""
+        counters = snapshot["counters"]
+        histograms = snapshot["histograms"]
+        
+        def stage(prefix, name, key, dropped=None, failed=None):
+            text = f"{name}: {rates.get(prefix + key + '.frames', 0.0):.1f} fps"
+            if dropped and counters.get(prefix + dropped):
+                text += f" (descartados: {counters[prefix + dropped]})"
+            if failed and counters.get(prefix + failed):
+                text += f" (falhas: {counters[prefix + failed]})"
+            return text
+            
+        lines = []
+        for stream_id in self.streams:
+            prefix = f"stream{stream_id}."
+            parts = [
+                stage(prefix, "Captura", "capture"),
+                stage(prefix, "Inferência", "inference", "inference.dropped"),
+                stage(prefix, "Envio", "send", "send.dropped", "send.failed"),
+            ]
+            if prefix + "send" in histograms:
+                send = histograms[prefix + "send"]
+                parts.append(f"send p50/p95: {send['p50_ms']:g}/{send['p95_ms']:g} ms")
+            lines.append(f"📊 [{stream_id}] " + " | ".join(parts))
+        return "\n".join(lines)
+        
+            
+    def stop(self):
+        """Para capturas, pools e fecha os sockets."""
+        print("\n🧹 Encerrando streams...")
+        self.stopEvent.set()
+        
+        for state in self.streams.values():
+            if state.thread is not None:
+                state.thread.join(timeout=2.0)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        if self.dispatcher is not None:
+            self.dispatcher.join(timeout=2.0)
+        if self.inferencePool is not None:
+            self.inferencePool.close()
+            
+        for state in self.streams.values():
+            state.sender.closeSocketConnection()
+            state.landmarkSender.close()
+            
+    def run(self, stats_interval=1.0):
+        """Inicia e mostra estatísticas até Ctrl+C ou todas as capturas pararem."""
+        self.start()
+        self.metricsReporter = MetricsReporter(
+            self.metrics, [ConsoleSink(self._formatStats)] + create_sinks(self.metricsExport),
+            interval=stats_interval).start()
+        self.metricsServer = start_http_export(self.metrics, self.metricsExport)
+        try:
+            while any(state.thread.is_alive() for state in self.streams.values()):
+                time.sleep(0.1)
+        except KeyboardInterrupt:
+            print("\n⏹️  Interrompido (Ctrl+C)")
+        finally:
+            self.metricsReporter.stop()
+            if self.metricsServer is not None:
+                self.metricsServer.stop()
+            self.stop()
+
+
+# Execução: duas câmeras no mesmo processo
+if __name__ == "__main__":
+    manager = StreamManager([
+        StreamConfig(0, camera_id=0),   # vídeo 8383, landmarks 8384
+        StreamConfig(1, camera_id=1),   # vídeo 8385, landmarks 8386
+    ])
+    manager.run()
@@ -0,0 +1,256 @@
+import struct
+import numpy as np
+import cv2
+
+# Mensagem do modo delta (network byte order):
+#   cabeçalho: magic (2s) | versão (B) | tipo (B) | seq (I) |
+#              largura (H) | altura (H) | tile (H) | n_tiles (H)
+#   keyframe:  JPEG do frame inteiro
+#   delta:     n_tiles x [tx (H) | ty (H) | tamanho (I) | JPEG do tile]
+TILE_MAGIC = b"TD"
+TILE_VERSION = 1
+TYPE_KEYFRAME = 0
+TYPE_DELTA = 1
+
+MESSAGE_HEADER = struct.Struct("!2sBBIHHHH")
+TILE_HEADER = struct.Struct("!HHI")
+
+
+def is_tile_message(data):
+    """True se os bytes são uma mensagem do modo delta."""
+    return len(data) >= MESSAGE_HEADER.size and data[:2] == TILE_MAGIC
+
+
+def changed_tiles(frame, reference, tile_size, threshold):
+    """
+    Diferença por blocos, vetorizada com NumPy.
+    
+    Args:
+        frame: Frame atual (BGR)
+        reference: Frame de referência (mesmo shape)
+        tile_size: Lado do tile em pixels
+        threshold: Diferença média mínima (0-255) para o tile contar como alterado
+        
+    Returns:
+        numpy array bool (linhas, colunas) de tiles alterados
+    """
+    height, width = frame.shape[:2]
+    rows = -(-height // tile_size)
+    cols = -(-width // tile_size)
+    
+    # Maior diferença entre os canais de cada pixel
+    diff = cv2.absdiff(frame, reference)
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+        
+    # Completa as bordas para dividir em blocos inteiros
+    pad_h = rows * tile_size - height
+    pad_w = cols * tile_size - width
+    if pad_h or pad_w:
+        diff = np.pad(diff, ((0, pad_h), (0, pad_w)))
+        
+    blocks = diff.reshape(rows, tile_size, cols, tile_size).mean(axis=(1, 3), dtype=np.float32)
+    return blocks > threshold
+
+
+class TileDeltaEncoder:
+    def __init__(self, tile_size=64, threshold=6.0, keyframe_interval=30,
+                 jpeg_quality=80, max_changed_ratio=0.5):
+        """
+        Codificador keyframe + tiles alterados.
+        
+        A cada `keyframe_interval` frames (ou quando muitos tiles mudam)
+        envia o frame inteiro; entre keyframes envia só os tiles cuja
+        diferença média para a referência passa de `threshold`.
+        
+        Args:
+            tile_size: Lado do tile em pixels
+            threshold: Diferença média mínima (0-255) para reenviar um tile
+            keyframe_interval: Frames entre keyframes
+            jpeg_quality: Qualidade JPEG dos keyframes e tiles
+            max_changed_ratio: Fração de tiles alterados acima da qual
+                um keyframe sai mais barato
+        """
+        self.tile_size = tile_size
+        self.threshold = threshold
+        self.keyframe_interval = keyframe_interval
+        self.jpeg_quality = jpeg_quality
+        self.max_changed_ratio = max_changed_ratio
+        
+        self._reference = None
+        self._frames_since_keyframe = 0
+        self._seq = 0
+        
+        # Estatísticas
+        self.keyframes = 0
+        self.delta_frames = 0
+        self.tiles_sent = 0
+        
+    def force_keyframe(self):
+        """O próximo frame sai como keyframe (ex: receptor pediu)."""
+        self._reference = None
+        
+    def _jpeg(self, image):
+        result, encoded = cv2.imencode('.jpg', image, [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality])
+        if not result:
+            raise RuntimeError("Falha ao codificar JPEG")
+        return encoded
+        
+    def encode(self, frame):
+        """
+        Codifica o frame como keyframe ou delta.
+        
+        Args:
+            frame: Frame OpenCV (numpy array BGR)
+            
+        Returns:
+            bytes: Mensagem do modo delta
+        """
+        height, width = frame.shape[:2]
+        ts = self.tile_size
+        seq = self._seq
+        self._seq = (self._seq + 1) & 0xFFFFFFFF
+        
+        keyframe = (self._reference is None
+                    or self._reference.shape != frame.shape
+                    or self._frames_since_keyframe >= self.keyframe_interval)
+                    
+        if not keyframe:
+            changed = changed_tiles(frame, self._reference, ts, self.threshold)
+            keyframe = changed.mean() > self.max_changed_ratio
+            
+        if keyframe:
+            self._reference = frame.copy()
+            self._frames_since_keyframe = 1
+            self.keyframes += 1
+            header = MESSAGE_HEADER.pack(TILE_MAGIC, TILE_VERSION, TYPE_KEYFRAME, seq,
+                                         width, height, ts, 0)
+            # join aceita o array do imencode direto: uma cópia só
+            return b"".join((header, self._jpeg(frame)))
+            
+        self._frames_since_keyframe += 1
+        self.delta_frames += 1
+        
+        tile_rows, tile_cols = np.nonzero(changed)
+        parts = [MESSAGE_HEADER.pack(TILE_MAGIC, TILE_VERSION, TYPE_DELTA, seq,
+                                     width, height, ts, len(tile_rows))]
+        for ty, tx in zip(tile_rows.tolist(), tile_cols.tolist()):
+            y0, x0 = ty * ts, tx * ts
+            tile = frame[y0:y0 + ts, x0:x0 + ts]
+            encoded = self._jpeg(tile)
+            parts.append(TILE_HEADER.pack(tx, ty, len(encoded)))
+            parts.append(encoded)
+            # A referência acompanha o que o receptor passa a ter
+            self._reference[y0:y0 + ts, x0:x0 + ts] = tile
+            
+        self.tiles_sent += len(tile_rows)
+        return b"".join(parts)
+        
+    def stats(self):
+        return {
+            "keyframes": self.keyframes,
+            "delta_frames": self.delta_frames,
+            "tiles_sent": self.tiles_sent,
+        }
+
+
+class TileFrameRebuilder:
+    def __init__(self):
+        """
+        Receptor de referência do modo delta: reconstrói o frame inteiro.
+        
+        Deltas recebidos antes do primeiro keyframe são ignorados. Quando
+        falta uma mensagem (seq pulou), o frame segue sendo atualizado,
+        mas fica marcado como `damaged` até o próximo keyframe.
+        """
+        self.frame = None
+        self.damaged = False
+        self._last_seq = None
+        
+        # Estatísticas
+        self.keyframes = 0
+        self.delta_frames = 0
+        self.skipped = 0
+        
+    def apply(self, data):
+        """
+        Aplica uma mensagem ao frame reconstruído.
+        
+        Args:
+            data: Mensagem do modo delta
+            
+        Returns:
+            numpy array BGR (cópia do frame reconstruído: o buffer interno
+            muda no próximo delta) ou None
+        """
+        if not is_tile_message(data):
+            return None
+            
+        magic, version, msg_type, seq, width, height, ts, n_tiles = MESSAGE_HEADER.unpack_from(data)
+        if version != TILE_VERSION:
+            return None
+            
+        view = memoryview(data)
+        offset = MESSAGE_HEADER.size
+        
+        if msg_type == TYPE_KEYFRAME:
+            frame = cv2.imdecode(np.frombuffer(view[offset:], dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                return None
+            self.frame = frame
+            self.damaged = False
+            self._last_seq = seq
+            self.keyframes += 1
+            return self.frame.copy()
+            
+        if self.frame is None or self.frame.shape[:2] != (height, width):
+            self.skipped += 1
+            return None
+            
+        if self._last_seq is not None and seq != ((self._last_seq + 1) & 0xFFFFFFFF):
+            self.damaged = True
+        self._last_seq = seq
+        
+        for _ in range(n_tiles):
+            tx, ty, size = TILE_HEADER.unpack_from(data, offset)
+            offset += TILE_HEADER.size
+            tile = cv2.imdecode(np.frombuffer(view[offset:offset + size], dtype=np.uint8), cv2.IMREAD_COLOR)
+            offset += size
+            if tile is None:
+                self.damaged = True
+                continue
+            y0, x0 = ty * ts, tx * ts
+            self.frame[y0:y0 + tile.shape[0], x0:x0 + tile.shape[1]] = tile
+            
+        self.delta_frames += 1
+        return self.frame.copy()
+
+
+# Teste standalone: economia de bytes numa cena quase estática
+if __name__ == "__main__":
+    print("\n🧪 TESTE DO MODO DELTA (cena estática + objeto em movimento)")
+    print("=" * 50 + "\n")
+    
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur((rng.random((480, 640, 3)) * 255).astype(np.uint8), (0, 0), 5)
+    
+    encoder = TileDeltaEncoder()
+    rebuilder = TileFrameRebuilder()
+    full_bytes = delta_bytes = 0
+    
+    for i in range(90):
+        frame = background.copy()
+        cv2.circle(frame, (100 + 4 * i, 240), 30, (0, 255, 0), -1)
+        
+        message = encoder.encode(frame)
+        delta_bytes += len(message)
+        full_bytes += len(cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 80])[1])
+        
+        rebuilt = rebuilder.apply(message)
+        error = cv2.absdiff(rebuilt, frame).mean()
+        
+    print(f"📦 JPEG completo: {full_bytes / 90:8.0f} bytes/frame")
+    print(f"📦 Modo delta:    {delta_bytes / 90:8.0f} bytes/frame "
+          f"({100 * delta_bytes / full_bytes:.1f}%)")
+    print(f"📊 {encoder.stats()} | erro médio do último frame: {error:.2f}")
+    print("\n✅ Teste concluído\n")
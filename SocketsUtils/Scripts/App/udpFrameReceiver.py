@@ -0,0 +1,158 @@
+import socket
+import time
+import cv2
+from frameProtocol import (FrameReassembler, FRAME_FLAG_UNCHANGED, FRAME_FLAG_MIRRORED,
+                           is_heartbeat, parse_fragment)
+from tileCodec import TileFrameRebuilder, is_tile_message
+from frameEncoders import decode_frame
+from receiverFeedback import FeedbackReporter, STREAM_VIDEO
+
+class UDPFrameReceiver:
+    def __init__(self, listenIP="0.0.0.0", listenPORT=8383, fragmented=True, timeout=0.5, max_pending=8,
+                 max_pending_bytes=16 * 1024 * 1024, feedback=False, feedback_interval=0.5):
+        """
+        Receptor UDP de referência (substitui o UdpFrameReceiver do Qt).
+        
+        Args:
+            listenIP: IP para escutar (padrão: todas as interfaces)
+            listenPORT: Porta UDP (padrão: 8383)
+            fragmented: True se o sender usa o modo fragmentado
+            timeout: Tempo máximo (s) para remontar um frame
+            max_pending: Número máximo de frames em remontagem
+            max_pending_bytes: Memória máxima (bytes) dos frames em remontagem
+            feedback: True para reportar ao sender (ver receiverFeedback.py)
+                a maior sequência, perdas, jitter e os timestamps ecoados.
+                Só no modo fragmentado
+            feedback_interval: Segundos entre relatórios
+        """
+        self.fragmented = fragmented
+        self.reassembler = FrameReassembler(timeout=timeout, max_pending=max_pending,
+                                            max_pending_bytes=max_pending_bytes)
+        self.tileRebuilder = TileFrameRebuilder()
+        
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.socket.bind((listenIP, listenPORT))
+        
+        # Canal de retorno: relatórios saem por este socket para a origem dos frames
+        self.feedback = None
+        if feedback and fragmented:
+            self.feedback = FeedbackReporter(self.socket, STREAM_VIDEO, interval=feedback_interval)
+        
+        # Buffer reutilizado para recepção (maior datagrama UDP possível)
+        self._buffer = bytearray(65535)
+        
+        # Último frame decodificado (repetido nos heartbeats de frame inalterado)
+        self.lastFrame = None
+        
+        # Estatísticas
+        self.frame_count = 0
+        self.decode_failed = 0
+        self.heartbeats = 0
+        
+    def receiveEncodedFrame(self, timeout=None):
+        """
+        Recebe o próximo frame codificado completo.
+        
+        Args:
+            timeout: Tempo máximo de espera em segundos (None = bloqueia)
+            
+        Returns:
+            tuple: (frame_id, timestamp, flags, bytes) ou None se expirou
+        """
+        self.socket.settimeout(timeout)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        
+        while True:
+            try:
+                size, address = self.socket.recvfrom_into(self._buffer)
+            except socket.timeout:
+                return None
+            except ConnectionResetError:
+                # Windows: ICMP "porta inacessível" de um relatório anterior
+                continue
+                
+            datagram = bytes(self._buffer[:size])
+            
+            if not self.fragmented:
+                self.frame_count += 1
+                if is_heartbeat(datagram):
+                    flags, frame_id, _, _, timestamp, _ = parse_fragment(datagram)
+                    return frame_id, timestamp, flags, b""
+                return self.frame_count, None, 0, datagram
+                
+            frame = self.reassembler.feed(datagram)
+            if frame is not None:
+                self.frame_count += 1
+                if self.feedback is not None:
+                    self.feedback.on_packet(frame[0], frame[1], address)
+                return frame
+                
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.socket.settimeout(remaining)
+                
+    def receiveFrame(self, timeout=None):
+        """
+        Recebe e decodifica o próximo frame.
+        
+        Mensagens do modo delta (keyframe/tiles) são aplicadas ao frame
+        reconstruído pelo TileFrameRebuilder. Um heartbeat de frame
+        inalterado devolve o último frame decodificado. Frames com
+        FRAME_FLAG_MIRRORED são espelhados aqui.
+        
+        Returns:
+            numpy array BGR ou None se expirou / falhou a decodificação
+        """
+        encoded = self.receiveEncodedFrame(timeout)
+        if encoded is None:
+            return None
+            
+        flags, payload = encoded[2], encoded[3]
+        if flags & FRAME_FLAG_UNCHANGED:
+            self.heartbeats += 1
+            return self.lastFrame
+        if is_tile_message(payload):
+            frame = self.tileRebuilder.apply(payload)
+        else:
+            # JPEG/WebP/PNG ou frame sem compressão (ver frameEncoders.py)
+            frame = decode_frame(payload)
+        if frame is not None and flags & FRAME_FLAG_MIRRORED:
+            frame = cv2.flip(frame, 1)
+        if frame is None:
+            self.decode_failed += 1
+        else:
+            self.lastFrame = frame
+        return frame
+        
+    def close(self):
+        """Fecha o socket."""
+        self.socket.close()
+
+
+# Teste standalone: mostra os frames recebidos
+if __name__ == "__main__":
+    print("\n🧪 TESTE DO UDP RECEIVER (modo fragmentado)")
+    print("=" * 50 + "\n")
+    
+    receiver = UDPFrameReceiver(listenPORT=8383, fragmented=True, feedback=True)
+    print("📥 Aguardando frames na porta 8383... (ESC para sair)\n")
+    
+    try:
+        while True:
+            frame = receiver.receiveFrame(timeout=1.0)
+            if frame is not None:
+                cv2.imshow('UDP RECEIVER - Pressione ESC para sair', frame)
+                if receiver.frame_count % 30 == 0:
+                    print(f"📊 Frames: {receiver.frame_count} | {receiver.reassembler.stats()} | "
+                          f"{receiver.feedback.stats()}")
+            if cv2.waitKey(1) & 0xFF == 27:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+        cv2.destroyAllWindows()
+        print(f"\n📈 Frames recebidos: {receiver.frame_count}")
@@ -1,17 +1,92 @@
 import socket
+import threading
+import time
 import numpy as np
 import cv2  # NECESSÁRIO para codificar JPEG
+from frameProtocol import (fragment_chunks, pack_fragment_header, fragment_payload_size, pack_heartbeat,
+                           DEFAULT_MAX_DATAGRAM_SIZE, FRAGMENT_HEADER_SIZE, MAX_FRAGMENTS)
+from tileCodec import TileDeltaEncoder
+from frameEncoders import FrameEncoder, create_encoder, select_encoder
+from datagramBatcher import DatagramBatcher, TokenBucket
+from receiverFeedback import FeedbackCollector, STREAM_VIDEO
+
+
+class FrameSubscriber:
+    def __init__(self, address, name=None):
+        """
+        Destino dos frames de um UDPFrameSender, com estatísticas próprias.
+        
+        Args:
+            address: (ip, porta) do receptor
+            name: Nome para as estatísticas (padrão: "ip:porta")
+        """
+        self.address = address
+        self.name = name or f"{address[0]}:{address[1]}"
+        self.added_at = time.time()
+        self.last_seen = time.monotonic()
+        
+        # Estatísticas
+        self.frames_sent = 0
+        self.frames_failed = 0
+        self.bytes_sent = 0
+        
+    def stats(self):
+        return {
+            "address": f"{self.address[0]}:{self.address[1]}",
+            "frames_sent": self.frames_sent,
+            "frames_failed": self.frames_failed,
+            "bytes_sent": self.bytes_sent,
+            "connected_s": round(time.time() - self.added_at, 1),
+        }
+
 
 class UDPFrameSender:
-    def __init__(self, serverIP, serverPORT, jpeg_quality=80):
+    # Tentativas extras de codificação quando o frame passa do limite
+    MAX_REENCODES = 6
+    
+    def __init__(self, serverIP, serverPORT, jpeg_quality=80, fragmented=False,
+                 max_datagram_size=DEFAULT_MAX_DATAGRAM_SIZE, rate_controller=None,
+                 delta_mode=False, keyframe_interval=30, tile_size=64, metrics=None,
+                 batch_size=0, pacing_rate=None, pacing_burst=None, send_buffer_size=1 << 20,
+                 encoder="jpeg", encoder_budget=None, feedback=False):
         """
         Inicializa sender UDP com compressão JPEG.
         
         Args:
-            serverIP: IP do servidor (ex: "127.0.0.1")
+            serverIP: IP do servidor (ex: "127.0.0.1"); None para começar sem
+                destino e registrar os receptores com addSubscriber
             serverPORT: Porta UDP (ex: 8383)
             jpeg_quality: Qualidade JPEG 0-100 (padrão: 80)
+            fragmented: True para dividir cada frame em datagramas do tamanho
+                do MTU (ver frameProtocol.py); o receptor precisa remontar
+            max_datagram_size: Tamanho máximo de cada datagrama no modo fragmentado
+            rate_controller: AdaptiveRateController opcional (ver rateController.py);
+                controla qualidade/escala e re-codifica frames acima do limite
+            delta_mode: True para enviar keyframes periódicos e, entre eles,
+                só os tiles alterados (ver tileCodec.py); requer o receptor Python
+            keyframe_interval: Frames entre keyframes no modo delta
+            tile_size: Lado do tile em pixels no modo delta
+            metrics: MetricsRegistry opcional (ver metrics.py); registra os
+                histogramas "encode" e "send" e o counter "send.bytes"
+            batch_size: > 0 para enfileirar os datagramas e enviá-los em lotes
+                (ver datagramBatcher.py; UDP GSO no Linux)
+            pacing_rate: Taxa máxima em bits/s (token bucket); ativa os lotes
+            pacing_burst: Maior rajada em bytes (padrão: 64 KB)
+            send_buffer_size: SO_SNDBUF do socket em bytes
+            encoder: Backend de codificação (ver frameEncoders.py): "jpeg",
+                "turbojpeg", "simplejpeg", "webp", "png", "yuv420", "raw",
+                um FrameEncoder ou "auto" (mede os backends no primeiro frame
+                e escolhe o mais rápido que cabe em encoder_budget)
+            encoder_budget: Orçamento em bytes por frame do modo "auto"
+                (padrão: o tamanho máximo do frame)
+            feedback: True para ler os relatórios dos receptores no próprio
+                socket (ver receiverFeedback.py): entrega real, perda,
+                jitter e latência captura → receptor em getStats()["feedback"].
+                Requer fragmented (a sequência é o frame_id do cabeçalho)
         """
+        if feedback and not fragmented:
+            raise ValueError("feedback requer fragmented=True (sem cabeçalho não há sequência)")
+            
         print("=" * 50)
         print("🔌 UDP SENDER INIT")
         print("=" * 50)
@@ -19,49 +94,236 @@ class UDPFrameSender:
         self.serverIP = serverIP
         self.serverPort = serverPORT
         self.jpeg_quality = jpeg_quality
+        self.fragmented = fragmented
+        self.maxDatagramSize = max_datagram_size
         self.clientSocket = None
+        self.frameId = 0
+        
+        # Receptores: cada frame é codificado uma vez e enviado a todos.
+        # A tupla é trocada inteira (copy-on-write): o loop de envio não
+        # precisa de lock enquanto outra thread registra/remove receptores
+        self._subscribersLock = threading.Lock()
+        self.subscribers = ()
+        
+        # Buffers reutilizados no modo fragmentado: cabeçalho (enviado com
+        # sendmsg, separado do payload) e datagrama inteiro (fallback sem sendmsg)
+        self._fragmentHeader = bytearray(FRAGMENT_HEADER_SIZE)
+        self._datagramBuffer = bytearray(max_datagram_size)
+        self._datagramView = memoryview(self._datagramBuffer)
+        self._useSendmsg = hasattr(socket.socket, "sendmsg")  # não existe no Windows
+        self.rateController = rate_controller
+        self.encoderBudget = encoder_budget
+        if isinstance(encoder, FrameEncoder):
+            self.encoder = encoder
+        elif encoder == "auto":
+            self.encoder = None  # escolhido no primeiro frame
+        else:
+            self.encoder = create_encoder(encoder, jpeg_quality)
+        self.tileEncoder = None
+        if delta_mode:
+            self.tileEncoder = TileDeltaEncoder(tile_size=tile_size,
+                                                keyframe_interval=keyframe_interval,
+                                                jpeg_quality=jpeg_quality)
+                                                
+        # Receptor inicial (serverIP/serverPORT)
+        if serverIP is not None:
+            self.addSubscriber(serverIP, serverPORT)
+                                                
+        # Métricas (desligadas se não houver registro ativo)
+        self.metrics = metrics if metrics is not None and metrics.enabled else None
+        if self.metrics is not None:
+            self.encodeHistogram = metrics.histogram("encode")
+            self.sendHistogram = metrics.histogram("send")
+            self.bytesCounter = metrics.counter("send.bytes")
+        
+        # Estatísticas
+        self.framesSent = 0
+        self.framesFailed = 0
+        self.bytesSent = 0
+        self.syscalls = 0
+        self.heartbeatsSent = 0
+        self.batcher = None
+        self.feedback = None
+        
+        # Último frame enviado (reenviado por sendUnchanged(cached=True))
+        self._lastEncoded = None
+        self._lastFlags = 0
         
         # Tamanho máximo seguro para UDP
         self.MAX_SAFE_UDP_SIZE = 60000
+        
+        # Tamanho máximo do frame: um datagrama ou N fragmentos
+        if fragmented:
+            self.maxFrameSize = fragment_payload_size(max_datagram_size) * MAX_FRAGMENTS
+        else:
+            self.maxFrameSize = self.MAX_SAFE_UDP_SIZE
 
         try:
             self.clientSocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            # Aumenta buffer de envio
-            self.clientSocket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 65536)
-            print(f"✅ Socket UDP criado: {serverIP}:{serverPORT}")
-            print(f"📊 Qualidade JPEG: {jpeg_quality}%")
-            print(f"📦 Tamanho máximo: {self.MAX_SAFE_UDP_SIZE} bytes")
+            # Buffer de envio: com 64 KB uma rajada de fragmentos de um frame já enche
+            self.clientSocket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, send_buffer_size)
+            actual_buffer = self.clientSocket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+            
+            if batch_size > 0 or pacing_rate is not None:
+                pacer = TokenBucket(pacing_rate, pacing_burst) if pacing_rate is not None else None
+                self.batcher = DatagramBatcher(self.clientSocket, (serverIP, serverPORT),
+                                               max_datagram_size, batch_size or 32, pacer)
+                                               
+            destination = f"{serverIP}:{serverPORT}" if serverIP is not None else "sem destino (addSubscriber)"
+            print(f"✅ Socket UDP criado: {destination} (SO_SNDBUF {actual_buffer} bytes)")
+            if rate_controller is not None:
+                print(f"📊 Qualidade JPEG: adaptativa (inicial {rate_controller.quality}%, "
+                      f"orçamento {rate_controller.frame_budget} bytes/frame)")
+            else:
+                print(f"📊 Qualidade JPEG: {jpeg_quality}%")
+            print(f"🗜️  Codificação: {self.encoder.name if self.encoder is not None else 'auto (no primeiro frame)'}")
+            if delta_mode:
+                print(f"🧱 Modo delta: keyframe a cada {keyframe_interval} frames, tiles de {tile_size}px")
+            if fragmented:
+                print(f"🧩 Modo fragmentado: datagramas de até {max_datagram_size} bytes")
+            if self.batcher is not None:
+                print(f"📮 Envio em lotes de {self.batcher.batch_size} datagramas "
+                      f"({'UDP GSO' if self.batcher.use_gso else 'um por chamada'})"
+                      + (f", pacing {pacing_rate / 1e6:.1f} Mbps" if pacing_rate is not None else ""))
+            if feedback:
+                self.feedback = FeedbackCollector(self.clientSocket, STREAM_VIDEO, metrics=self.metrics).start()
+                print("📨 Canal de retorno: relatórios dos receptores no socket de envio")
+            print(f"📦 Tamanho máximo: {self.maxFrameSize} bytes")
             print("=" * 50 + "\n")
         except Exception as e:
             print(f"❌ Erro ao criar socket: {e}")
+            
+    def addSubscriber(self, ip, port, name=None):
+        """
+        Registra um receptor (pode ser chamado com o envio rodando).
+        
+        No modo delta o próximo frame vira keyframe, para o receptor novo
+        ter a referência.
+        
+        Returns:
+            FrameSubscriber: O receptor (já existente, se o endereço se repetir)
+        """
+        address = (ip, port)
+        with self._subscribersLock:
+            for subscriber in self.subscribers:
+                if subscriber.address == address:
+                    subscriber.last_seen = time.monotonic()
+                    return subscriber
+            subscriber = FrameSubscriber(address, name)
+            self.subscribers = self.subscribers + (subscriber,)
+        if self.tileEncoder is not None:
+            self.tileEncoder.force_keyframe()
+        return subscriber
+        
+    def removeSubscriber(self, subscriber):
+        """
+        Remove um receptor (FrameSubscriber ou (ip, porta)).
+        
+        Returns:
+            bool: True se estava registrado
+        """
+        with self._subscribersLock:
+            remaining = tuple(s for s in self.subscribers
+                              if s is not subscriber and s.address != subscriber)
+            removed = len(remaining) != len(self.subscribers)
+            self.subscribers = remaining
+        return removed
 
+    def _selectEncoder(self, frame):
+        """Modo "auto": mede os backends neste frame e fica com o mais rápido no orçamento."""
+        budget = self.encoderBudget or self.maxFrameSize
+        self.encoder, results = select_encoder([frame], budget, quality=self.jpeg_quality)
+        summary = ", ".join(f"{name} {r['ms']:g} ms/{r['bytes']} B" for name, r in results.items())
+        print(f"🗜️  Codificação automática (orçamento {budget} bytes): {self.encoder.name} [{summary}]")
+        
+    def _encodeFrame(self, frame, quality):
+        """Codifica com o backend configurado e a qualidade dada (None se falhar)."""
+        if self.encoder is None:
+            self._selectEncoder(frame)
+            
+        # Backends do OpenCV devolvem uma visão do buffer do imencode (sem tobytes)
+        data = self.encoder.encode(frame, quality)
+        if data is None:
+            print(f"❌ Falha ao codificar frame ({self.encoder.name})")
+        return data
+        
+    def _encodeAdaptive(self, frame):
+        """Codifica com qualidade/escala do controlador, re-codificando se passar do limite."""
+        controller = self.rateController
+        limit = self.maxFrameSize
+        if controller.max_frame_bytes is not None:
+            limit = min(limit, controller.max_frame_bytes)
+            
+        for _ in range(self.MAX_REENCODES + 1):
+            scale = controller.scale
+            if scale != 1.0:
+                scaled = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            else:
+                scaled = frame
+                
+            data = self._encodeFrame(scaled, controller.quality)
+            if data is None or len(data) <= limit:
+                return data
+                
+            # Acima do limite: reduz qualidade/escala e tenta de novo
+            if not controller.on_oversize(len(data), limit):
+                break
+                
+        print(f"⚠️ Frame acima do limite mesmo na menor qualidade: {len(data)} bytes (max: {limit})")
+        return None
+        
+    def _encodeDelta(self, frame):
+        """Codifica keyframe ou tiles alterados (modo delta)."""
+        if self.rateController is not None:
+            self.tileEncoder.jpeg_quality = self.rateController.quality
+            
+        data = self.tileEncoder.encode(frame)
+        if len(data) > self.maxFrameSize:
+            # Mensagem não cabe: o receptor perde a referência, força keyframe
+            self.tileEncoder.force_keyframe()
+            print(f"⚠️ Mensagem delta muito grande: {len(data)} bytes (max: {self.maxFrameSize})")
+            return None
+        return data
+        
     def encodeImage(self, frame):
         """
-        Codifica frame OpenCV em JPEG e retorna os bytes.
+        Codifica frame OpenCV (JPEG ou o backend configurado) e retorna os bytes.
+        
+        Com rate_controller, a qualidade e a escala vêm do controlador e
+        frames acima do limite são re-codificados em vez de descartados.
         
         Args:
             frame: Frame OpenCV (numpy array BGR)
             
         Returns:
-            bytes: Frame codificado em JPEG ou None se falhar
+            memoryview/bytes: Frame codificado (sem cópia extra do buffer do
+            imencode; use bytes(...) para guardar) ou None se falhar
         """
         try:
-            # CORREÇÃO PRINCIPAL: Codifica em JPEG usando OpenCV
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), self.jpeg_quality]
-            result, encoded_frame = cv2.imencode('.jpg', frame, encode_param)
+            if self.tileEncoder is not None:
+                return self._encodeDelta(frame)
+                
+            if self.rateController is not None:
+                return self._encodeAdaptive(frame)
             
-            if not result:
-                print("❌ Falha ao codificar frame em JPEG")
+            data = self._encodeFrame(frame, self.jpeg_quality)
+            if data is None:
                 return None
             
-            # Converte para bytes
-            data = encoded_frame.tobytes()
             data_size = len(data)
             
-            # Verifica tamanho
-            if data_size > self.MAX_SAFE_UDP_SIZE:
-                print(f"⚠️ Frame muito grande: {data_size} bytes (max: {self.MAX_SAFE_UDP_SIZE})")
-                print("💡 Dica: Reduza jpeg_quality ou a resolução da câmera")
+            # Verifica tamanho: backends com qualidade tentam de novo mais baixo
+            quality = self.jpeg_quality
+            while data_size > self.maxFrameSize and self.encoder.has_quality and quality > 20:
+                quality = max(20, quality - 20)
+                data = self._encodeFrame(frame, quality)
+                if data is None:
+                    return None
+                data_size = len(data)
+                
+            if data_size > self.maxFrameSize:
+                print(f"⚠️ Frame muito grande: {data_size} bytes (max: {self.maxFrameSize})")
+                print("💡 Dica: Reduza jpeg_quality, a resolução da câmera ou use fragmented=True")
                 return None
             
             return data
@@ -70,58 +332,306 @@ class UDPFrameSender:
             print(f"❌ Erro ao codificar frame: {e}")
             return None
 
-    def sendFrame(self, frame):
+    def sendFrame(self, frame, timestamp=None):
         """
         Codifica E envia frame via UDP (método completo).
         
         Args:
             frame: Frame OpenCV (numpy array BGR)
+            timestamp: Momento da captura (usado no modo fragmentado)
             
         Returns:
             bool: True se enviado com sucesso, False caso contrário
         """
         # Codifica em JPEG
-        encoded_data = self.encodeImage(frame)
+        if self.metrics is not None:
+            start = time.perf_counter()
+            encoded_data = self.encodeImage(frame)
+            self.encodeHistogram.observe_since(start)
+        else:
+            encoded_data = self.encodeImage(frame)
         
         if encoded_data is None:
+            self.framesFailed += 1
+            if self.rateController is not None:
+                self.rateController.record_failure()
             return False
         
         # Envia via UDP
-        return self.sendEncodedImage(encoded_data)
+        if self.metrics is not None:
+            start = time.perf_counter()
+            success = self.sendEncodedImage(encoded_data, timestamp)
+            self.sendHistogram.observe_since(start)
+            if success:
+                self.bytesCounter.inc(len(encoded_data))
+        else:
+            success = self.sendEncodedImage(encoded_data, timestamp)
+        
+        if self.rateController is not None:
+            self.rateController.update(len(encoded_data), success)
+            
+        if success:
+            self._lastEncoded = encoded_data
+            self._lastFlags = 0
+        return success
+        
+    def sendEncodedFrame(self, encodedData, timestamp=None, flags=0):
+        """
+        Envia um frame já comprimido pela fonte (ex: MJPEG da câmera), sem
+        codificar: mesmas métricas e cache de sendUnchanged do sendFrame.
+        
+        Args:
+            encodedData: JPEG do frame
+            timestamp: Momento da captura
+            flags: Flags do frame, ex: FRAME_FLAG_MIRRORED (só no modo fragmentado)
+            
+        Returns:
+            bool: True se enviado
+        """
+        if self.metrics is not None:
+            start = time.perf_counter()
+            success = self.sendEncodedImage(encodedData, timestamp, flags)
+            self.sendHistogram.observe_since(start)
+            if success:
+                self.bytesCounter.inc(len(encodedData))
+        else:
+            success = self.sendEncodedImage(encodedData, timestamp, flags)
+            
+        if success:
+            self._lastEncoded = encodedData
+            self._lastFlags = flags
+        return success
+        
+    def sendUnchanged(self, timestamp=None, cached=False):
+        """
+        Sinaliza um frame igual ao anterior (cena parada), sem codificar.
+        
+        Sem fragmentação o receptor (Qt) espera só JPEG, então o último
+        frame é sempre reenviado. No modo delta sai sempre o heartbeat:
+        reenviar uma mensagem de tiles repete o seq e o TileFrameRebuilder
+        marcaria o frame como danificado. Nos dois casos conta como
+        heartbeat, não como frame enviado.
+        
+        Args:
+            timestamp: Momento da captura
+            cached: False envia o heartbeat de 20 bytes (FRAME_FLAG_UNCHANGED,
+                ver frameProtocol.py; só no modo fragmentado); True reenvia
+                o último frame codificado, para receptores que não conhecem
+                o heartbeat
+                
+        Returns:
+            bool: True se enviado
+        """
+        if self.tileEncoder is None and (cached or not self.fragmented):
+            if self._lastEncoded is None or self.clientSocket is None:
+                return False
+            try:
+                success = any(self._deliver(self._lastEncoded, timestamp, self._lastFlags))
+            except Exception as e:
+                print(f"❌ Erro ao reenviar o último frame: {e}")
+                return False
+            if success:
+                self.heartbeatsSent += 1
+            return success
+            
+        header = self._fragmentHeader
+        pack_heartbeat(header, self.frameId, time.time() if timestamp is None else timestamp)
+        self.frameId = (self.frameId + 1) & 0xFFFFFFFF
+        success = False
+        for subscriber in self.subscribers:
+            try:
+                self.syscalls += 1
+                self.clientSocket.sendto(header, subscriber.address)
+                success = True
+            except OSError as e:
+                print(f"❌ Erro de socket ao enviar heartbeat para {subscriber.name}: {e}")
+        if success:
+            self.heartbeatsSent += 1
+            if self.feedback is not None:
+                self.feedback.on_sent((self.frameId - 1) & 0xFFFFFFFF)
+        return success
 
-    def sendEncodedImage(self, encodedData):
+    def sendEncodedImage(self, encodedData, timestamp=None, flags=0):
         """
         Envia dados já codificados via UDP.
         
         Args:
-            encodedData: Bytes para enviar
+            encodedData: Bytes para enviar (bytes, bytearray ou memoryview)
+            timestamp: Momento da captura (usado no modo fragmentado)
+            flags: Flags do cabeçalho de fragmento (só no modo fragmentado)
             
         Returns:
             bool: True se enviado, False caso contrário
         """
+        subscribers = self.subscribers
+        results = [False] * len(subscribers)
         try:
             if self.clientSocket is None:
                 print("❌ Socket não inicializado")
                 return False
+                
+            results = self._deliver(encodedData, timestamp, flags, subscribers)
             
-            bytes_sent = self.clientSocket.sendto(encodedData, (self.serverIP, self.serverPort))
+        except Exception as e:
+            print(f"❌ Erro ao enviar dados: {e}")
             
-            # Verifica se enviou tudo
-            if bytes_sent != len(encodedData):
-                print(f"⚠️ Enviado parcial: {bytes_sent}/{len(encodedData)} bytes")
-                return False
+        return self._recordSend(encodedData, subscribers, results)
+        
+    def _recordSend(self, encodedData, subscribers, results):
+        """Estatísticas por receptor e totais de um frame; True se chegou a algum."""
+        size = len(encodedData)
+        for subscriber, sent in zip(subscribers, results):
+            if sent:
+                subscriber.frames_sent += 1
+                subscriber.bytes_sent += size
+            else:
+                subscriber.frames_failed += 1
+                
+        # Enviado se chegou a pelo menos um receptor
+        success = any(results)
+        if success:
+            self.framesSent += 1
+            self.bytesSent += len(encodedData)
+        else:
+            self.framesFailed += 1
+        return success
+        
+    def _deliver(self, encodedData, timestamp, flags=0, subscribers=None):
+        """Envia para os receptores, sem estatísticas; lista de sucesso por receptor."""
+        if subscribers is None:
+            subscribers = self.subscribers
+        if not self.fragmented:
+            return self._sendWhole(encodedData, subscribers)
             
-            return True
+        results = self._sendFragmented(encodedData, timestamp, subscribers, flags)
+        if self.feedback is not None and any(results):
+            self.feedback.on_sent((self.frameId - 1) & 0xFFFFFFFF)
+        return results
             
-        except socket.error as e:
-            print(f"❌ Erro de socket ao enviar: {e}")
-            return False
-        except Exception as e:
-            print(f"❌ Erro ao enviar dados: {e}")
-            return False
+    def _sendWhole(self, encodedData, subscribers):
+        """Um datagrama por receptor. Retorna o sucesso de cada receptor."""
+        results = []
+        for subscriber in subscribers:
+            try:
+                if self.batcher is not None:
+                    self.batcher.add(b"", encodedData, subscriber.address)
+                    results.append(self.batcher.flush(subscriber.address))
+                    continue
+                    
+                self.syscalls += 1
+                bytes_sent = self.clientSocket.sendto(encodedData, subscriber.address)
+                
+                # Verifica se enviou tudo
+                if bytes_sent != len(encodedData):
+                    print(f"⚠️ Enviado parcial: {bytes_sent}/{len(encodedData)} bytes")
+                results.append(bytes_sent == len(encodedData))
+            except socket.error as e:
+                print(f"❌ Erro de socket ao enviar para {subscriber.name}: {e}")
+                results.append(False)
+        return results
+        
+    def _sendFragmented(self, encodedData, timestamp, subscribers, flags=0):
+        """
+        Envia o frame em fragmentos, sem montar cópias dos datagramas.
+        
+        Cada fragmento é uma fatia (memoryview) do frame; o cabeçalho vai
+        num buffer reutilizado, junto via sendmsg (scatter-gather). Sem
+        sendmsg, o datagrama é montado num buffer pré-alocado. Todos os
+        receptores recebem o mesmo frame_id.
+        
+        Returns:
+            list: Sucesso de cada receptor
+        """
+        frame_id = self.frameId
+        self.frameId = (self.frameId + 1) & 0xFFFFFFFF
+        if timestamp is None:
+            timestamp = time.time()
+        
+        chunks = fragment_chunks(encodedData, self.maxDatagramSize)
+        header = self._fragmentHeader
+        results = [True] * len(subscribers)
+        
+        if self.batcher is not None:
+            # Cabeçalhos montados uma vez por frame, iguais para todos os receptores
+            headers = []
+            for index in range(len(chunks)):
+                pack_fragment_header(header, frame_id, index, len(chunks), timestamp, flags)
+                headers.append(bytes(header))
+            for i, subscriber in enumerate(subscribers):
+                address = subscriber.address
+                for fragment_header, chunk in zip(headers, chunks):
+                    results[i] = self.batcher.add(fragment_header, chunk, address) and results[i]
+                # Fecha o lote no fim do frame: o último fragmento é o único menor
+                results[i] = self.batcher.flush(address) and results[i]
+            return results
+            
+        for index, chunk in enumerate(chunks):
+            pack_fragment_header(header, frame_id, index, len(chunks), timestamp, flags)
+            expected = FRAGMENT_HEADER_SIZE + len(chunk)
+            if not self._useSendmsg:
+                datagram = self._datagramView
+                datagram[:FRAGMENT_HEADER_SIZE] = header
+                datagram[FRAGMENT_HEADER_SIZE:expected] = chunk
+                
+            for i, subscriber in enumerate(subscribers):
+                if not results[i]:
+                    continue
+                self.syscalls += 1
+                try:
+                    if self._useSendmsg:
+                        bytes_sent = self.clientSocket.sendmsg((header, chunk), (), 0, subscriber.address)
+                    else:
+                        bytes_sent = self.clientSocket.sendto(datagram[:expected], subscriber.address)
+                except socket.error as e:
+                    print(f"❌ Erro de socket ao enviar para {subscriber.name}: {e}")
+                    bytes_sent = -1
+                
+                if bytes_sent != expected:
+                    if bytes_sent >= 0:
+                        print(f"⚠️ Fragmento enviado parcial: {bytes_sent}/{expected} bytes")
+                    results[i] = False
+                    
+        return results
+        
+    def getStats(self):
+        """
+        Retorna estatísticas do sender.
+        
+        framesSent conta sendto com sucesso; o que chegou de fato está em
+        "feedback" (com feedback=True e receptores que reportam).
+        
+        Returns:
+            dict: Frames/bytes enviados, falhas e estado do controle de taxa
+        """
+        stats = {
+            "encoder": self.encoder.name if self.encoder is not None else "auto",
+            "frames_sent": self.framesSent,
+            "frames_failed": self.framesFailed,
+            "bytes_sent": self.bytesSent,
+            "heartbeats_sent": self.heartbeatsSent,
+            "jpeg_quality": self.jpeg_quality,
+        }
+        syscalls = self.syscalls + (self.batcher.syscalls if self.batcher is not None else 0)
+        stats["syscalls_per_frame"] = syscalls / max(1, self.framesSent + self.framesFailed)
+        stats["subscribers"] = {s.name: s.stats() for s in self.subscribers}
+        if self.batcher is not None:
+            stats["batch"] = self.batcher.stats()
+            stats["datagrams_dropped"] = self.batcher.dropped
+        if self.tileEncoder is not None:
+            stats["delta"] = self.tileEncoder.stats()
+        if self.feedback is not None:
+            stats["feedback"] = self.feedback.stats()
+        if self.rateController is not None:
+            controller_stats = self.rateController.stats()
+            stats["jpeg_quality"] = controller_stats["quality"]
+            stats["bitrate"] = controller_stats["bitrate"]
+            stats["rate_control"] = controller_stats
+        return stats
 
     def closeSocketConnection(self):
         """Fecha conexão do socket."""
+        if self.feedback is not None:
+            self.feedback.close()
         try:
             if self.clientSocket:
                 self.clientSocket.close()
@@ -136,8 +646,6 @@ class UDPFrameSender:
 
 # Teste standalone
 if __name__ == "__main__":
-    import time
-    
     print("\n🧪 TESTE DO UDP SENDER")
     print("=" * 50 + "\n")
     
@@ -1,57 +1,442 @@
 import cv2
 import time
+import threading
 from udpFrameSender import UDPFrameSender
-from handTracker import HandTracker
+from frameFanout import FrameFanout
+from sharedFrameTransport import SharedFrameSender, DEFAULT_SHM_NAME
+from handLandmarkDetector import HandTracker
+from framePipeline import DropOldestQueue
+from rateController import AdaptiveRateController
+from inferencePool import HandInferencePool
+from landmarkPredictor import LandmarkPredictor, InferenceScheduler
+from motionGate import MotionGate
+from frameSource import open_frame_source, decode_mjpeg
+from frameProtocol import FRAME_FLAG_MIRRORED
+from previewWindow import PreviewWindow
+from metrics import MetricsRegistry, MetricsReporter, ConsoleSink, create_sinks, start_http_export
 
 class VideoCapture:
-    def __init__(self, cameraDeviceID=0, showCamera=True, jpeg_quality=70):
+    def __init__(self, cameraDeviceID=0, showCamera=True, jpeg_quality=70, queue_size=2, fragmented=False,
+                 landmark_format="json", target_bitrate=None, delta_mode=False,
+                 inference_workers=0, server_ip="127.0.0.1", video_port=8383, hand_port=8384,
+                 source=None, realtime=True, metrics=True, metrics_export=None, roi=False,
+                 inference_interval=1, adaptive_inference=False, landmark_filter="velocity",
+                 motion_gate=False, motion_threshold=12, motion_fraction=0.002, unchanged_payload="heartbeat",
+                 quality_tiers=None, subscribe_port=None, encoder="jpeg", model_loading="background",
+                 record_landmarks=None, transport="udp", shm_name=DEFAULT_SHM_NAME,
+                 mjpeg_passthrough=False, mjpeg_decode_scale=2, preview_fps=15, receiver_feedback=False):
         """
         Inicializa captura de vídeo com streaming UDP.
         
+        O loop é dividido em três estágios (captura, inferência e
+        codificação+envio), ligados por filas pequenas que descartam o
+        frame mais antigo. Assim o vídeo sai na taxa da câmera enquanto
+        a inferência roda na taxa que conseguir sustentar.
+        
         Args:
             cameraDeviceID: ID da câmera (0, 1, 2...)
-            showCamera: True para mostrar janela de debug
+            showCamera: True para mostrar janela de debug (numa thread
+                própria, com os landmarks; ver previewWindow.py)
+            jpeg_quality: Qualidade JPEG (inicial, se target_bitrate for usado)
+            queue_size: Tamanho das filas entre estágios (padrão: 2)
+            fragmented: True para enviar frames fragmentados (ver frameProtocol.py)
+            landmark_format: Formato dos landmarks: "json" ou "binary"
+            target_bitrate: Bitrate alvo em bits/s; ativa o controle adaptativo
+                de qualidade/escala (ver rateController.py). Só com um receptor
+                UDP (sem quality_tiers/subscribe_port/shm)
+            delta_mode: True para enviar keyframes + tiles alterados (ver tileCodec.py)
+            inference_workers: > 0 para rodar o MediaPipe num pool de processos
+                (ver inferencePool.py) em vez da thread de inferência
+            server_ip: IP do receptor (vídeo e landmarks)
+            video_port: Porta UDP do vídeo (padrão: 8383)
+            hand_port: Porta UDP dos landmarks (padrão: 8384)
+            source: Fonte de frames (ver frameSource.py): None = câmera
+                cameraDeviceID; "synthetic", arquivo de vídeo, diretório de
+                imagens ou uma instância de FrameSource
+            realtime: False para fontes gravadas/sintéticas entregarem os
+                frames o mais rápido possível (benchmark de throughput)
+            metrics: True/False ou um MetricsRegistry (ver metrics.py); False
+                tira toda a instrumentação do loop
+            metrics_export: Destinos extras das métricas, ex:
+                ["http:9100", "udp:127.0.0.1:9101", "file:metrics.jsonl"]
+            roi: True para a inferência rodar num recorte em volta das mãos
+                (ver handROI.py); só na thread de inferência (inference_workers=0)
+            inference_interval: Inferência a cada N frames; nos outros os
+                landmarks são previstos (ver landmarkPredictor.py) e saem
+                com o flag "predicted". Só na thread de inferência (inference_workers=0)
+            adaptive_inference: True para o intervalo variar com o movimento
+                das mãos (até inference_interval, ou 4 se for 1)
+            landmark_filter: Preditor dos frames sem inferência: "velocity"
+                ou "one_euro"
+            motion_gate: True para pular flip, inferência e codificação dos
+                frames sem mudança (ver motionGate.py)
+            motion_threshold: Diferença de cinza (0-255) de um pixel alterado
+            motion_fraction: Fração mínima de pixels alterados para processar
+            unchanged_payload: O que sai no lugar de um frame parado:
+                "heartbeat" (20 bytes) ou "cached" (reenvia o último JPEG).
+                Sem fragmented sempre reenvia; com delta_mode sempre heartbeat
+            quality_tiers: {nome: {"jpeg_quality": ..., "scale": ...}} para
+                enviar o vídeo a vários receptores, uma codificação por nível
+                (ver frameFanout.py); server_ip:video_port entra no primeiro nível
+            subscribe_port: Porta UDP onde receptores se inscrevem em tempo
+                de execução ("subscribe <porta> [nível]"); ativa o fan-out
+            encoder: Backend de codificação do vídeo (ver frameEncoders.py),
+                ex: "jpeg", "webp", "yuv420", "raw" (com fragmented) ou "auto"
+            model_loading: Carregamento do MediaPipe na thread de inferência
+                (ver HandTracker): "background" (padrão: captura e vídeo
+                começam na hora, landmarks saem quando o modelo fica pronto)
+                ou "eager". Com inference_workers o tracker não carrega modelo
+            record_landmarks: Arquivo para gravar os landmarks enviados e
+                reenviá-los depois sem câmera (ver landmarkRecorder.py)
+            transport: "udp" (padrão) ou "shm": frames BGR crus numa memória
+                compartilhada, sem JPEG, para consumidores na mesma máquina
+                (ver sharedFrameTransport.py); os landmarks continuam no UDP
+            shm_name: Nome do segmento de memória compartilhada
+            mjpeg_passthrough: True para pedir MJPEG à câmera e enviar o JPEG
+                dela sem decodificar nem recodificar; o espelhamento vira o
+                flag FRAME_FLAG_MIRRORED (aplicado pelo receptor). Requer
+                fragmented; sem MJPEG na câmera, volta ao caminho normal
+            mjpeg_decode_scale: Redução (1, 2, 4 ou 8) da decodificação feita
+                só para os frames que vão para a inferência
+            preview_fps: Limite de redesenhos por segundo da janela de debug
+            receiver_feedback: True para ler os relatórios dos receptores
+                (vídeo e landmarks; ver receiverFeedback.py): taxa de entrega
+                real, perda, jitter e latência captura → receptor. Requer
+                fragmented e transport="udp"
         """
         print("=" * 50)
         print("📹 VIDEO CAPTURE - INICIANDO")
         print("=" * 50)
         
         self.deviceCamID = cameraDeviceID
+        self.source = cameraDeviceID if source is None else source
+        self.realtime = realtime
         self.debugCamera = showCamera
+        self.previewFps = preview_fps
+        self.preview = None
+        self.inferenceWorkers = inference_workers
+        self.inferencePool = None
+        self._poolFailures = 0
+        
+        # Cadência da inferência: frames pulados recebem landmarks previstos
+        self.inferenceScheduler = None
+        self.landmarkPredictor = None
+        if inference_interval > 1 or adaptive_inference:
+            self.inferenceScheduler = InferenceScheduler(
+                interval=inference_interval, adaptive=adaptive_inference,
+                max_interval=inference_interval if inference_interval > 1 else 4)
+            self.landmarkPredictor = LandmarkPredictor(mode=landmark_filter)
+            
+        # Detector de mudança: frames parados não passam dos estágios caros
+        if unchanged_payload not in ("heartbeat", "cached"):
+            raise ValueError(f"unchanged_payload inválido: {unchanged_payload}")
+        self.motionGate = MotionGate(motion_threshold, motion_fraction) if motion_gate else None
+        self.resendCached = unchanged_payload == "cached"
         
-        # Cria sender UDP (SEM jpeg_quality - compatível com sua classe)
+        # Métricas: counters, histogramas por estágio e linha do tempo por frame
+        self.metrics = metrics if isinstance(metrics, MetricsRegistry) else MetricsRegistry(enabled=bool(metrics))
+        self.metricsExport = metrics_export
+        self.metricsReporter = None
+        self.metricsServer = None
+        
+        # Controle de taxa opcional (o fps é trocado pelo da fonte ao abri-la)
+        rate_controller = None
+        if target_bitrate is not None:
+            rate_controller = AdaptiveRateController(
+                target_bitrate=target_bitrate, fps=30, initial_quality=jpeg_quality)
+        self.rateController = rate_controller
+                
+        if transport not in ("udp", "shm"):
+            raise ValueError(f"transport inválido: {transport}")
+        if mjpeg_passthrough:
+            # O JPEG da câmera sai como está: nada que dependa de recodificar
+            if not fragmented:
+                raise ValueError("mjpeg_passthrough requer fragmented=True (o flag de espelhamento "
+                                 "vai no cabeçalho dos fragmentos)")
+            if (delta_mode or target_bitrate is not None or quality_tiers is not None
+                    or subscribe_port is not None or transport != "udp" or encoder != "jpeg"):
+                raise ValueError("mjpeg_passthrough não combina com delta_mode, target_bitrate, "
+                                 "quality_tiers, subscribe_port, transport='shm' ou outro encoder")
+        if receiver_feedback and (not fragmented or transport != "udp"):
+            raise ValueError("receiver_feedback requer fragmented=True e transport='udp'")
+        if target_bitrate is not None and (quality_tiers is not None or subscribe_port is not None
+                                           or transport != "udp"):
+            # O controlador de taxa só existe no UDPFrameSender simples (não no fan-out/shm)
+            raise ValueError("target_bitrate não combina com quality_tiers, subscribe_port ou transport='shm'")
+        if (inference_interval > 1 or adaptive_inference) and inference_workers > 0:
+            # O pool recebe todos os frames: o escalonador só existe na thread de inferência
+            raise ValueError("inference_interval/adaptive_inference não combinam com inference_workers > 0")
+        if roi and inference_workers > 0:
+            # Com o pool o modelo roda nos workers: o HandTracker daqui não infere
+            raise ValueError("roi não combina com inference_workers > 0")
+        if mjpeg_decode_scale not in (1, 2, 4, 8):
+            raise ValueError(f"mjpeg_decode_scale inválido: {mjpeg_decode_scale}")
+        self.mjpegPassthrough = mjpeg_passthrough
+        self.mjpegDecodeScale = mjpeg_decode_scale
+        self.passthrough = False  # decidido ao abrir a fonte
+            
+        # Cria sender UDP
         print(f"\n🔌 Conectando UDP...")
-        self.udpObj = UDPFrameSender("127.0.0.1", 8383)
-        self.handTrackerObj = HandTracker(cameraDeviceID=0, showCamera=False)
+        if transport == "shm":
+            # Mesma máquina: sem codificação, aviso de frame novo por UDP
+            self.udpObj = SharedFrameSender(shm_name)
+        elif quality_tiers is not None or subscribe_port is not None:
+            # Fan-out: uma codificação por nível, o mesmo payload para cada receptor
+            self.udpObj = FrameFanout(quality_tiers or {"default": {"jpeg_quality": jpeg_quality}},
+                                      fragmented=fragmented, delta_mode=delta_mode, metrics=self.metrics,
+                                      encoder=encoder, feedback=receiver_feedback)
+            self.udpObj.subscribe(server_ip, video_port)
+            if subscribe_port is not None:
+                self.udpObj.listen(subscribe_port)
+        else:
+            self.udpObj = UDPFrameSender(server_ip, video_port, jpeg_quality=jpeg_quality,
+                                         fragmented=fragmented, rate_controller=rate_controller,
+                                         delta_mode=delta_mode, metrics=self.metrics, encoder=encoder,
+                                         feedback=receiver_feedback)
+        # Com o pool, o tracker só envia os landmarks: o modelo fica nos workers
+        self.handTrackerObj = HandTracker(cameraDeviceID=cameraDeviceID, showCamera=False,
+                                          wire_format=landmark_format,
+                                          server_ip=server_ip, server_port=hand_port, roi=roi,
+                                          model_loading="lazy" if inference_workers > 0 else model_loading,
+                                          record_path=record_landmarks, feedback=receiver_feedback)
         
-        # Contadores
+        # Filas entre estágios: (frame_number, timestamp, frame)
+        self.inferenceQueue = DropOldestQueue(queue_size)
+        self.sendQueue = DropOldestQueue(queue_size)
+        self.stopEvent = threading.Event()
+        
+        # Contadores e histogramas por estágio
+        self.captureFrames = self.metrics.counter("capture.frames")
+        self.inferenceFrames = self.metrics.counter("inference.frames")
+        self.inferenceFailed = self.metrics.counter("inference.failed")
+        self.sendFrames = self.metrics.counter("send.frames")
+        self.sendFailed = self.metrics.counter("send.failed")
+        self.predictedFrames = self.metrics.counter("inference.predicted")
+        self.unchangedFrames = self.metrics.counter("capture.unchanged")
+        self.warmupFrames = self.metrics.counter("inference.warmup_skipped")
+        self.captureHistogram = self.metrics.histogram("capture")
+        self.inferenceHistogram = self.metrics.histogram("inference")
+        self.landmarkHistogram = self.metrics.histogram("landmark_send")
+        self.timeline = self.metrics.timeline
+        self.metrics.add_collector(self._collectMetrics)
+        
+        # Número do frame capturado
         self.frame_count = 0
-        self.sent_count = 0
-        self.failed_count = 0
+        
+    def _inferenceFrame(self, frame):
+        """
+        Frame entregue ao MediaPipe. No passthrough MJPEG o item da fila é
+        o JPEG: decodificado aqui (só nos frames inferidos), reduzido e
+        espelhado como o vídeo visto pelo receptor.
+        
+        Returns:
+            numpy array BGR ou None se o JPEG for inválido
+        """
+        if not self.passthrough:
+            return frame
+        decoded = decode_mjpeg(frame, self.mjpegDecodeScale)
+        return cv2.flip(decoded, 1) if decoded is not None else None
+        
+    def _poolInferenceStep(self, item):
+        """Submete o frame ao pool e envia os resultados prontos (em ordem)."""
+        if item is not None:
+            frame_number, timestamp, frame = item
+            try:
+                self.timeline.mark(frame_number, "inference_start")
+                frame = self._inferenceFrame(frame)
+                if frame is None:
+                    raise ValueError("JPEG da câmera inválido")
+                self.inferencePool.submit(frame, frame_number, timestamp)
+            except Exception as e:
+                self.inferenceFailed.inc()
+                print(f"❌ Erro na inferência do frame #{frame_number}: {e}")
+            
+        for result in self.inferencePool.results():
+            try:
+                self.timeline.mark(result.frame_number, "inference_done")
+                self.handTrackerObj.send_hand_data(result)
+                self.timeline.mark(result.frame_number, "landmarks_sent")
+                if self.preview is not None:
+                    self.preview.show_landmarks(result)
+                self.inferenceFrames.inc()
+            except Exception as e:
+                self.inferenceFailed.inc()
+                print(f"❌ Erro ao enviar landmarks do frame #{result.frame_number}: {e}")
+                
+        # Falhas dentro do pool (erro no worker, worker morto, timeout)
+        pool_failures = self.inferencePool.failed_count + self.inferencePool.timed_out_count
+        if pool_failures > self._poolFailures:
+            self.inferenceFailed.inc(pool_failures - self._poolFailures)
+            self._poolFailures = pool_failures
+            
+    def _inferenceLoop(self):
+        """Estágio de inferência: MediaPipe + envio dos landmarks."""
+        while not self.stopEvent.is_set():
+            if self.inferencePool is not None:
+                # Com frames em voo, volta logo para recolher resultados
+                timeout = 0.005 if self.inferencePool.pending() else 0.1
+                self._poolInferenceStep(self.inferenceQueue.get(timeout=timeout))
+                continue
+                
+            item = self.inferenceQueue.get(timeout=0.1)
+            if item is None:
+                continue
+                
+            frame_number, timestamp, frame = item
+            
+            # Modelo ainda carregando (ou falhou): o vídeo segue, sem landmarks
+            if not self.handTrackerObj.ready:
+                self.warmupFrames.inc()
+                continue
+                
+            try:
+                # frame_number/timestamp da captura mantêm landmarks e vídeo pareados
+                if self.inferenceScheduler is None or self.inferenceScheduler.should_infer():
+                    start = time.perf_counter()
+                    self.timeline.mark(frame_number, "inference_start", start)
+                    frame = self._inferenceFrame(frame)
+                    if frame is None:
+                        raise ValueError("JPEG da câmera inválido")
+                    _, hands_data = self.handTrackerObj.process_hands(
+                        frame, frame_number=frame_number, timestamp=timestamp)
+                    self.inferenceHistogram.observe_since(start)
+                    self.timeline.mark(frame_number, "inference_done")
+                    if self.landmarkPredictor is not None:
+                        self.landmarkPredictor.update(hands_data)
+                        self.inferenceScheduler.observe(self.landmarkPredictor.speed)
+                    self.inferenceFrames.inc()
+                else:
+                    # Frame pulado: landmarks previstos, no buffer do tracker
+                    hands_data = self.landmarkPredictor.predict(
+                        self.handTrackerObj.result, frame_number, timestamp)
+                    self.predictedFrames.inc()
+                    
+                
+                start = time.perf_counter()
+                self.handTrackerObj.send_hand_data(hands_data)
+                self.landmarkHistogram.observe_since(start)
+                self.timeline.mark(frame_number, "landmarks_sent")
+                if self.preview is not None:
+                    self.preview.show_landmarks(hands_data)
+            except Exception as e:
+                self.inferenceFailed.inc()
+                print(f"❌ Erro na inferência do frame #{frame_number}: {e}")
+                
+    def _sendLoop(self):
+        """Estágio de envio: codificação JPEG + UDP."""
+        while not self.stopEvent.is_set():
+            item = self.sendQueue.get(timeout=0.1)
+            if item is None:
+                continue
+                
+            frame_number, timestamp, frame = item
+            
+            # Frame parado (motion gate): heartbeat ou último JPEG, sem codificar
+            if frame is None:
+                self.udpObj.sendUnchanged(timestamp, cached=self.resendCached)
+                continue
+                
+            # ENVIA O FRAME VIA UDP (passthrough: o JPEG da câmera, espelhado no receptor)
+            self.timeline.mark(frame_number, "encode_start")
+            if self.passthrough:
+                sent = self.udpObj.sendEncodedFrame(frame, timestamp, FRAME_FLAG_MIRRORED)
+            else:
+                sent = self.udpObj.sendFrame(frame, timestamp)
+            if sent:
+                self.timeline.mark(frame_number, "sent")
+                self.sendFrames.inc()
+            else:
+                self.sendFailed.inc()
+                failed = self.udpObj.framesFailed
+                # Mostra erro apenas nos primeiros 5 ou a cada 100
+                if failed <= 5 or failed % 100 == 0:
+                    print(f"⚠️ Falha ao enviar frame #{frame_number}")
+                    
+    def _feedbackCollectors(self):
+        """Canais de retorno ativos: vídeo (um por nível no fan-out) e landmarks."""
+        senders = self.udpObj.tiers.values() if isinstance(self.udpObj, FrameFanout) else [self.udpObj]
+        collectors = [getattr(sender, "feedback", None) for sender in senders]
+        collectors.append(self.handTrackerObj.sender.feedback)
+        return [collector for collector in collectors if collector is not None]
+        
+    def _collectMetrics(self, metrics):
+        """Atualiza os gauges a partir das filas/pool (na thread de métricas)."""
+        dropped = self.inferenceQueue.dropped
+        if self.inferencePool is not None:
+            dropped += self.inferencePool.rejected_count
+            metrics.gauge("inference.pending").set(self.inferencePool.pending())
+        metrics.gauge("inference.dropped").set(dropped)
+        metrics.gauge("send.dropped").set(self.sendQueue.dropped)
+        if self.motionGate is not None:
+            metrics.gauge("motion.skip_rate").set(round(self.motionGate.stats()["skip_rate"], 3))
+        if self.udpObj.rateController is not None:
+            sender_stats = self.udpObj.getStats()
+            metrics.gauge("send.jpeg_quality").set(sender_stats["jpeg_quality"])
+            metrics.gauge("send.bitrate").set(sender_stats["bitrate"])
+            
+    def _formatStats(self, snapshot, rates):
+        """Linha de throughput/latência por estágio (saída do ConsoleSink)."""
+        gauges = snapshot["gauges"]
+        histograms = snapshot["histograms"]
+        
+        def stage(name, key, dropped=None, failed=None):
+            text = f"{name}: {rates.get(key + '.frames', 0.0):.1f} fps"
+            if dropped and gauges.get(dropped):
+                text += f" (descartados: {gauges[dropped]})"
+            if failed and snapshot["counters"].get(failed):
+                text += f" (falhas: {snapshot['counters'][failed]})"
+            return text
+            
+        parts = [
+            stage("Captura", "capture"),
+            stage("Inferência", "inference", "inference.dropped", "inference.failed"),
+            stage("Envio", "send", "send.dropped", "send.failed"),
+        ]
+        if self.motionGate is not None:
+            parts.append(f"Parados: {gauges.get('motion.skip_rate', 0.0):.0%}")
+        if self.inferenceScheduler is not None:
+            parts.append(f"Previstos: {rates.get('inference.predicted', 0.0):.1f} fps "
+                         f"(intervalo: {self.inferenceScheduler.current_interval})")
+        for name in ("inference", "encode", "capture_to_send"):
+            if name in histograms:
+                parts.append(f"{name} p50/p95: {histograms[name]['p50_ms']:g}/{histograms[name]['p95_ms']:g} ms")
+        if "feedback.video.delivery" in gauges:
+            latency = histograms.get("feedback.video.latency", {})
+            parts.append(f"Entregues: {gauges['feedback.video.delivery']:.1%} "
+                         f"(captura → receptor p50/p95: {latency.get('p50_ms', 0):g}/{latency.get('p95_ms', 0):g} ms)")
+        if "send.jpeg_quality" in gauges:
+            parts.append(f"JPEG: {gauges['send.jpeg_quality']}% "
+                         f"@ {gauges['send.bitrate'] / 1000:.0f} kbps")
+        return "📊 " + " | ".join(parts)
         
     def initVideoCapture(self):
         """Inicia loop de captura e envio de frames."""
-        print(f"\n📷 Abrindo câmera {self.deviceCamID}...")
+        print(f"\n📷 Abrindo fonte {self.source}...")
         
-        # Abre câmera
-        self.cap = cv2.VideoCapture(self.deviceCamID, cv2.CAP_DSHOW)
+        # Abre câmera (ou fonte gravada/sintética)
+        self.cap = open_frame_source(self.source, width=640, height=480, fps=30,
+                                     realtime=self.realtime, mjpeg=self.mjpegPassthrough)
         
         if not self.cap.isOpened():
             print("❌ ERRO: Não foi possível abrir a câmera!")
             print("💡 Verifique se a câmera está conectada e não está em uso")
             return
+            
+        # MJPEG direto da câmera: sem decodificar/espelhar/recodificar o vídeo
+        self.passthrough = self.mjpegPassthrough and self.cap.compressed
+        if self.passthrough:
+            print(f"🎞️  MJPEG passthrough: JPEG da câmera enviado direto, "
+                  f"inferência em 1/{self.mjpegDecodeScale} da resolução")
         
-        # Configurações da câmera (opcional - ajuste conforme necessário)
-        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-        self.cap.set(cv2.CAP_PROP_FPS, 30)
-        
-        # Informações da câmera
-        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        fps = int(self.cap.get(cv2.CAP_PROP_FPS))
+        # Informações da fonte
+        width = self.cap.width
+        height = self.cap.height
+        fps = int(self.cap.fps)
+        if self.rateController is not None and self.cap.fps > 0:
+            # Orçamento por frame = target_bitrate / fps da fonte
+            self.rateController.fps = self.cap.fps
         
-        print(f"✅ Câmera aberta com sucesso!")
+        print(f"✅ Fonte aberta com sucesso: {self.cap.describe()}")
         print(f"📐 Resolução: {width}x{height}")
         print(f"🎬 FPS configurado: {fps}")
         print(f"\n{'='*50}")
@@ -59,63 +444,76 @@ class VideoCapture:
         print("⏸️  Pressione ESC para parar")
         print(f"{'='*50}\n")
         
-        try:
-            start_time = time.time()
+        # Pool de processos para o MediaPipe (opcional)
+        if self.inferenceWorkers > 0:
+            self.inferencePool = HandInferencePool(num_workers=self.inferenceWorkers,
+                                                   max_frame_shape=(height, width, 3))
+        
+        # Estatísticas saem numa thread própria, fora do loop de captura
+        self.metricsReporter = MetricsReporter(
+            self.metrics, [ConsoleSink(self._formatStats)] + create_sinks(self.metricsExport)).start()
+        self.metricsServer = start_http_export(self.metrics, self.metricsExport)
+        
+        # Janela de debug fora do loop de captura: cópia, desenho, imshow e
+        # waitKey na thread dela, no máximo preview_fps vezes por segundo
+        if self.debugCamera:
+            self.preview = PreviewWindow('CAMERA - Pressione ESC para sair', self.previewFps,
+                                         decode_scale=self.mjpegDecodeScale).start()
+                                         
+        # Inicia os workers de inferência e envio
+        self.stopEvent.clear()
+        workers = [
+            threading.Thread(target=self._inferenceLoop, name="inference", daemon=True),
+            threading.Thread(target=self._sendLoop, name="send", daemon=True),
+        ]
+        for worker in workers:
+            worker.start()
             
+        try:
             while self.cap.isOpened():
+                start = time.perf_counter()
                 ret, frame = self.cap.read()
-                # Processa mãos
-                frame = cv2.flip(frame,1)
-                _, hands_data = self.handTrackerObj.process_hands(frame)
-                
-                # Envia dados via UDP
-                self.handTrackerObj.send_hand_data(hands_data)
                 
                 if not ret:
-                    print("⚠️ Falha ao capturar frame da câmera")
+                    print("⚠️ Falha ao capturar frame da câmera (ou fim da fonte)")
                     break
                 
                 self.frame_count += 1
+                self.captureFrames.inc()
                 
-                # ENVIA O FRAME VIA UDP
-                if self.udpObj.sendFrame(frame):
-                    self.sent_count += 1
-                else:
-                    self.failed_count += 1
-                    # Mostra erro apenas nos primeiros 5 ou a cada 100
-                    if self.failed_count <= 5 or self.failed_count % 100 == 0:
-                        print(f"⚠️ Falha ao enviar frame #{self.frame_count}")
-                
-                # Estatísticas a cada 30 frames (~1 segundo)
-                if self.frame_count % 30 == 0:
-                    elapsed = time.time() - start_time
-                    fps_real = self.frame_count / elapsed if elapsed > 0 else 0
-                    success_rate = (self.sent_count / self.frame_count * 100) if self.frame_count > 0 else 0
+                # Cena parada: só o heartbeat segue (sem flip, inferência e JPEG);
+                # os últimos landmarks enviados continuam valendo e a janela de
+                # debug mantém o último frame. No passthrough o motion gate
+                # olha uma decodificação em 1/8
+                moving = True
+                if self.motionGate is not None:
+                    gate_frame = decode_mjpeg(frame, 8) if self.passthrough else frame
+                    moving = gate_frame is None or self.motionGate.check(gate_frame)
                     
-                    print(f"📊 Frames: {self.frame_count} | "
-                          f"Enviados: {self.sent_count} | "
-                          f"Falhas: {self.failed_count} | "
-                          f"Taxa: {success_rate:.1f}% | "
-                          f"FPS: {fps_real:.1f}")
-                
-                # Debug: Mostra janela com o vídeo
-                if self.debugCamera:
-                    # Adiciona texto de status no frame
-                    frame_display = frame.copy()
-                    cv2.putText(frame_display, 
-                               f"Frames: {self.frame_count} | Enviados: {self.sent_count}", 
-                               (10, 30), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 
-                               0.7, 
-                               (0, 255, 0), 
-                               2)
+                if not moving:
+                    self.unchangedFrames.inc()
+                    self.sendQueue.put((self.frame_count, time.time(), None))
+                else:
+                    if not self.passthrough:
+                        frame = cv2.flip(frame, 1)
+                    self.captureHistogram.observe_since(start)
+                    self.timeline.mark(self.frame_count, "capture")
                     
-                    cv2.imshow('CAMERA - Pressione ESC para sair', frame_display)
+                    # Entrega o mesmo frame aos dois estágios (sem cópia)
+                    item = (self.frame_count, time.time(), frame)
+                    self.inferenceQueue.put(item)
+                    self.sendQueue.put(item)
+                
+                    # Debug: só a referência do frame (desenho na thread da janela)
+                    if self.preview is not None:
+                        self.preview.show_frame(
+                            frame, (f"Frames: {self.frame_count} | Enviados: {self.udpObj.framesSent}",),
+                            jpeg=self.passthrough)
                     
-                    # ESC para sair
-                    if cv2.waitKey(1) & 0xFF == 27:
-                        print("\n⏹️  ESC pressionado - Encerrando...")
-                        break
+                # ESC (ou janela fechada) para sair
+                if self.preview is not None and self.preview.closed.is_set():
+                    print("\n⏹️  ESC pressionado - Encerrando...")
+                    break
                         
         except KeyboardInterrupt:
             print("\n⏹️  Interrompido pelo usuário (Ctrl+C)")
@@ -131,19 +529,59 @@ class VideoCapture:
             print("🧹 LIMPANDO RECURSOS")
             print("=" * 50)
             
+            # Para os workers antes de fechar os sockets
+            self.stopEvent.set()
+            self.inferenceQueue.close()
+            self.sendQueue.close()
+            for worker in workers:
+                worker.join(timeout=2.0)
+            self.metricsReporter.stop()
+            if self.metricsServer is not None:
+                self.metricsServer.stop()
+                
+            if self.inferencePool is not None:
+                self.inferencePool.close()
+                self.inferencePool = None
+                
+            if self.preview is not None:
+                self.preview.stop()
+                
             self.cap.release()
-            cv2.destroyAllWindows()
-            self.udpObj.close()
+            self.udpObj.closeSocketConnection()
+            self.handTrackerObj.close_recorder()
+            self.handTrackerObj.sender.close()
             
             # Estatísticas finais
             print(f"\n📈 ESTATÍSTICAS FINAIS:")
             print(f"   • Total de frames capturados: {self.frame_count}")
-            print(f"   • Frames enviados com sucesso: {self.sent_count}")
-            print(f"   • Frames com falha: {self.failed_count}")
+            print(f"   • Frames enviados com sucesso: {self.udpObj.framesSent}")
+            print(f"   • Frames com falha: {self.udpObj.framesFailed}")
+            if self.metrics.enabled:
+                print(f"   • Frames inferidos: {self.inferenceFrames.value} "
+                      f"(descartados: {self.inferenceQueue.dropped})")
+                if self.warmupFrames.value:
+                    print(f"   • Frames sem landmarks (modelo carregando): {self.warmupFrames.value}")
+                latency = self.metrics.timeline.capture_to_send
+                print(f"   • Captura → envio: p50 {latency.percentile(50):g} ms, "
+                      f"p99 {latency.percentile(99):g} ms")
+            print(f"   • Frames descartados no envio: {self.sendQueue.dropped}")
+            for collector in self._feedbackCollectors():
+                for line in collector.summary():
+                    print(f"   • {line}")
+            if self.preview is not None:
+                preview_stats = self.preview.stats()
+                print(f"   • Janela de debug: {preview_stats['rendered']} desenhados, "
+                      f"{preview_stats['dropped']} pulados")
+            skipped = 0
+            if self.motionGate is not None:
+                gate_stats = self.motionGate.stats()
+                skipped = gate_stats["skipped"]
+                print(f"   • Frames parados (motion gate): {skipped} ({gate_stats['skip_rate']:.1%}) | "
+                      f"heartbeats: {self.udpObj.heartbeatsSent}")
             
-            if self.frame_count > 0:
-                success_rate = (self.sent_count / self.frame_count * 100)
-                print(f"   • Taxa de sucesso: {success_rate:.1f}%")
+            if self.frame_count > skipped:
+                success_rate = (self.udpObj.framesSent / (self.frame_count - skipped) * 100)
+                print(f"   • Taxa de sucesso do envio (sendto): {success_rate:.1f}%")
             
             print("\n✅ Programa encerrado\n")
 